@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Dict
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models import Progress, Tutorial, Step, User
 from ..models.user import UserRole
 from ..schemas.progress import ProgressCreate, ProgressUpdate, ProgressResponse
 from ..services.auth import get_current_user
+from ..services.response_cache import cached, invalidate_tags, user_scope
 
 router = APIRouter()
 
@@ -33,6 +34,7 @@ def create_progress(
     )
     db.add(db_progress)
     db.commit()
+    invalidate_tags(f"progress:{progress.tutorial_id}", f"progress_of:{current_user.id}")
     db.refresh(db_progress)
     return db_progress
 
@@ -40,7 +42,7 @@ def create_progress(
 @router.get("/progress/{tutorial_id}", response_model=ProgressResponse)
 def get_progress(
     tutorial_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user's progress for a specific tutorial"""
@@ -73,11 +75,13 @@ def update_progress(
 
     db.commit()
     db.refresh(db_progress)
+    invalidate_tags(f"progress:{db_progress.tutorial_id}", f"progress_of:{db_progress.user_id}")
     return db_progress
 
 
 @router.get("/tutorials/{tutorial_id}/stats")
-def get_tutorial_stats(tutorial_id: str, db: Session = Depends(get_db)):
+@cached(tags=("tutorial:{tutorial_id}", "progress:{tutorial_id}"))
+def get_tutorial_stats(tutorial_id: str, db: Session = Depends(get_read_db)):
     """Get analytics stats for a tutorial"""
     tutorial = db.query(Tutorial).filter(Tutorial.id == tutorial_id).first()
 
@@ -119,8 +123,9 @@ def get_tutorial_stats(tutorial_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/dashboard")
+@cached(tags=("tutorials", "progress_of:{current_user.id}"), scope=user_scope)
 def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get overall dashboard statistics"""
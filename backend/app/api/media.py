@@ -0,0 +1,136 @@
+import hashlib
+import mimetypes
+import os
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from ..services.storage import LocalStorage, get_storage
+
+router = APIRouter()
+
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+READ_CHUNK_SIZE = 256 * 1024
+
+
+def parse_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single "bytes=start-end" range into inclusive offsets.
+
+    Returns None when the header should be ignored (other units or several
+    ranges) and raises HTTPException 416 when the range cannot be satisfied.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else file_size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(file_size - int(end_text), 0)
+            end = file_size - 1
+    except ValueError:
+        return None
+
+    end = min(end, file_size - 1)
+    if start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    return start, end
+
+
+class MediaFileResponse(Response):
+    """Send a byte range of a file.
+
+    Uses the ASGI zero-copy extension (sendfile) when the server offers it,
+    and falls back to reading the file in chunks otherwise.
+    """
+
+    def __init__(self, path: str, start: int, length: int, status_code: int, headers: dict, media_type: str):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.length = length
+        self.headers["content-length"] = str(length)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+
+        if scope["method"] == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if "http.response.zerocopy" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": file,
+                    "offset": self.start,
+                    "count": self.length,
+                })
+            return
+
+        remaining = self.length
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+
+
+@router.api_route("/{public_id:path}", methods=["GET", "HEAD"])
+async def serve_media(public_id: str, request: Request):
+    """Serve a locally stored media file with Range and long-lived caching"""
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    try:
+        path = storage.path(public_id)
+        stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    file_size = stat_result.st_size
+    etag = '"' + hashlib.md5(f"{stat_result.st_mtime_ns}-{file_size}".encode()).hexdigest() + '"'
+    headers = {
+        "accept-ranges": "bytes",
+        "cache-control": MEDIA_CACHE_CONTROL,
+        "etag": etag,
+    }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    media_type = mimetypes.guess_type(public_id)[0] or "application/octet-stream"
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", etag) == etag:
+        byte_range = parse_range(range_header, file_size)
+
+    if byte_range is None:
+        return MediaFileResponse(str(path), 0, file_size, 200, headers, media_type)
+
+    start, end = byte_range
+    headers["content-range"] = f"bytes {start}-{end}/{file_size}"
+    return MediaFileResponse(str(path), start, end - start + 1, 206, headers, media_type)
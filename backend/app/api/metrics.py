@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+from ..database import get_pool_stats
+from ..services.sql_profiler import SQL_PROFILE, get_recent_profiles
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+def database_pool_stats():
+    """Database connection pool usage and checkout wait times"""
+    return get_pool_stats()
+
+
+@router.get("/sql-profile")
+def sql_profile():
+    """Per-request query profiles of recent requests (requires SQL_PROFILE=true)"""
+    if not SQL_PROFILE:
+        raise HTTPException(status_code=404, detail="SQL profiling is disabled")
+    return get_recent_profiles()
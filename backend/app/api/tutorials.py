@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models import Tutorial, Step, Annotation
 from ..models.user import User, UserRole
 from ..schemas.tutorial import (
@@ -9,6 +11,10 @@ from ..schemas.tutorial import (
     StepCreate, StepUpdate, StepResponse, AnnotationCreate, StepsReorderRequest
 )
 from ..services.auth import get_current_user, require_role
+from ..services.json_response import FastJSONResponse
+from ..services.annotated_renders import delete_render_files, get_annotated_render, invalidate_annotated_renders
+from ..services.media_assets import delete_asset_files, find_screenshot_variants, update_asset_refs
+from ..services.response_cache import access_scope, cached, invalidate_tags
 
 router = APIRouter()
 
@@ -27,13 +33,57 @@ def check_tutorial_access(tutorial: Tutorial, user: User) -> bool:
     if tutorial.is_published:
         return True
 
-    # Check if user has explicit access
-    if tutorial in user.accessible_tutorials:
+    # Check if user has explicit access (by id: the user and the tutorial may
+    # come from different sessions, e.g. get_db and get_read_db)
+    if tutorial.id in {t.id for t in user.accessible_tutorials}:
         return True
 
     return False
 
 
+def resolve_screenshot_variants(db: Session, step_data) -> Optional[list]:
+    """Responsive variants for a step's screenshot.
+
+    Variants recorded by the upload pipeline win; variants sent by the client
+    are only kept when they belong to the step's current screenshot.
+    """
+    if not step_data.screenshot_url:
+        return None
+
+    variants = find_screenshot_variants(db, step_data.screenshot_url)
+    if variants:
+        return variants
+
+    client_variants = [v.dict() for v in step_data.screenshot_variants or []]
+    if any(v["url"] == step_data.screenshot_url for v in client_variants):
+        return client_variants
+    return None
+
+
+def resolve_video_details(step_data) -> dict:
+    """Poster and metadata for a step's video; dropped when the step has no video"""
+    if not step_data.video_url:
+        return {"video_poster_url": None, "video_metadata": None}
+    return {
+        "video_poster_url": step_data.video_poster_url,
+        "video_metadata": step_data.video_metadata.dict() if step_data.video_metadata else None,
+    }
+
+
+def invalidate_renders(db: Session, background_tasks: BackgroundTasks, step_ids: List[str]) -> None:
+    """Drop annotated renders of steps being changed; files are deleted after the response"""
+    stale = invalidate_annotated_renders(db, step_ids, commit=False)
+    if stale:
+        background_tasks.add_task(delete_render_files, stale)
+
+
+def update_screenshot_refs(db: Session, background_tasks: BackgroundTasks, removed: list, added: list) -> None:
+    """Move media asset references between screenshot URLs; unused files are deleted after the response"""
+    stale = update_asset_refs(db, removed, added)
+    if stale:
+        background_tasks.add_task(delete_asset_files, stale)
+
+
 @router.post("/", response_model=TutorialResponse, status_code=status.HTTP_201_CREATED)
 def create_tutorial(
     tutorial: TutorialCreate,
@@ -61,7 +111,9 @@ def create_tutorial(
             order=step_data.order,
             title=step_data.title,
             screenshot_url=step_data.screenshot_url,
+            screenshot_variants=resolve_screenshot_variants(db, step_data),
             video_url=step_data.video_url,
+            **resolve_video_details(step_data),
             content=step_data.content,
             validation_required=step_data.validation_required,
             validation_type=step_data.validation_type,
@@ -83,18 +135,21 @@ def create_tutorial(
             )
             db.add(db_annotation)
 
+    update_asset_refs(db, [], [step_data.screenshot_url for step_data in tutorial.steps])
     db.commit()
+    invalidate_tags("tutorials")
     db.refresh(db_tutorial)
     return db_tutorial
 
 
 @router.get("/", response_model=List[TutorialListResponse])
+@cached(tags=("tutorials",), scope=access_scope)
 def list_tutorials(
     skip: int = 0,
     limit: int = 100,
     category: str = None,
     published_only: bool = False,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """List tutorials accessible to the current user"""
@@ -117,6 +172,14 @@ def list_tutorials(
 
     tutorials = query.offset(skip).limit(limit).all()
 
+    # Step counts for the whole page in one query, not one steps load per tutorial
+    step_counts = dict(
+        db.query(Step.tutorial_id, func.count(Step.id))
+        .filter(Step.tutorial_id.in_([tutorial.id for tutorial in tutorials]))
+        .group_by(Step.tutorial_id)
+        .all()
+    )
+
     # Convert to list response with step count
     result = []
     for tutorial in tutorials:
@@ -128,21 +191,27 @@ def list_tutorials(
             tags=tutorial.tags,
             created_at=tutorial.created_at,
             is_published=tutorial.is_published,
-            step_count=len(tutorial.steps)
+            step_count=step_counts.get(tutorial.id, 0)
         )
         result.append(tutorial_dict)
 
-    return result
+    return FastJSONResponse(result)
 
 
 @router.get("/{tutorial_id}", response_model=TutorialResponse)
+@cached(tags=("tutorial:{tutorial_id}",), scope=access_scope)
 def get_tutorial(
     tutorial_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific tutorial with all steps and annotations"""
-    tutorial = db.query(Tutorial).filter(Tutorial.id == tutorial_id).first()
+    tutorial = (
+        db.query(Tutorial)
+        .options(selectinload(Tutorial.steps).selectinload(Step.annotations))
+        .filter(Tutorial.id == tutorial_id)
+        .first()
+    )
 
     if not tutorial:
         raise HTTPException(status_code=404, detail="Tutorial not found")
@@ -154,13 +223,14 @@ def get_tutorial(
             detail="You don't have access to this tutorial"
         )
 
-    return tutorial
+    return FastJSONResponse(TutorialResponse.model_validate(tutorial))
 
 
 @router.put("/{tutorial_id}", response_model=TutorialResponse)
 def update_tutorial(
     tutorial_id: str,
     tutorial_update: TutorialUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -185,8 +255,17 @@ def update_tutorial(
 
     # Update steps if provided
     if hasattr(tutorial_update, 'steps') and tutorial_update.steps is not None:
-        # Delete all existing steps
-        db.query(Step).filter(Step.tutorial_id == tutorial_id).delete()
+        # Delete all existing steps through the ORM so their annotations go
+        # with them (a bulk delete would trip the annotations foreign key)
+        invalidate_renders(db, background_tasks, [step.id for step in db_tutorial.steps])
+        update_screenshot_refs(
+            db, background_tasks,
+            [step.screenshot_url for step in db_tutorial.steps],
+            [step_data.screenshot_url for step_data in tutorial_update.steps]
+        )
+        for db_step in list(db_tutorial.steps):
+            db.delete(db_step)
+        db.flush()
 
         # Create new steps
         for step_data in tutorial_update.steps:
@@ -195,7 +274,9 @@ def update_tutorial(
                 order=step_data.order,
                 title=step_data.title,
                 screenshot_url=step_data.screenshot_url,
+                screenshot_variants=resolve_screenshot_variants(db, step_data),
                 video_url=step_data.video_url,
+                **resolve_video_details(step_data),
                 content=step_data.content,
                 validation_required=step_data.validation_required,
                 validation_type=step_data.validation_type,
@@ -219,6 +300,7 @@ def update_tutorial(
                     db.add(db_annotation)
 
     db.commit()
+    invalidate_tags("tutorials", f"tutorial:{tutorial_id}")
     db.refresh(db_tutorial)
     return db_tutorial
 
@@ -226,6 +308,7 @@ def update_tutorial(
 @router.delete("/{tutorial_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_tutorial(
     tutorial_id: str,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -242,8 +325,11 @@ def delete_tutorial(
             detail="You don't have permission to delete this tutorial"
         )
 
+    invalidate_renders(db, background_tasks, [step.id for step in db_tutorial.steps])
+    update_screenshot_refs(db, background_tasks, [step.screenshot_url for step in db_tutorial.steps], [])
     db.delete(db_tutorial)
     db.commit()
+    invalidate_tags("tutorials", f"tutorial:{tutorial_id}")
     return None
 
 
@@ -260,7 +346,9 @@ def add_step(tutorial_id: str, step: StepCreate, db: Session = Depends(get_db)):
         order=step.order,
         title=step.title,
         screenshot_url=step.screenshot_url,
+        screenshot_variants=resolve_screenshot_variants(db, step),
         video_url=step.video_url,
+        **resolve_video_details(step),
         content=step.content,
         validation_required=step.validation_required,
         validation_type=step.validation_type,
@@ -282,7 +370,9 @@ def add_step(tutorial_id: str, step: StepCreate, db: Session = Depends(get_db)):
         )
         db.add(db_annotation)
 
+    update_asset_refs(db, [], [step.screenshot_url])
     db.commit()
+    invalidate_tags("tutorials", f"tutorial:{tutorial_id}")
     db.refresh(db_step)
     return db_step
 
@@ -292,6 +382,7 @@ def update_step(
     tutorial_id: str,
     step_id: str,
     step_update: StepUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Update a step"""
@@ -303,17 +394,72 @@ def update_step(
     if not db_step:
         raise HTTPException(status_code=404, detail="Step not found")
 
-    update_data = step_update.dict(exclude_unset=True)
+    invalidate_renders(db, background_tasks, [db_step.id])
+    previous_screenshot_url = db_step.screenshot_url
+
+    update_data = step_update.dict(exclude_unset=True, exclude={'screenshot_variants', 'video_metadata'})
     for field, value in update_data.items():
         setattr(db_step, field, value)
 
+    if 'video_metadata' in step_update.__fields_set__:
+        db_step.video_metadata = step_update.video_metadata.dict() if step_update.video_metadata else None
+    if not db_step.video_url:
+        db_step.video_poster_url = None
+        db_step.video_metadata = None
+
+    if 'screenshot_url' in update_data or 'screenshot_variants' in step_update.__fields_set__:
+        step_update.screenshot_url = db_step.screenshot_url
+        db_step.screenshot_variants = resolve_screenshot_variants(db, step_update)
+        update_screenshot_refs(db, background_tasks, [previous_screenshot_url], [db_step.screenshot_url])
+
     db.commit()
+    invalidate_tags(f"tutorial:{tutorial_id}")
     db.refresh(db_step)
     return db_step
 
 
+@router.get("/{tutorial_id}/steps/{step_id}/annotated")
+async def get_annotated_screenshot(
+    tutorial_id: str,
+    step_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The step's screenshot with its annotations drawn in.
+
+    Rendered on first request and cached until the screenshot or the
+    annotations change; `cached` tells whether this call reused a render.
+    """
+    db_step = await run_in_threadpool(get_accessible_step, db, tutorial_id, step_id, current_user)
+    return await get_annotated_render(db, db_step, background_tasks)
+
+
+def get_accessible_step(db: Session, tutorial_id: str, step_id: str, user: User) -> Step:
+    """The step, or 404 / 403 when it does not exist or the user may not see its tutorial"""
+    db_step = db.query(Step).filter(
+        Step.id == step_id,
+        Step.tutorial_id == tutorial_id
+    ).first()
+
+    if not db_step:
+        raise HTTPException(status_code=404, detail="Step not found")
+
+    if not check_tutorial_access(db_step.tutorial, user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to this tutorial"
+        )
+    return db_step
+
+
 @router.delete("/{tutorial_id}/steps/{step_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_step(tutorial_id: str, step_id: str, db: Session = Depends(get_db)):
+def delete_step(
+    tutorial_id: str,
+    step_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """Delete a step"""
     db_step = db.query(Step).filter(
         Step.id == step_id,
@@ -323,8 +469,11 @@ def delete_step(tutorial_id: str, step_id: str, db: Session = Depends(get_db)):
     if not db_step:
         raise HTTPException(status_code=404, detail="Step not found")
 
+    invalidate_renders(db, background_tasks, [db_step.id])
+    update_screenshot_refs(db, background_tasks, [db_step.screenshot_url], [])
     db.delete(db_step)
     db.commit()
+    invalidate_tags("tutorials", f"tutorial:{tutorial_id}")
     return None
 
 
@@ -372,6 +521,7 @@ def reorder_steps(
             db_step.order = order_mapping[db_step.id]
 
     db.commit()
+    invalidate_tags(f"tutorial:{tutorial_id}")
 
     # Return all steps ordered by the new order
     updated_steps = db.query(Step).filter(
@@ -1,29 +1,103 @@
+import asyncio
 import os
-import cloudinary
-import cloudinary.uploader
-from fastapi import APIRouter, File, UploadFile, HTTPException, Form
-from fastapi.responses import JSONResponse
-from PIL import Image
-import io
-from typing import Optional
-
-router = APIRouter()
-
-# Cloudinary configuration
-cloudinary_url = os.getenv("CLOUDINARY_URL")
-if cloudinary_url:
-    cloudinary.config(cloudinary_url=cloudinary_url)
-else:
-    cloudinary.config(
-        cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-        api_key=os.getenv("CLOUDINARY_API_KEY"),
-        api_secret=os.getenv("CLOUDINARY_API_SECRET"),
-    )
+from fastapi import APIRouter, BackgroundTasks, Depends, File, UploadFile, HTTPException, Form, Query, Request, status
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import Callable, List, Optional
+from ..database import SessionLocal, get_db
+from ..models import MediaAsset, MediaJob, Step
+from ..schemas.media import MediaJobResponse, UploadSessionCreate, UploadSessionResponse
+from ..services.image_processing import (
+    IMAGE_MAX_PENDING,
+    SCREENSHOT_PROCESSING,
+    SCREENSHOT_VARIANT_WIDTHS,
+    get_image_pool_stats
+)
+from ..services.media_assets import (
+    asset_public_id,
+    compute_asset_hash,
+    delete_asset_files,
+    find_asset,
+    register_asset,
+    release_asset,
+    update_asset_refs
+)
+from ..services.media_jobs import enqueue_media_job, enqueue_media_job_from_path
+from ..services.response_cache import invalidate_tags
+from ..services.screenshots import process_screenshot
+from ..services.storage import get_storage
+from ..services.videos import process_video
+from ..services.upload_sessions import close_session, create_session, get_active_session, write_chunk
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB for images
 MAX_VIDEO_SIZE = 100 * 1024 * 1024  # 100MB para vídeos
 ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 ALLOWED_VIDEO_EXTENSIONS = {".mp4", ".webm", ".mov", ".avi"}
+MAX_BATCH_FILES = 100
+MAX_BATCH_SIZE = 200 * 1024 * 1024  # Whole batch request
+# Screenshots of a batch processed at once; each one queues a pool job per variant width
+BATCH_CONCURRENCY = max(IMAGE_MAX_PENDING // len(SCREENSHOT_VARIANT_WIDTHS), 1)
+MULTIPART_OVERHEAD = 64 * 1024  # Form fields and boundaries around the file
+SCREENSHOT_FOLDER = "tutorial_system/screenshots"
+VIDEO_FOLDER = "tutorial_system/videos"
+
+
+def file_too_large(max_size: int) -> HTTPException:
+    """Build the error returned when an upload exceeds its size limit"""
+    return HTTPException(
+        status_code=400,
+        detail=f"File too large. Maximum size is {max_size / 1024 / 1024}MB"
+    )
+
+
+def max_upload_size(limit: int):
+    """Declare the maximum file size accepted by an upload endpoint"""
+    def decorator(func):
+        func.max_upload_size = limit
+        return func
+    return decorator
+
+
+class UploadSizeLimitRoute(APIRoute):
+    """Route that rejects oversized uploads while the body is still streaming in.
+
+    The multipart parser spools the file to disk in chunks before the endpoint
+    runs, so the limit is enforced on the raw body: first against the
+    Content-Length header, then against the running byte count.
+    """
+
+    def get_route_handler(self) -> Callable:
+        original_handler = super().get_route_handler()
+        max_size = getattr(self.endpoint, "max_upload_size", None)
+        if max_size is None:
+            return original_handler
+
+        body_limit = max_size + MULTIPART_OVERHEAD
+
+        async def size_limited_handler(request: Request) -> Response:
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > body_limit:
+                raise file_too_large(max_size)
+
+            received = 0
+            receive = request.receive
+
+            async def limited_receive():
+                nonlocal received
+                message = await receive()
+                received += len(message.get("body", b""))
+                if received > body_limit:
+                    raise file_too_large(max_size)
+                return message
+
+            return await original_handler(Request(request.scope, limited_receive))
+
+        return size_limited_handler
+
+
+router = APIRouter(route_class=UploadSizeLimitRoute)
 
 
 def get_file_extension(filename: str) -> str:
@@ -31,85 +105,173 @@ def get_file_extension(filename: str) -> str:
     return os.path.splitext(filename)[1].lower()
 
 
-def compress_image_in_memory(file_data: bytes, max_width: int = 1920) -> bytes:
-    """Compress and resize image in memory"""
-    img = Image.open(io.BytesIO(file_data))
-    
-    # Convert to RGB if necessary
-    if img.mode in ("RGBA", "P"):
-        img = img.convert("RGB")
+def build_public_id(folder: str, tutorial_title: Optional[str], step_order: Optional[int]) -> Optional[str]:
+    """Generate custom public_id based on tutorial and step"""
+    if not tutorial_title or step_order is None:
+        return None
+
+    # Sanitize tutorial title for use in filename
+    safe_title = "".join(c if c.isalnum() or c in ('-', '_') else '_' for c in tutorial_title)
+    safe_title = safe_title[:50]  # Limit length
+    return f"{folder}/{safe_title}_step_{step_order}"
+
+
+def get_step_or_404(db: Session, step_id: str) -> Step:
+    step = db.query(Step).filter(Step.id == step_id).first()
+    if not step:
+        raise HTTPException(status_code=404, detail="Step not found")
+    return step
+
+
+def job_accepted(job: MediaJob) -> JSONResponse:
+    """202 response pointing the client at the job status endpoint"""
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/upload/jobs/{job.id}"
+    })
 
-    # Resize if too large
-    if img.width > max_width:
-        ratio = max_width / img.width
-        new_height = int(img.height * ratio)
-        img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
 
-    # Save with optimization to bytes
-    output = io.BytesIO()
-    img.save(output, format="JPEG", optimize=True, quality=85)
-    return output.getvalue()
+def validate_image_filename(filename: str) -> None:
+    if get_file_extension(filename) not in ALLOWED_IMAGE_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_IMAGE_EXTENSIONS)}"
+        )
+
+
+def validate_video_filename(filename: str) -> None:
+    if get_file_extension(filename) not in ALLOWED_VIDEO_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_VIDEO_EXTENSIONS)}"
+        )
+
+
+def video_uploaded(result: dict, file_size: int) -> JSONResponse:
+    return JSONResponse(content={
+        "success": True,
+        "url": result.get("url"),
+        "public_id": result.get("public_id"),
+        "file_size": file_size,
+        "duration": result["metadata"]["duration"],
+        "width": result["metadata"]["width"],
+        "height": result["metadata"]["height"],
+        "format": result["metadata"]["format"],
+        "poster_url": result["poster_url"],
+        "metadata": result["metadata"]
+    })
+
+
+def asset_result(asset: MediaAsset, original_size: int) -> dict:
+    """Upload result for a screenshot served from media_assets"""
+    return {
+        "url": asset.url,
+        "public_id": asset.public_id,
+        "variants": asset.variants or [],
+        "original_size": original_size,
+        "compressed_size": asset.stored_size,
+        "compression_ratio": round((1 - (asset.stored_size or 0) / original_size) * 100, 2),
+        "deduplicated": True
+    }
+
+
+async def store_screenshot(db: Session, file_content: bytes, content_hash: str) -> dict:
+    """Render responsive variants in the worker pool, store them in parallel and record the asset"""
+    result = await process_screenshot(file_content, SCREENSHOT_FOLDER, asset_public_id(SCREENSHOT_FOLDER, content_hash))
+    compressed_size = result["bytes"]
+    await run_in_threadpool(register_asset, db, content_hash, result, original_size=len(file_content))
+
+    return {
+        "url": result.get("url"),
+        "public_id": result.get("public_id"),
+        "variants": result["variants"],
+        "original_size": len(file_content),
+        "compressed_size": compressed_size,
+        "compression_ratio": round((1 - compressed_size / len(file_content)) * 100, 2)
+    }
+
+
+def attach_screenshot(db: Session, step: Step, asset: MediaAsset) -> List[str]:
+    """Point a step at a stored screenshot; returns the files no step uses anymore"""
+    stale = update_asset_refs(db, [step.screenshot_url], [asset.url])
+    step.screenshot_url = asset.url
+    step.screenshot_variants = asset.variants
+    db.commit()
+    invalidate_tags(f"tutorial:{step.tutorial_id}")
+    return stale
+
+
+def get_upload_size(file: UploadFile) -> int:
+    """Get the size of a spooled upload without reading it into memory"""
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
 
 
 @router.post("/screenshot")
+@max_upload_size(MAX_FILE_SIZE)
 async def upload_screenshot(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     tutorial_title: Optional[str] = Form(None),
-    step_order: Optional[int] = Form(None)
+    step_order: Optional[int] = Form(None),
+    step_id: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
 ):
-    """Upload and process a screenshot to Cloudinary with optional custom naming"""
+    """Upload and process a screenshot to media storage.
 
-    # Validate file extension
-    file_ext = get_file_extension(file.filename)
-    if file_ext not in ALLOWED_IMAGE_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_IMAGE_EXTENSIONS)}"
-        )
+    Screenshots are stored under a public_id derived from their content, so
+    tutorial_title and step_order no longer name the file. Screenshots
+    already uploaded with the same processing settings are returned from
+    media_assets without being processed or stored again.
+    When step_id is given a new upload is processed in the background: the
+    response is 202 with a job id, and the step's screenshot_url is set once
+    the job finishes.
+    """
+
+    validate_image_filename(file.filename)
 
     try:
-        # Read file content
-        file_content = await file.read()
-        original_size = len(file_content)
+        # Check size before loading the image into memory
+        original_size = get_upload_size(file)
 
         if original_size > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size is {MAX_FILE_SIZE / 1024 / 1024}MB"
-            )
+            raise file_too_large(MAX_FILE_SIZE)
 
-        # Compress image in memory
-        compressed_content = compress_image_in_memory(file_content)
-        compressed_size = len(compressed_content)
-
-        # Generate custom public_id based on tutorial and step
-        upload_options = {
-            "resource_type": "image",
-            "folder": "tutorial_system/screenshots",
-            "format": "jpg"
-        }
-
-        if tutorial_title and step_order is not None:
-            # Sanitize tutorial title for use in filename
-            safe_title = "".join(c if c.isalnum() or c in ('-', '_') else '_' for c in tutorial_title)
-            safe_title = safe_title[:50]  # Limit length
-            custom_name = f"{safe_title}_step_{step_order}"
-            upload_options["public_id"] = f"tutorial_system/screenshots/{custom_name}"
-
-        # Upload to Cloudinary
-        result = cloudinary.uploader.upload(
-            io.BytesIO(compressed_content),
-            **upload_options
-        )
+        step = await run_in_threadpool(get_step_or_404, db, step_id) if step_id else None
 
-        return JSONResponse(content={
-            "success": True,
-            "url": result.get("secure_url"),
-            "public_id": result.get("public_id"),
-            "original_size": original_size,
-            "compressed_size": compressed_size,
-            "compression_ratio": round((1 - compressed_size / original_size) * 100, 2)
-        })
+        file_content = await file.read()
+        content_hash = await run_in_threadpool(compute_asset_hash, file_content, SCREENSHOT_PROCESSING)
+
+        # Same screenshot seen before: reuse it without any processing
+        asset = await run_in_threadpool(find_asset, db, content_hash)
+        if asset:
+            content = asset_result(asset, original_size)
+            if step:
+                stale = await run_in_threadpool(attach_screenshot, db, step, asset)
+                if stale:
+                    background_tasks.add_task(delete_asset_files, stale)
+            return JSONResponse(content={"success": True, **content})
+
+        if step:
+            job = await enqueue_media_job(
+                file.file,
+                kind="screenshot",
+                step_id=step_id,
+                params={
+                    "folder": SCREENSHOT_FOLDER,
+                    "public_id": asset_public_id(SCREENSHOT_FOLDER, content_hash),
+                    "content_hash": content_hash
+                },
+                original_filename=file.filename
+            )
+            return job_accepted(job)
+
+        result = await store_screenshot(db, file_content, content_hash)
+        return JSONResponse(content={"success": True, **result})
 
     except HTTPException:
         raise
@@ -117,62 +279,188 @@ async def upload_screenshot(
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
+@router.post("/screenshots/batch")
+@max_upload_size(MAX_BATCH_SIZE)
+async def upload_screenshots_batch(
+    files: List[UploadFile] = File(...),
+    step_orders: List[int] = Form([]),
+    tutorial_title: Optional[str] = Form(None)
+):
+    """Upload many screenshots in one request, e.g. every step of a recording.
+
+    step_orders, when given, has one entry per file in the same order and is
+    echoed back in each result so the client can match them to its steps. Screenshots are processed concurrently
+    across the image worker pool and each gets its own entry in `results`;
+    one bad file does not fail the others.
+    """
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many files. Maximum is {MAX_BATCH_FILES} per batch")
+    if step_orders and len(step_orders) != len(files):
+        raise HTTPException(status_code=400, detail="step_orders must have one entry per file")
+
+    orders = step_orders or [None] * len(files)
+    slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def upload_one(file: UploadFile, step_order: Optional[int]) -> dict:
+        entry = {"filename": file.filename, "step_order": step_order}
+        try:
+            validate_image_filename(file.filename)
+            original_size = get_upload_size(file)
+            if original_size > MAX_FILE_SIZE:
+                raise file_too_large(MAX_FILE_SIZE)
+
+            async with slots:
+                file_content = await file.read()
+                content_hash = await run_in_threadpool(compute_asset_hash, file_content, SCREENSHOT_PROCESSING)
+                # One session per file: the uploads run concurrently
+                db = SessionLocal()
+                try:
+                    asset = await run_in_threadpool(find_asset, db, content_hash)
+                    if asset:
+                        return {**entry, "success": True, **asset_result(asset, original_size)}
+
+                    result = await store_screenshot(db, file_content, content_hash)
+                    return {**entry, "success": True, **result}
+                finally:
+                    await run_in_threadpool(db.close)
+
+        except HTTPException as e:
+            return {**entry, "success": False, "error": e.detail}
+        except Exception as e:
+            return {**entry, "success": False, "error": f"Upload failed: {str(e)}"}
+
+    results = await asyncio.gather(*(upload_one(file, order) for file, order in zip(files, orders)))
+    succeeded = sum(1 for result in results if result["success"])
+
+    return JSONResponse(content={
+        "success": succeeded == len(results),
+        "uploaded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    })
+
+
 @router.post("/video")
+@max_upload_size(MAX_VIDEO_SIZE)
 async def upload_video(
     file: UploadFile = File(...),
     tutorial_title: Optional[str] = Form(None),
-    step_order: Optional[int] = Form(None)
+    step_order: Optional[int] = Form(None),
+    step_id: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
 ):
-    """Upload a video file to Cloudinary with optional custom naming"""
+    """Upload a video file to media storage with optional custom naming.
 
-    # Validate file extension
-    file_ext = get_file_extension(file.filename)
-    if file_ext not in ALLOWED_VIDEO_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_VIDEO_EXTENSIONS)}"
-        )
+    When step_id is given the upload is stored in the background and the
+    response is 202 with a job id, as for screenshots.
+    """
+
+    validate_video_filename(file.filename)
 
     try:
-        # Read file content
-        file_content = await file.read()
-        file_size = len(file_content)
+        # The video stays in its spooled temp file; only its size is checked here
+        file_size = get_upload_size(file)
 
         if file_size > MAX_VIDEO_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size is {MAX_VIDEO_SIZE / 1024 / 1024}MB"
+            raise file_too_large(MAX_VIDEO_SIZE)
+
+        public_id = build_public_id(VIDEO_FOLDER, tutorial_title, step_order)
+
+        if step_id:
+            await run_in_threadpool(get_step_or_404, db, step_id)
+            job = await enqueue_media_job(
+                file.file,
+                kind="video",
+                step_id=step_id,
+                params={"folder": VIDEO_FOLDER, "public_id": public_id, "filename": file.filename},
+                original_filename=file.filename
             )
+            return job_accepted(job)
+
+        # Upload straight from the temp file, then read metadata and a poster once
+        result = await process_video(file.file, VIDEO_FOLDER, public_id, file.filename)
+        return video_uploaded(result, file_size)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
+@router.post("/video/sessions", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+def create_video_upload_session(data: UploadSessionCreate, db: Session = Depends(get_db)):
+    """Start a resumable video upload.
+
+    Send the file in chunks with PUT /video/sessions/{id}?offset=N (raw bytes
+    as the body), starting at offset 0. After a failure, GET the session to
+    learn how many bytes arrived and continue from there. Finish with
+    POST /video/sessions/{id}/complete.
+    """
+    validate_video_filename(data.filename)
+    if data.size <= 0:
+        raise HTTPException(status_code=400, detail="Size must be positive")
+    if data.size > MAX_VIDEO_SIZE:
+        raise file_too_large(MAX_VIDEO_SIZE)
+    if data.step_id:
+        get_step_or_404(db, data.step_id)
+
+    return create_session(
+        db,
+        filename=data.filename,
+        size=data.size,
+        step_id=data.step_id,
+        tutorial_title=data.tutorial_title,
+        step_order=data.step_order
+    )
+
 
-        # Generate custom public_id based on tutorial and step
-        upload_options = {
-            "resource_type": "video",
-            "folder": "tutorial_system/videos"
-        }
-
-        if tutorial_title and step_order is not None:
-            # Sanitize tutorial title for use in filename
-            safe_title = "".join(c if c.isalnum() or c in ('-', '_') else '_' for c in tutorial_title)
-            safe_title = safe_title[:50]  # Limit length
-            custom_name = f"{safe_title}_step_{step_order}"
-            upload_options["public_id"] = f"tutorial_system/videos/{custom_name}"
-
-        # Upload to Cloudinary
-        result = cloudinary.uploader.upload(
-            io.BytesIO(file_content),
-            **upload_options
+@router.get("/video/sessions/{session_id}", response_model=UploadSessionResponse)
+def get_video_upload_session(session_id: str, db: Session = Depends(get_db)):
+    """Bytes received so far; the next chunk starts at `received`"""
+    return get_active_session(db, session_id)
+
+
+@router.put("/video/sessions/{session_id}", response_model=UploadSessionResponse)
+async def upload_video_chunk(
+    session_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    db: Session = Depends(get_db)
+):
+    """Write one chunk, streamed to disk as it arrives"""
+    session = await run_in_threadpool(get_active_session, db, session_id)
+    return await write_chunk(db, session, offset, request.stream())
+
+
+@router.post("/video/sessions/{session_id}/complete")
+async def complete_video_upload_session(session_id: str, db: Session = Depends(get_db)):
+    """Store the assembled video, or queue it when the session targets a step"""
+    session = await run_in_threadpool(get_active_session, db, session_id)
+    if session.received != session.size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Upload incomplete: received {session.received} of {session.size} bytes"
         )
 
-        return JSONResponse(content={
-            "success": True,
-            "url": result.get("secure_url"),
-            "public_id": result.get("public_id"),
-            "file_size": file_size,
-            "duration": result.get("duration"),
-            "width": result.get("width"),
-            "height": result.get("height"),
-            "format": result.get("format")
-        })
+    public_id = build_public_id(VIDEO_FOLDER, session.tutorial_title, session.step_order)
+
+    try:
+        if session.step_id:
+            job = await enqueue_media_job_from_path(
+                session.part_path,
+                kind="video",
+                step_id=session.step_id,
+                params={"folder": VIDEO_FOLDER, "public_id": public_id, "filename": session.filename},
+                original_filename=session.filename
+            )
+            await run_in_threadpool(close_session, db, session, remove_part=False)
+            return job_accepted(job)
+
+        with open(session.part_path, "rb") as video:
+            result = await process_video(video, VIDEO_FOLDER, public_id, session.filename)
+        file_size = session.size
+        await run_in_threadpool(close_session, db, session)
+        return video_uploaded(result, file_size)
 
     except HTTPException:
         raise
@@ -180,18 +468,43 @@ async def upload_video(
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
+@router.delete("/video/sessions/{session_id}")
+def cancel_video_upload_session(session_id: str, db: Session = Depends(get_db)):
+    """Abandon an upload and delete what was received"""
+    close_session(db, get_active_session(db, session_id))
+    return {"success": True, "message": "Upload session cancelled"}
+
+
+@router.get("/jobs/{job_id}", response_model=MediaJobResponse)
+def get_media_job(job_id: str, db: Session = Depends(get_db)):
+    """Status and progress of a background media job"""
+    job = db.query(MediaJob).filter(MediaJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/processing/stats")
+async def image_processing_stats():
+    """Image worker pool usage and per-job timings"""
+    return get_image_pool_stats()
+
+
 @router.delete("/screenshot/{public_id:path}")
-async def delete_screenshot(public_id: str):
-    """Delete a screenshot from Cloudinary"""
+async def delete_screenshot(public_id: str, db: Session = Depends(get_db)):
+    """Delete a screenshot from media storage once no other upload references it"""
     try:
         print(f"[DELETE SCREENSHOT] Attempting to delete: {public_id}")
-        result = cloudinary.uploader.destroy(
-            public_id,
-            resource_type="image"
-        )
-        print(f"[DELETE SCREENSHOT] Cloudinary result: {result}")
+        public_ids = await run_in_threadpool(release_asset, db, public_id)
+        if public_ids is None:
+            return {"success": True, "message": "Screenshot still used by a saved step; it is deleted once no step uses it"}
 
-        result_status = result.get("result")
+        storage = get_storage()
+        results = await asyncio.gather(*(
+            storage.delete(asset_id, resource_type="image") for asset_id in public_ids
+        ))
+        result_status = results[0]
+        print(f"[DELETE SCREENSHOT] Storage result: {result_status}")
 
         if result_status == "ok":
             return {"success": True, "message": "Screenshot deleted successfully"}
@@ -211,16 +524,14 @@ async def delete_screenshot(public_id: str):
 
 @router.delete("/video/{public_id:path}")
 async def delete_video(public_id: str):
-    """Delete a video from Cloudinary"""
+    """Delete a video from media storage"""
     try:
         print(f"[DELETE VIDEO] Attempting to delete: {public_id}")
-        result = cloudinary.uploader.destroy(
+        result_status = await get_storage().delete(
             public_id,
             resource_type="video"
         )
-        print(f"[DELETE VIDEO] Cloudinary result: {result}")
-
-        result_status = result.get("result")
+        print(f"[DELETE VIDEO] Storage result: {result_status}")
 
         if result_status == "ok":
             return {"success": True, "message": "Video deleted successfully"}
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.user import User, UserRole
 from ..models.tutorial import Tutorial, user_tutorial_access
 from ..schemas.user import (
@@ -18,6 +18,7 @@ from ..services.auth import (
     verify_password,
     require_role
 )
+from ..services.response_cache import invalidate_tags
 
 router = APIRouter()
 
@@ -26,7 +27,7 @@ router = APIRouter()
 async def list_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """List all users (Admin only)"""
@@ -37,7 +38,7 @@ async def list_users(
 @router.get("/{user_id}", response_model=UserWithTutorials)
 async def get_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user by ID"""
@@ -98,6 +99,7 @@ async def update_user(
             setattr(user, field, value)
 
     db.commit()
+    invalidate_tags(f"user:{user_id}")
     db.refresh(user)
 
     return user
@@ -125,6 +127,7 @@ async def delete_user(
 
     db.delete(user)
     db.commit()
+    invalidate_tags(f"user:{user_id}")
 
     return None
 
@@ -195,6 +198,7 @@ async def grant_tutorial_access(
             user.accessible_tutorials.append(tutorial)
 
     db.commit()
+    invalidate_tags(f"user:{user_id}")
 
     return {"message": f"Access granted to {len(tutorials)} tutorials"}
 
@@ -225,6 +229,7 @@ async def revoke_tutorial_access(
     if tutorial in user.accessible_tutorials:
         user.accessible_tutorials.remove(tutorial)
         db.commit()
+        invalidate_tags(f"user:{user_id}")
 
     return {"message": "Access revoked"}
 
@@ -232,7 +237,7 @@ async def revoke_tutorial_access(
 @router.get("/{user_id}/tutorials", response_model=List[str])
 async def get_user_accessible_tutorials(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of tutorial IDs user has access to"""
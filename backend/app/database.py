@@ -1,31 +1,215 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from bisect import bisect_left
 import os
+import time
 from dotenv import load_dotenv
+from fastapi import Request
 
 load_dotenv()
 
 # Support both SQLite (development) and PostgreSQL (production)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./tutorial_system.db")
+# Optional read replica for read-only endpoints (analytics, listings)
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+# After a client writes, its reads stay on the primary this long so they see the write
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+# Connection pool sizing (see .env.example)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections older than this are replaced on checkout instead of pinged;
+# keep it below the server's idle connection timeout
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+
+# SQLite tuning, applied to every new connection when DATABASE_URL is SQLite
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ms a writer waits for the lock
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+POOL_WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+_pool_stats = {
+    "checkouts": 0,
+    "timeouts": 0,
+    "connects": 0,
+    "total_wait_ms": 0.0,
+    "max_wait_ms": 0.0,
+    "wait_histogram": [0] * (len(POOL_WAIT_BUCKETS_MS) + 1),
+}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            _pool_stats["timeouts"] += 1
+            raise
+        waited_ms = (time.perf_counter() - started) * 1000
+        _pool_stats["checkouts"] += 1
+        _pool_stats["total_wait_ms"] += waited_ms
+        _pool_stats["max_wait_ms"] = max(_pool_stats["max_wait_ms"], waited_ms)
+        _pool_stats["wait_histogram"][bisect_left(POOL_WAIT_BUCKETS_MS, waited_ms)] += 1
+        return connection
+
+
+def _engine_options(url: str) -> dict:
+    # For SQLite: add check_same_thread=False
+    # For PostgreSQL: no special config needed
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if "sqlite" in url:
+        # Reads run outside transactions; a transaction only starts at the first
+        # write, with BEGIN IMMEDIATE, so writers queue on busy_timeout up front
+        # instead of failing to upgrade a read lock halfway through
+        options["connect_args"] = {"check_same_thread": False, "isolation_level": "IMMEDIATE"}
+        if ":memory:" in url or url.rstrip("/").endswith("sqlite:"):
+            # In-memory databases live in a single connection; keep SQLAlchemy's default pool
+            return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers proceed while one writer commits; NORMAL syncs only at checkpoints"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _count_connect(dbapi_connection, connection_record):
+    _pool_stats["connects"] += 1
+
+
+def create_db_engine(url: str):
+    """Engine with the pool settings above (and the SQLite profile for SQLite URLs)"""
+    db_engine = create_engine(url, **_engine_options(url))
+    event.listen(db_engine, "connect", _count_connect)
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", apply_sqlite_pragmas)
+    return db_engine
+
 
 # SQLAlchemy engine configuration
-# For SQLite: add check_same_thread=False
-# For PostgreSQL: no special config needed
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    pool_pre_ping=True  # Verify connections are valid before using them
-)
+engine = create_db_engine(DATABASE_URL)
+replica_engine = create_db_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
+
+
+class RoutingSession(Session):
+    """Session that sends its queries to the replica when use_replica is set.
+
+    Flushes always go to the primary, so a read-only session that ends up
+    writing does not write to the replica.
+    """
+    use_replica = False
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.use_replica and replica_engine is not None and not self._flushing:
+            return replica_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Client key -> monotonic time of its last committed write
+_recent_writes = {}
+
+
+def _client_key(request: Request) -> str:
+    # The bearer token identifies the user's session without a database lookup
+    return request.headers.get("authorization") or (request.client.host if request.client else "")
+
 
-def get_db():
+def _remember_write(session, key: str) -> None:
+    """Mark the client sticky to the primary when the session commits a write"""
+    def after_flush(session, flush_context):
+        session.info["wrote"] = True
+
+    def after_commit(session):
+        if session.info.pop("wrote", False):
+            now = time.monotonic()
+            for stale in [k for k, at in _recent_writes.items() if now - at > REPLICA_STICKY_SECONDS]:
+                del _recent_writes[stale]
+            _recent_writes[key] = now
+
+    event.listen(session, "after_flush", after_flush)
+    event.listen(session, "after_commit", after_commit)
+
+
+def get_db(request: Request):
     db = SessionLocal()
+    if replica_engine is not None:
+        _remember_write(db, _client_key(request))
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """Session for read-only endpoints: the replica, unless this client wrote recently"""
+    db = SessionLocal()
+    if replica_engine is not None:
+        key = _client_key(request)
+        wrote_at = _recent_writes.get(key)
+        db.use_replica = wrote_at is None or time.monotonic() - wrote_at > REPLICA_STICKY_SECONDS
+        _remember_write(db, key)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_pool_stats() -> dict:
+    """Live pool state plus checkout wait statistics since startup"""
+    pool = engine.pool
+    checkouts = _pool_stats["checkouts"]
+    histogram = {
+        f"le_{bound}ms": count
+        for bound, count in zip(POOL_WAIT_BUCKETS_MS, _pool_stats["wait_histogram"])
+    }
+    histogram["gt_%dms" % POOL_WAIT_BUCKETS_MS[-1]] = _pool_stats["wait_histogram"][-1]
+
+    return {
+        "pool": type(pool).__name__,
+        "size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout_s": DB_POOL_TIMEOUT,
+        "recycle_s": DB_POOL_RECYCLE,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        "checkouts": checkouts,
+        "timeouts": _pool_stats["timeouts"],
+        "connects": _pool_stats["connects"],
+        "avg_wait_ms": round(_pool_stats["total_wait_ms"] / checkouts, 3) if checkouts else 0,
+        "max_wait_ms": round(_pool_stats["max_wait_ms"], 3),
+        "wait_histogram": histogram,
+        "replica": {
+            "checked_out": replica_engine.pool.checkedout(),
+            "overflow": replica_engine.pool.overflow(),
+        } if replica_engine is not None and hasattr(replica_engine.pool, "overflow") else None,
+    }
@@ -1,9 +1,19 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from .database import engine, Base
-from .api import tutorials, analytics, upload, auth, users
+from fastapi.responses import PlainTextResponse
+from .api import tutorials, analytics, upload, auth, users, media, metrics
+from .database import get_pool_stats
+from .services.auth import require_metrics_access
+from .services.compression import COMPRESSION_ENABLED, CompressionMiddleware, get_compression_stats
+from .services.response_cache import get_response_cache_stats
+from .services.json_response import FastJSONResponse
+from .services.image_processing import start_image_pool, shutdown_image_pool, get_image_pool_stats
+from .services.metrics import METRICS_ENABLED, MetricsMiddleware, instrument_sql, render_metrics
+from .services.spa import AssetFiles, SPAIndex
+from .services.sql_profiler import SQL_PROFILE, SQLProfilerMiddleware, install_profiler
+from .services.media_jobs import start_media_workers, stop_media_workers
+from .services.storage import STORAGE_BACKEND, MEDIA_URL
+from .services.upload_sessions import start_upload_session_gc, stop_upload_session_gc
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -11,13 +21,14 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Tables are created and updated by migrate_schema.py, run once before the
+# server starts (see Procfile), not by every worker at import
 
 app = FastAPI(
     title="Tutorial System API",
     description="API for interactive tutorial creation and tracking",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # CORS configuration - allow Railway frontend and local development
@@ -31,12 +42,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for text and JSON; inside the metrics middleware so its
+# latency includes compression and its sizes are bytes on the wire
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Request, SQL, image and storage metrics for GET /metrics
+if METRICS_ENABLED:
+    instrument_sql()
+    app.add_middleware(MetricsMiddleware)
+
+# Per-request query profiling and N+1 detection (development / diagnosis)
+if SQL_PROFILE:
+    install_profiler()
+    app.add_middleware(SQLProfilerMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(tutorials.router, prefix="/api/tutorials", tags=["tutorials"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 app.include_router(upload.router, prefix="/api/upload", tags=["upload"])
+app.include_router(
+    metrics.router, prefix="/api/metrics", tags=["metrics"], dependencies=[Depends(require_metrics_access)]
+)
+
+# Locally stored media is served by the app itself
+if STORAGE_BACKEND == "local":
+    app.include_router(media.router, prefix=MEDIA_URL, tags=["media"])
+
+
+@app.on_event("startup")
+async def start_background_workers():
+    # Start image workers before the first upload arrives
+    start_image_pool()
+    start_media_workers()
+    start_upload_session_gc()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await stop_upload_session_gc()
+    await stop_media_workers()
+    shutdown_image_pool()
 
 
 @app.get("/health")
@@ -44,6 +92,31 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get(
+    "/metrics", response_class=PlainTextResponse, include_in_schema=False,
+    dependencies=[Depends(require_metrics_access)]
+)
+def prometheus_metrics():
+    """Metrics in the Prometheus text exposition format"""
+    pool = get_pool_stats()
+    image_pool = get_image_pool_stats()
+    compression = get_compression_stats()
+    response_cache = get_response_cache_stats()
+    return PlainTextResponse(
+        render_metrics({
+            "db_pool_checked_out": ("Database connections in use", pool["checked_out"] or 0),
+            "db_pool_overflow": ("Database connections above the pool size", max(pool["overflow"] or 0, 0)),
+            "image_jobs_in_flight": ("Image jobs running in the worker pool", image_pool["in_flight"]),
+            "compression_cache_bytes": ("Compressed response bodies kept for reuse", compression["bytes"]),
+            "compression_cache_hits": ("Responses served from the compressed body cache", compression["hits"]),
+            "response_cache_hits": ("Read responses served from the response cache", response_cache["hits"]),
+            "response_cache_misses": ("Read responses computed and stored in the response cache", response_cache["misses"]),
+            "response_cache_coalesced": ("Requests that waited for a concurrent identical request", response_cache["coalesced"]),
+        }),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
 # Serve frontend static files in production
 frontend_dist = Path(__file__).parent.parent.parent / "frontend" / "dist"
 
@@ -51,22 +124,25 @@ print(f"[INFO] Looking for frontend at: {frontend_dist}")
 print(f"[INFO] Frontend exists: {frontend_dist.exists()}")
 
 if frontend_dist.exists():
-    # Mount static files
-    app.mount("/assets", StaticFiles(directory=str(frontend_dist / "assets")), name="assets")
+    # Hashed Vite assets: immutable caching and precompressed .br/.gz sidecars
+    app.mount("/assets", AssetFiles(directory=str(frontend_dist / "assets")), name="assets")
+    spa_index = SPAIndex(frontend_dist)
 
     # Serve index.html for all frontend routes (including root)
-    @app.get("/{full_path:path}")
-    async def serve_frontend(full_path: str):
-        # Don't serve frontend for API routes
+    @app.get("/{full_path:path}", include_in_schema=False)
+    async def serve_frontend(full_path: str, request: Request):
+        # Unknown API paths are real 404s, not the SPA
         if full_path.startswith("api/") or full_path.startswith("docs") or full_path.startswith("openapi.json") or full_path.startswith("health"):
-            return {"detail": "Not found"}
+            raise HTTPException(status_code=404, detail="Not found")
 
-        # Serve index.html for all other routes (SPA)
-        index_file = frontend_dist / "index.html"
-        if index_file.exists():
-            return FileResponse(index_file)
+        public_file = spa_index.public_file(full_path)
+        if public_file is not None:
+            return public_file
 
-        return {"detail": "Frontend not built"}
+        # Serve index.html (held in memory) for all other routes (SPA)
+        if spa_index.body is None:
+            raise HTTPException(status_code=404, detail="Frontend not built")
+        return spa_index.response(request.headers.get("if-none-match"))
 else:
     # Fallback API response when frontend is not built
     @app.get("/")
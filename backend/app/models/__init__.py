@@ -1,5 +1,6 @@
 from .tutorial import Tutorial, Step, Annotation, user_tutorial_access
 from .user import User, UserRole
 from .progress import Progress
+from .media import MediaJob, MediaAsset, UploadSession, AnnotatedRender
 
-__all__ = ["Tutorial", "Step", "Annotation", "User", "UserRole", "Progress", "user_tutorial_access"]
+__all__ = ["Tutorial", "Step", "Annotation", "User", "UserRole", "Progress", "MediaJob", "MediaAsset", "UploadSession", "AnnotatedRender", "user_tutorial_access"]
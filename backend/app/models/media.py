@@ -0,0 +1,69 @@
+from sqlalchemy import Column, String, Integer, Text, JSON, DateTime
+from datetime import datetime
+import uuid
+from ..database import Base
+
+
+class MediaJob(Base):
+    __tablename__ = "media_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String(50), nullable=False)  # screenshot, video
+    status = Column(String(50), default="pending", index=True)  # pending, processing, done, failed
+    progress = Column(Integer, default=0)  # 0-100
+    step_id = Column(String, index=True)  # Step updated when the job finishes (no FK: steps get recreated)
+    source_path = Column(String(500))  # Raw upload persisted on disk
+    original_filename = Column(String(255))
+    params = Column(JSON, default=dict)  # folder, public_id, format for the storage backend
+    result = Column(JSON)  # url, public_id, sizes
+    error = Column(Text)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+
+class MediaAsset(Base):
+    __tablename__ = "media_assets"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    content_hash = Column(String(64), unique=True, nullable=False, index=True)  # sha256 of raw bytes + processing params
+    public_id = Column(String(500), nullable=False, index=True)
+    url = Column(String(500), nullable=False, index=True)
+    variants = Column(JSON)  # [{url, public_id, width, height, format, bytes}]
+    resource_type = Column(String(50), default="image")
+    original_size = Column(Integer)
+    stored_size = Column(Integer)
+    ref_count = Column(Integer, default=1)  # Uploads currently pointing at this asset
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String(50), nullable=False, default="video")
+    status = Column(String(50), default="active", index=True)  # active, complete
+    filename = Column(String(255), nullable=False)
+    size = Column(Integer, nullable=False)  # Total bytes the client will send
+    received = Column(Integer, default=0)  # Bytes on disk; the next chunk starts here
+    part_path = Column(String(500))  # Partial file being assembled
+    step_id = Column(String)
+    tutorial_title = Column(String(200))
+    step_order = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, index=True)  # Pushed forward by every chunk
+
+
+class AnnotatedRender(Base):
+    __tablename__ = "annotated_renders"
+
+    hash = Column(String(64), primary_key=True)  # sha256 of screenshot URL + annotation set
+    step_id = Column(String, index=True)  # Step rendered (no FK: steps get recreated)
+    public_id = Column(String(500), nullable=False)
+    url = Column(String(500), nullable=False)
+    width = Column(Integer)
+    height = Column(Integer)
+    bytes = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -44,7 +44,10 @@ class Step(Base):
     order = Column(Integer, nullable=False)
     title = Column(String(255), nullable=False)
     screenshot_url = Column(String(500))
+    screenshot_variants = Column(JSON)  # [{url, width, height, format, bytes}] for srcset
     video_url = Column(String(500))  # URL do vídeo
+    video_poster_url = Column(String(500))  # Frame shown before the video plays
+    video_metadata = Column(JSON)  # {duration, width, height, codec, bytes, format} read at upload
     content = Column(Text)  # Rich text HTML from TipTap
     validation_required = Column(Boolean, default=False)
     validation_type = Column(String(50))  # click, input, selection
@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+
+class MediaJobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    progress: int
+    step_id: Optional[str]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int
+    tutorial_title: Optional[str] = None
+    step_order: Optional[int] = None
+    step_id: Optional[str] = None
+
+
+class UploadSessionResponse(BaseModel):
+    id: str
+    status: str
+    filename: str
+    size: int
+    received: int
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -20,11 +20,32 @@ class AnnotationResponse(AnnotationCreate):
         from_attributes = True
 
 
+class ScreenshotVariant(BaseModel):
+    url: str
+    width: int
+    height: int
+    format: str = Field(..., description="webp, jpg")
+    bytes: Optional[int] = None
+    public_id: Optional[str] = None
+
+
+class VideoMetadata(BaseModel):
+    duration: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    codec: Optional[str] = None
+    bytes: Optional[int] = None
+    format: Optional[str] = None
+
+
 class StepCreate(BaseModel):
     order: int
     title: str
     screenshot_url: Optional[str] = None
+    screenshot_variants: Optional[List[ScreenshotVariant]] = None
     video_url: Optional[str] = None
+    video_poster_url: Optional[str] = None
+    video_metadata: Optional[VideoMetadata] = None
     content: Optional[str] = None
     validation_required: bool = False
     validation_type: Optional[str] = None
@@ -36,7 +57,10 @@ class StepUpdate(BaseModel):
     order: Optional[int] = None
     title: Optional[str] = None
     screenshot_url: Optional[str] = None
+    screenshot_variants: Optional[List[ScreenshotVariant]] = None
     video_url: Optional[str] = None
+    video_poster_url: Optional[str] = None
+    video_metadata: Optional[VideoMetadata] = None
     content: Optional[str] = None
     validation_required: Optional[bool] = None
     validation_type: Optional[str] = None
@@ -50,7 +74,10 @@ class StepResponse(BaseModel):
     order: int
     title: str
     screenshot_url: Optional[str]
+    screenshot_variants: Optional[List[ScreenshotVariant]] = None
     video_url: Optional[str]
+    video_poster_url: Optional[str] = None
+    video_metadata: Optional[VideoMetadata] = None
     content: Optional[str]
     validation_required: bool
     validation_type: Optional[str]
@@ -0,0 +1,173 @@
+"""
+Annotated screenshot renders
+
+A step's screenshot with its annotations drawn in, for exports, thumbnails
+and clients too slow to animate many overlays. Renders are stored like any
+other image and recorded in annotated_renders under a hash of the screenshot
+URL and the annotation set, so a render is produced once per distinct
+combination and reused until either changes.
+
+When a step's annotations or screenshot change (or the step is deleted), its
+renders are invalidated: rows are dropped right away and the stored files
+are deleted in the background.
+"""
+import asyncio
+import hashlib
+import io
+import json
+from typing import Iterable, List, Optional, Tuple
+
+import anyio
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import AnnotatedRender, Step
+from .image_processing import render_annotated_screenshot, run_image_job
+from .storage import get_storage
+
+ANNOTATED_FOLDER = "tutorial_system/annotated"
+# Bump when the drawing code changes so old renders are not reused
+RENDER_VERSION = 1
+
+
+def annotation_set_hash(screenshot_url: str, annotations: Iterable) -> str:
+    """Hash of everything that affects the rendered image (not animation or delay)"""
+    drawn = sorted(
+        (
+            {
+                "type": annotation.type,
+                "coordinates": annotation.coordinates,
+                "text": annotation.text,
+                "style": annotation.style,
+            }
+            for annotation in annotations
+        ),
+        key=lambda item: json.dumps(item, sort_keys=True)
+    )
+    payload = json.dumps({"v": RENDER_VERSION, "screenshot": screenshot_url, "annotations": drawn}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _find_render(db: Session, step: Step) -> Tuple[str, List[dict], Optional[dict]]:
+    """Render hash, annotations to draw and the stored render if any (runs in a worker thread)"""
+    render_hash = annotation_set_hash(step.screenshot_url, step.annotations)
+    annotations = [
+        {"type": a.type, "coordinates": a.coordinates, "text": a.text, "style": a.style}
+        for a in step.annotations
+    ]
+    cached = db.query(AnnotatedRender).filter(AnnotatedRender.hash == render_hash).first()
+    return render_hash, annotations, render_entry(cached) if cached else None
+
+
+def _record_render(db: Session, step_id: str, render_hash: str, stored: dict, rendered: dict) -> Tuple[dict, List[str]]:
+    """Save a new render; returns it and the step's stale renders (runs in a worker thread)"""
+    # Renders for an older annotation set of this step are stale now
+    stale = invalidate_annotated_renders(db, [step_id], commit=False)
+    db.flush()
+    render = AnnotatedRender(
+        hash=render_hash,
+        step_id=step_id,
+        public_id=stored["public_id"],
+        url=stored["url"],
+        width=rendered["width"],
+        height=rendered["height"],
+        bytes=len(rendered["data"])
+    )
+    db.add(render)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Rendered concurrently by another request; same content, keep theirs
+        db.rollback()
+        render = db.query(AnnotatedRender).filter(AnnotatedRender.hash == render_hash).first()
+        stale = []
+    return render_entry(render), stale
+
+
+async def get_annotated_render(db: Session, step: Step, background_tasks: BackgroundTasks) -> dict:
+    """Stored render for the step's current screenshot and annotations, rendering it if needed.
+
+    Database work runs in worker threads; the event loop only waits on
+    storage and the image pool.
+    """
+    if not step.screenshot_url:
+        raise HTTPException(status_code=400, detail="Step has no screenshot")
+
+    storage = get_storage()
+    render_hash, annotations, cached = await anyio.to_thread.run_sync(_find_render, db, step)
+    if cached:
+        return {**cached, "cached": True}
+
+    source_id = storage.public_id_from_url(step.screenshot_url)
+    if not source_id:
+        raise HTTPException(status_code=400, detail="Screenshot is not in media storage")
+    try:
+        source = await storage.get(source_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Screenshot file not found")
+
+    rendered = await run_image_job(render_annotated_screenshot, source, annotations)
+    stored = await storage.put(
+        io.BytesIO(rendered["data"]),
+        resource_type="image",
+        folder=ANNOTATED_FOLDER,
+        public_id=f"{ANNOTATED_FOLDER}/{render_hash}",
+        format="jpg"
+    )
+
+    entry, stale = await anyio.to_thread.run_sync(_record_render, db, step.id, render_hash, stored, rendered)
+    if stale:
+        background_tasks.add_task(delete_render_files, stale)
+    return {**entry, "cached": False}
+
+
+def render_entry(render: AnnotatedRender) -> dict:
+    return {
+        "url": render.url,
+        "public_id": render.public_id,
+        "hash": render.hash,
+        "width": render.width,
+        "height": render.height,
+        "bytes": render.bytes,
+    }
+
+
+def invalidate_annotated_renders(db: Session, step_ids: List[str], commit: bool = True) -> List[str]:
+    """Forget the renders of these steps and return their public_ids for deletion"""
+    if not step_ids:
+        return []
+    renders = db.query(AnnotatedRender).filter(AnnotatedRender.step_id.in_(step_ids)).all()
+    public_ids = [render.public_id for render in renders]
+    for render in renders:
+        db.delete(render)
+    if commit:
+        db.commit()
+    return public_ids
+
+
+def _unreferenced(public_ids: List[str]) -> List[str]:
+    # Renders keyed by content can be recreated under the same public_id
+    db = SessionLocal()
+    try:
+        in_use = {
+            public_id for (public_id,) in
+            db.query(AnnotatedRender.public_id).filter(AnnotatedRender.public_id.in_(public_ids))
+        }
+    finally:
+        db.close()
+    return [public_id for public_id in public_ids if public_id not in in_use]
+
+
+async def delete_render_files(public_ids: List[str]) -> None:
+    """Remove invalidated renders from storage (run as a background task)"""
+    public_ids = await anyio.to_thread.run_sync(_unreferenced, public_ids)
+    storage = get_storage()
+    results = await asyncio.gather(
+        *(storage.delete(public_id, resource_type="image") for public_id in public_ids),
+        return_exceptions=True
+    )
+    for public_id, result in zip(public_ids, results):
+        if isinstance(result, Exception):
+            print(f"[ANNOTATED RENDER] Could not delete {public_id}: {result}")
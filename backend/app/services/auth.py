@@ -1,15 +1,16 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 import os
+import secrets
 from dotenv import load_dotenv
 
 from ..database import get_db
-from ..models.user import User
+from ..models.user import User, UserRole
 from ..schemas.user import TokenData
 
 load_dotenv()
@@ -18,19 +19,27 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+# Static bearer token for metrics scrapers (Prometheus); admins can always log in
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Password hashing context, built on the first login instead of at startup"""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Generate a hashed password"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -62,11 +71,15 @@ def decode_access_token(token: str) -> Optional[TokenData]:
         return None
 
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
-    """Get the current authenticated user from the token"""
+    """Get the current authenticated user from the token
+
+    Plain def on purpose: the user lookup blocks on the database, so FastAPI
+    must run it in the threadpool, not on the event loop.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -109,3 +122,18 @@ def require_role(allowed_roles: list):
             )
         return current_user
     return role_checker
+
+
+def require_metrics_access(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> None:
+    """Dependency for metrics endpoints: the METRICS_TOKEN bearer token or an admin user"""
+    if METRICS_TOKEN and secrets.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        return
+
+    if get_current_user(token, db).role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
@@ -0,0 +1,343 @@
+"""
+Cloudinary storage backend
+
+Kept apart from storage.py so the cloudinary SDK (and urllib3/certifi behind
+it) is only imported when STORAGE_BACKEND is "cloudinary", on the first
+get_storage() call rather than at app startup.
+
+The SDK is used for configuration, request signing and URL building only.
+HTTP requests go through a connection pool owned by CloudinaryClient, so pool
+size, timeouts and retries are under our control for both the Upload and the
+Admin API, without patching SDK internals.
+"""
+import asyncio
+import functools
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, List, Optional
+from urllib.parse import quote
+
+import anyio
+import cloudinary
+import urllib3
+from cloudinary import utils as cloudinary_utils
+from cloudinary.exceptions import Error as CloudinaryError, NotFound
+from urllib3 import Timeout
+from urllib3.exceptions import HTTPError
+
+from .metrics import timed
+from .storage import (
+    STORAGE_CONNECT_TIMEOUT,
+    STORAGE_MAX_CONCURRENCY,
+    STORAGE_RETRIES,
+    STORAGE_RETRY_BACKOFF,
+    STORAGE_TIMEOUT,
+    UPLOAD_LARGE_CHUNK_SIZE,
+    StorageBackend,
+)
+
+CLOUDINARY_LIST_PAGE_SIZE = 500  # Admin API maximum
+CLOUDINARY_URL_PATTERN = re.compile(r"/(?:image|video|raw)/upload/(?:v\d+/)?([^?#]+?)(?:\.\w+)?(?:[?#].*)?$")
+
+# Responses worth retrying: rate limits (420 is Cloudinary's) and server errors
+TRANSIENT_STATUSES = {420, 429}
+
+
+class TransientCloudinaryError(CloudinaryError):
+    """A failed call that may succeed if sent again"""
+
+
+def configure_cloudinary() -> None:
+    """Load credentials from the environment"""
+    # Re-reads CLOUDINARY_URL, which the SDK only parses when (re)configured
+    cloudinary.reset_config()
+    if not os.getenv("CLOUDINARY_URL"):
+        cloudinary.config(
+            cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+            api_key=os.getenv("CLOUDINARY_API_KEY"),
+            api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+        )
+
+    upload_prefix = os.getenv("CLOUDINARY_UPLOAD_PREFIX")
+    if upload_prefix:
+        cloudinary.config(upload_prefix=upload_prefix)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Check whether a failed call is worth retrying"""
+    return isinstance(error, (TransientCloudinaryError, HTTPError, OSError, TimeoutError))
+
+
+def parse_response(response: urllib3.HTTPResponse) -> dict:
+    """Decode an API response, raising on errors"""
+    if response.status in TRANSIENT_STATUSES or response.status >= 500:
+        raise TransientCloudinaryError(f"HTTP {response.status}")
+    try:
+        result = json.loads(response.data.decode("utf-8"))
+    except ValueError:
+        raise TransientCloudinaryError(f"Unreadable response (HTTP {response.status})")
+
+    if "error" in result:
+        message = result["error"].get("message", "Unknown error")
+        if response.status == 404:
+            raise NotFound(message)
+        raise CloudinaryError(message)
+    return result
+
+
+class CloudinaryClient:
+    """Non-blocking Cloudinary API client with its own connection pool"""
+
+    def __init__(
+        self,
+        max_concurrency: int = STORAGE_MAX_CONCURRENCY,
+        retries: int = STORAGE_RETRIES,
+        retry_backoff: float = STORAGE_RETRY_BACKOFF
+    ):
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+        # One keep-alive connection per concurrent call, blocking instead of
+        # opening extras, and no urllib3 retries since _call() retries
+        self.http = cloudinary_utils.get_http_connector(
+            cloudinary.config(),
+            dict(
+                cloudinary.CERT_KWARGS,
+                maxsize=max_concurrency,
+                block=True,
+                retries=False,
+                timeout=Timeout(connect=STORAGE_CONNECT_TIMEOUT, read=STORAGE_TIMEOUT),
+            )
+        )
+
+    @property
+    def limiter(self) -> anyio.CapacityLimiter:
+        # Created on first use, since anyio needs a running event loop
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.max_concurrency)
+        return self._limiter
+
+    async def _call(self, func: Callable, *args: Any, rewind: Optional[BinaryIO] = None, **kwargs: Any) -> Any:
+        """Run a blocking request in a thread, retrying transient failures"""
+        attempt = 0
+        while True:
+            try:
+                return await anyio.to_thread.run_sync(
+                    functools.partial(func, *args, **kwargs),
+                    limiter=self.limiter
+                )
+            except Exception as e:
+                if attempt >= self.retries or not is_transient_error(e):
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                attempt += 1
+                print(f"[STORAGE] {func.__name__} failed ({e}), retry {attempt}/{self.retries} in {delay}s")
+                await asyncio.sleep(delay)
+                if rewind is not None:
+                    rewind.seek(0)
+
+    def _upload_api(self, action: str, params: dict, file: Any = None,
+                    http_headers: Optional[dict] = None, **options: Any) -> dict:
+        """Signed multipart POST to the Upload API (blocking)"""
+        fields = [
+            (f"{key}[]" if isinstance(value, list) else key, item)
+            for key, value in cloudinary_utils.sign_request(params, options).items()
+            for item in (value if isinstance(value, list) else [value])
+            if item
+        ]
+        if file is not None:
+            fields.append(("file", file))
+
+        headers = {"User-Agent": cloudinary.get_user_agent(), **(http_headers or {})}
+        response = self.http.request(
+            "POST", cloudinary_utils.cloudinary_api_url(action, **options), fields=fields, headers=headers
+        )
+        return parse_response(response)
+
+    def _admin_api(self, method: str, path: List[str], params: Optional[list] = None) -> dict:
+        """Basic-auth request to the Admin API (blocking)"""
+        config = cloudinary.config()
+        headers = urllib3.make_headers(
+            basic_auth=f"{config.api_key}:{config.api_secret}",
+            user_agent=cloudinary.get_user_agent()
+        )
+        url = cloudinary_utils.base_api_url([quote(part) for part in path])
+        return parse_response(self.http.request(method, url, fields=params, headers=headers))
+
+    def _fetch(self, url: str) -> Optional[bytes]:
+        response = self.http.request("GET", url)
+        if response.status == 404:
+            return None
+        if response.status in TRANSIENT_STATUSES or response.status >= 500:
+            raise TransientCloudinaryError(f"HTTP {response.status}")
+        return response.data
+
+    def _upload(self, file: BinaryIO, **options: Any) -> dict:
+        name = options.get("filename") or (file.name if isinstance(getattr(file, "name", None), str) else "stream")
+        return self._upload_api(
+            "upload", cloudinary_utils.build_upload_params(**options), file=(name, file.read()), **options
+        )
+
+    async def upload(self, file: BinaryIO, **options: Any) -> dict:
+        """Upload a file-like object in a single request"""
+        return await self._call(self._upload, file, rewind=file, **options)
+
+    async def upload_large(self, file: BinaryIO, chunk_size: int, **options: Any) -> dict:
+        """Upload a file-like object in chunks.
+
+        Each chunk is read and sent in a worker thread and retried on its
+        own, so a failure near the end does not restart the whole upload.
+        """
+        upload_id = cloudinary_utils.random_public_id()
+        file_size = cloudinary_utils.file_io_size(file)
+        options.setdefault("resource_type", "raw")
+        offset = 0
+        result = None
+
+        while offset < file_size:
+            http_headers = {
+                "Content-Range": f"bytes {offset}-{min(offset + chunk_size, file_size) - 1}/{file_size}",
+                "X-Unique-Upload-Id": upload_id,
+            }
+            result = await self._call(
+                self._upload_chunk, file, offset, chunk_size,
+                http_headers=http_headers, **options
+            )
+            options["public_id"] = result.get("public_id")
+            offset += chunk_size
+
+        return result
+
+    def _upload_chunk(self, file: BinaryIO, offset: int, chunk_size: int,
+                      http_headers: dict, **options: Any) -> dict:
+        file.seek(offset)
+        chunk = file.read(chunk_size)
+        return self._upload_api(
+            "upload", cloudinary_utils.build_upload_params(**options),
+            file=("stream", chunk), http_headers=http_headers, **options
+        )
+
+    async def destroy(self, public_id: str, **options: Any) -> dict:
+        """Delete an asset"""
+        params = {
+            "timestamp": cloudinary_utils.now(),
+            "type": options.get("type"),
+            "invalidate": options.get("invalidate"),
+            "public_id": public_id,
+        }
+        return await self._call(self._upload_api, "destroy", params, **options)
+
+    async def fetch(self, url: str) -> Optional[bytes]:
+        """Download a delivery URL, None if it does not exist"""
+        return await self._call(self._fetch, url)
+
+    async def resource(self, public_id: str, resource_type: str = "image", type: str = "upload") -> dict:
+        """Admin API details of one asset"""
+        return await self._call(self._admin_api, "GET", ["resources", resource_type, type, public_id])
+
+    async def resources(self, resource_type: str = "image", type: str = "upload", **options: Any) -> dict:
+        """One page of the Admin API resource listing"""
+        params = [(key, value) for key, value in options.items() if value is not None]
+        return await self._call(self._admin_api, "GET", ["resources", resource_type, type], params)
+
+    async def delete_resources(self, public_ids: List[str], resource_type: str = "image",
+                               type: str = "upload") -> dict:
+        """Delete up to 100 assets in one Admin API call"""
+        params = [("public_ids[]", public_id) for public_id in public_ids]
+        return await self._call(self._admin_api, "DELETE", ["resources", resource_type, type], params)
+
+
+class CloudinaryStorage(StorageBackend):
+    """Assets stored on Cloudinary"""
+
+    def __init__(self, client: Optional[CloudinaryClient] = None):
+        configure_cloudinary()
+        self.client = client or CloudinaryClient()
+
+    @timed("storage")
+    async def put(self, file, *, resource_type, folder, public_id=None, format=None, filename=None):
+        upload_options = {"resource_type": resource_type, "folder": folder}
+        if public_id:
+            upload_options["public_id"] = public_id
+        if format:
+            upload_options["format"] = format
+
+        # Videos are sent in chunks straight from their temp file
+        if resource_type == "video":
+            result = await self.client.upload_large(file, chunk_size=UPLOAD_LARGE_CHUNK_SIZE, **upload_options)
+        else:
+            result = await self.client.upload(file, **upload_options)
+
+        return {
+            **result,
+            "public_id": result.get("public_id"),
+            "url": result.get("secure_url"),
+            "bytes": result.get("bytes"),
+        }
+
+    @timed("storage")
+    async def get(self, public_id, resource_type="image"):
+        data = await self.client.fetch(self.url(public_id, resource_type))
+        if data is None:
+            raise FileNotFoundError(public_id)
+        return data
+
+    @timed("storage")
+    async def delete(self, public_id, resource_type="image"):
+        result = await self.client.destroy(public_id, resource_type=resource_type)
+        return result.get("result")
+
+    def url(self, public_id, resource_type="image"):
+        return cloudinary_utils.cloudinary_url(public_id, resource_type=resource_type, secure=True)[0]
+
+    @timed("storage")
+    async def stat(self, public_id, resource_type="image"):
+        try:
+            resource = await self.client.resource(public_id, resource_type=resource_type)
+        except NotFound:
+            return None
+        return {
+            "public_id": resource.get("public_id"),
+            "bytes": resource.get("bytes"),
+            "format": resource.get("format"),
+            "width": resource.get("width"),
+            "height": resource.get("height"),
+            "created_at": resource.get("created_at"),
+        }
+
+    @timed("storage")
+    async def list(self, folder, resource_type="image"):
+        assets = []
+        options = {"type": "upload", "resource_type": resource_type, "prefix": f"{folder}/",
+                   "max_results": CLOUDINARY_LIST_PAGE_SIZE}
+        while True:
+            page = await self.client.resources(**options)
+            for resource in page.get("resources", []):
+                assets.append({
+                    "public_id": resource["public_id"],
+                    "bytes": resource.get("bytes"),
+                    "created_at": datetime.strptime(resource["created_at"], "%Y-%m-%dT%H:%M:%SZ"),
+                })
+            if not page.get("next_cursor"):
+                return assets
+            options["next_cursor"] = page["next_cursor"]
+
+    @timed("storage")
+    async def delete_many(self, public_ids, resource_type="image"):
+        result = await self.client.delete_resources(public_ids, resource_type=resource_type)
+        deleted = result.get("deleted", {})
+        return {
+            public_id: "ok" if deleted.get(public_id) == "deleted" else "not found"
+            for public_id in public_ids
+        }
+
+    def public_id_from_url(self, url):
+        match = CLOUDINARY_URL_PATTERN.search(url or "")
+        return match.group(1) if match else None
+
+    def video_poster_url(self, public_id):
+        # Derived on first request from the middle frame of the video
+        return cloudinary_utils.cloudinary_url(public_id, resource_type="video", format="jpg", secure=True)[0]
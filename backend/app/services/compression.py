@@ -0,0 +1,208 @@
+"""
+Response compression (brotli or gzip)
+
+CompressionMiddleware compresses text and JSON responses of at least
+COMPRESSION_MIN_SIZE bytes with the best encoding the client accepts:
+brotli when the brotli package is installed, otherwise gzip. Images, videos,
+partial (206) responses and bodies that already have a Content-Encoding
+pass through untouched.
+
+Compressed bodies of successful GET responses are kept in an LRU cache keyed
+by a hash of the uncompressed body, up to COMPRESSION_CACHE_MB. A published
+tutorial serializes to the same bytes for every learner, so it is compressed
+once and every later request reuses the result; per-user bodies simply age
+out. Keying on content means an edited tutorial can never get a stale body.
+
+Streaming responses (more than one body message) are compressed chunk by
+chunk and never cached.
+"""
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+from typing import Optional, Set, Tuple
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_CACHE_MB = int(os.getenv("COMPRESSION_CACHE_MB", "32"))
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+# (encoding, body digest) -> compressed body
+_cache: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+_cache_stats = {"bytes": 0, "hits": 0, "misses": 0}
+
+
+def accepted_encodings(accept_encoding: str) -> Set[str]:
+    """Encodings an Accept-Encoding header allows (q=0 excluded)"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip())
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """br or gzip if the Accept-Encoding header allows it"""
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+
+def compress_cached(body: bytes, encoding: str) -> bytes:
+    """compress() through the content-addressed LRU cache"""
+    key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+    cached = _cache.get(key)
+    if cached is not None:
+        _cache.move_to_end(key)
+        _cache_stats["hits"] += 1
+        return cached
+
+    _cache_stats["misses"] += 1
+    compressed = compress(body, encoding)
+    _cache[key] = compressed
+    _cache_stats["bytes"] += len(compressed)
+    while _cache_stats["bytes"] > COMPRESSION_CACHE_MB * 1024 * 1024 and _cache:
+        _, evicted = _cache.popitem(last=False)
+        _cache_stats["bytes"] -= len(evicted)
+    return compressed
+
+
+def get_compression_stats() -> dict:
+    return {"entries": len(_cache), **_cache_stats, "brotli": brotli is not None}
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+            self.compress, self.finish = self._compressor.process, self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self.compress, self.finish = self._compressor.compress, self._compressor.flush
+
+
+def _compressible(headers) -> bool:
+    content_type = ""
+    for name, value in headers:
+        name = name.lower()
+        if name == b"content-encoding":
+            return False
+        if name == b"content-type":
+            content_type = value.decode("latin-1").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+def _with_encoding(headers, encoding: str, length: Optional[int]) -> list:
+    vary = [value for name, value in headers if name.lower() == b"vary"]
+    headers = [
+        (name, value) for name, value in headers
+        if name.lower() not in (b"content-length", b"vary")
+    ] + [
+        (b"content-encoding", encoding.encode()),
+        (b"vary", b", ".join(vary + [b"Accept-Encoding"])),
+    ]
+    if length is not None:
+        headers.append((b"content-length", str(length).encode()))
+    return headers
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli or gzip"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        cacheable = scope["method"] == "GET"
+        state = {"start": None, "mode": None, "stream": None}
+
+        async def send_compressed(message):
+            if message["type"] == "http.response.start":
+                # Decided from the headers alone when possible, so nothing is held back
+                if message["status"] in (204, 206, 304) or not _compressible(message.get("headers", [])):
+                    state["mode"] = "identity"
+                    await send(message)
+                else:
+                    state["start"] = message
+                return
+            if message["type"] != "http.response.body":
+                # e.g. http.response.zerocopy: no body to compress, pass it through
+                if state["mode"] is None:
+                    state["mode"] = "identity"
+                    await send(state["start"])
+                await send(message)
+                return
+
+            start = state["start"]
+            if state["mode"] is None:
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                if not more_body and len(body) < COMPRESSION_MIN_SIZE:
+                    state["mode"] = "identity"
+                    await send(start)
+                elif not more_body:
+                    if cacheable and start["status"] == 200:
+                        body = compress_cached(body, encoding)
+                    else:
+                        body = compress(body, encoding)
+                    await send({**start, "headers": _with_encoding(start.get("headers", []), encoding, len(body))})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                else:
+                    state["mode"] = "stream"
+                    state["stream"] = _StreamCompressor(encoding)
+                    await send({**start, "headers": _with_encoding(start.get("headers", []), encoding, None)})
+
+            if state["mode"] == "identity":
+                await send(message)
+                return
+
+            stream = state["stream"]
+            chunk = stream.compress(message.get("body", b""))
+            if message.get("more_body", False):
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": chunk + stream.finish()})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,373 @@
+"""
+Image processing worker pool
+
+Pillow work (decode, resize, encode) is CPU bound and would block the event
+loop if run inside an async handler. Jobs are sent to a bounded process pool
+instead, so several uploads are processed in parallel across cores.
+
+Pillow itself is imported inside the functions that use it, so the web
+process only loads it on the first upload; workers load it in _warm_up().
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from .metrics import record
+
+if TYPE_CHECKING:
+    from PIL import Image, ImageDraw, ImageFont
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", min(os.cpu_count() or 1, 4)))
+IMAGE_MAX_PENDING = int(os.getenv("IMAGE_MAX_PENDING", IMAGE_WORKERS * 4))
+IMAGE_QUEUE_TIMEOUT = float(os.getenv("IMAGE_QUEUE_TIMEOUT", "30"))
+
+SCREENSHOT_MAX_WIDTH = 1920
+SCREENSHOT_JPEG_QUALITY = 85
+SCREENSHOT_WEBP_QUALITY = 80
+SCREENSHOT_VARIANT_WIDTHS = (480, 960, SCREENSHOT_MAX_WIDTH)
+SCREENSHOT_VARIANT_FORMATS = ("webp", "jpg")
+# Everything that affects the processed output; part of the dedup hash
+SCREENSHOT_PROCESSING = {
+    "format": "jpg",
+    "max_width": SCREENSHOT_MAX_WIDTH,
+    "quality": SCREENSHOT_JPEG_QUALITY,
+    "variant_widths": list(SCREENSHOT_VARIANT_WIDTHS),
+    "variant_formats": list(SCREENSHOT_VARIANT_FORMATS),
+    "webp_quality": SCREENSHOT_WEBP_QUALITY,
+    "pipeline": "draft-reduce-lossless",
+}
+
+_executor: Optional[ProcessPoolExecutor] = None
+_start_lock = threading.Lock()
+_slots: Optional[asyncio.Semaphore] = None
+_stats = {
+    "jobs_completed": 0,
+    "jobs_failed": 0,
+    "jobs_rejected": 0,
+    "in_flight": 0,
+    "total_wait_ms": 0.0,
+    "total_process_ms": 0.0,
+    "max_process_ms": 0.0,
+}
+
+
+def load_scaled(file_data: bytes, max_width: int) -> Tuple[Image.Image, bool]:
+    """Decode an image scaled down to at most max_width pixels wide.
+
+    Returns the image and whether it was downscaled. Large JPEGs are decoded
+    at a reduced DCT scale with draft(), and anything still more than twice
+    the target is pre-shrunk by an integer factor with reduce(), so the final
+    LANCZOS pass only works on a small image. Both steps keep at least 2x the
+    target size, which leaves LANCZOS enough detail to match a full decode.
+    """
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(file_data))
+    if img.width <= max_width:
+        return img, False
+
+    target = (max_width, int(img.height * max_width / img.width))
+    if img.format == "JPEG":
+        img.draft("RGB", (target[0] * 2, target[1] * 2))
+
+    factor = img.width // (target[0] * 2)
+    if factor >= 2:
+        img = img.reduce(factor)
+
+    return img.resize(target, Image.Resampling.LANCZOS), True
+
+
+def to_rgb(img: Image.Image) -> Image.Image:
+    """Convert to a mode JPEG and lossy WebP can store"""
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    return img
+
+
+def has_few_colors(img: Image.Image) -> bool:
+    """Flat UI captures often use a handful of colors and compress best losslessly"""
+    return img.mode == "P" or img.getcolors(256) is not None
+
+
+def to_exact_palette(img: Image.Image) -> Image.Image:
+    """Palette version of an image with at most 256 colors.
+
+    Max coverage gives every color its own palette entry in that case (and is
+    about twice as fast as median cut); the result is still verified and the
+    RGB image returned if anything changed.
+    """
+    from PIL import Image, ImageChops
+
+    rgb = img.convert("RGB")
+    paletted = rgb.quantize(colors=256, method=Image.Quantize.MAXCOVERAGE, dither=Image.Dither.NONE)
+    if ImageChops.difference(rgb, paletted.convert("RGB")).getbbox() is not None:
+        return rgb
+    return paletted
+
+
+def compress_image_in_memory(file_data: bytes, max_width: int = SCREENSHOT_MAX_WIDTH) -> bytes:
+    """Compress and resize image in memory"""
+    img, _ = load_scaled(file_data, max_width)
+
+    # Save with optimization to bytes
+    output = io.BytesIO()
+    to_rgb(img).save(output, format="JPEG", optimize=True, quality=SCREENSHOT_JPEG_QUALITY)
+    return output.getvalue()
+
+
+def get_variant_widths(file_data: bytes) -> List[int]:
+    """Widths to render for an image, never upscaling. Only the header is read."""
+    from PIL import Image
+
+    source_width = Image.open(io.BytesIO(file_data)).width
+    widths = {width for width in SCREENSHOT_VARIANT_WIDTHS if width < source_width}
+    widths.add(min(source_width, SCREENSHOT_MAX_WIDTH))
+    return sorted(widths)
+
+
+def _encode(img: Image.Image, fmt: str, lossless: bool = False) -> bytes:
+    output = io.BytesIO()
+    if fmt == "webp":
+        if lossless:
+            img.save(output, format="WEBP", lossless=True, method=4)
+        else:
+            to_rgb(img).save(output, format="WEBP", quality=SCREENSHOT_WEBP_QUALITY, method=4)
+    elif fmt == "png":
+        img.save(output, format="PNG", optimize=True)
+    else:
+        to_rgb(img).save(output, format="JPEG", optimize=True, quality=SCREENSHOT_JPEG_QUALITY)
+    return output.getvalue()
+
+
+def render_screenshot_variants(file_data: bytes, width: int) -> List[dict]:
+    """Decode and resize once to the given width, then encode every format.
+
+    A PNG source with few colors that needs no resizing is also encoded
+    losslessly (palette PNG instead of JPEG, lossless WebP), and the lossless
+    version is kept whenever it is the smaller file.
+    """
+    img, resized = load_scaled(file_data, width)
+    lossless = not resized and img.format == "PNG" and has_few_colors(img)
+    if lossless and img.mode not in ("P", "L"):
+        img = to_exact_palette(img)
+
+    variants = []
+    for fmt in SCREENSHOT_VARIANT_FORMATS:
+        data, out_format = _encode(img, fmt), fmt
+        if lossless:
+            lossless_format = "webp" if fmt == "webp" else "png"
+            lossless_data = _encode(img, lossless_format, lossless=True)
+            if len(lossless_data) < len(data):
+                data, out_format = lossless_data, lossless_format
+
+        variants.append({
+            "format": out_format,
+            "width": img.width,
+            "height": img.height,
+            "data": data,
+        })
+    return variants
+
+
+# Same look as the player overlay (AnnotationOverlay.tsx)
+ANNOTATION_COLORS = {
+    "arrow": (239, 68, 68),
+    "box": (59, 130, 246),
+    "tooltip": (250, 204, 21),
+    "highlight": (251, 191, 36),
+}
+TOOLTIP_TEXT_COLOR = (17, 24, 39)
+TOOLTIP_FONT_SIZE = 16
+MAX_STROKE_WIDTH = 50
+
+
+def _style_color(style: dict, default: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    color = (style or {}).get("color")
+    if isinstance(color, str) and color.startswith("#") and len(color) == 7:
+        return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return default
+
+
+def _draw_annotation(draw: ImageDraw.ImageDraw, annotation: dict, font: ImageFont.ImageFont) -> None:
+    kind = annotation.get("type")
+    coords = annotation.get("coordinates") or {}
+    style = annotation.get("style") or {}
+    x, y = float(coords.get("x", 0)), float(coords.get("y", 0))
+    color = _style_color(style, ANNOTATION_COLORS.get(kind, ANNOTATION_COLORS["box"]))
+    stroke = min(max(int(float(style.get("strokeWidth", 3 if kind != "highlight" else 2))), 1), MAX_STROKE_WIDTH)
+
+    if kind == "arrow":
+        points = coords.get("points") or [{"x": x, "y": y}, {"x": x + 80, "y": y + 80}]
+        if len(points) < 2:
+            raise ValueError("an arrow needs two points")
+        (x1, y1), (x2, y2) = [(float(p["x"]), float(p["y"])) for p in points[:2]]
+        draw.line([(x1, y1), (x2, y2)], fill=color + (255,), width=stroke)
+        angle = math.atan2(y2 - y1, x2 - x1)
+        head = 5 * stroke
+        draw.polygon([
+            (x2, y2),
+            (x2 - head * math.cos(angle - 0.4), y2 - head * math.sin(angle - 0.4)),
+            (x2 - head * math.cos(angle + 0.4), y2 - head * math.sin(angle + 0.4)),
+        ], fill=color + (255,))
+    elif kind == "box":
+        width, height = float(coords.get("width") or 100), float(coords.get("height") or 100)
+        draw.rounded_rectangle([x, y, x + width, y + height], radius=5, outline=color + (255,), width=stroke)
+    elif kind == "highlight":
+        width, height = float(coords.get("width") or 150), float(coords.get("height") or 50)
+        draw.rectangle([x, y, x + width, y + height], fill=color + (77,), outline=color + (255,), width=stroke)
+    elif kind == "tooltip":
+        text = annotation.get("text") or ""
+        left, top, right, bottom = draw.textbbox((x + 16, y + 8), text, font=font)
+        draw.rounded_rectangle([x, y, right + 16, bottom + 8], radius=8, fill=color + (255,))
+        draw.text((x + 16, y + 8), text, fill=TOOLTIP_TEXT_COLOR + (255,), font=font)
+
+
+def render_annotated_screenshot(file_data: bytes, annotations: List[dict]) -> dict:
+    """Composite annotations onto a screenshot and encode it as JPEG.
+
+    Coordinates are pixels of the screenshot as stored (the main variant),
+    the space the player overlays them in.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    img = Image.open(io.BytesIO(file_data)).convert("RGBA")
+    overlay = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    try:
+        font = ImageFont.load_default(size=TOOLTIP_FONT_SIZE)
+    except TypeError:
+        font = ImageFont.load_default()
+
+    for annotation in annotations:
+        try:
+            _draw_annotation(draw, annotation, font)
+        except (TypeError, ValueError, KeyError, IndexError, AttributeError, OverflowError) as e:
+            # Annotations are free-form JSON; one malformed entry must not fail the render
+            print(f"[ANNOTATED RENDER] Skipping malformed {annotation.get('type')} annotation: {e}")
+
+    output = io.BytesIO()
+    Image.alpha_composite(img, overlay).convert("RGB").save(
+        output, format="JPEG", optimize=True, quality=SCREENSHOT_JPEG_QUALITY
+    )
+    return {"data": output.getvalue(), "width": img.width, "height": img.height}
+
+
+def _warm_up() -> int:
+    """Runs once in each worker so Pillow and its codecs are loaded before real jobs"""
+    from PIL import Image
+
+    Image.new("RGB", (8, 8)).save(io.BytesIO(), format="JPEG")
+    return os.getpid()
+
+
+def _timed_call(func: Callable, args: tuple) -> tuple:
+    """Run a job inside a worker and report how long the work itself took"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def _warmed_up(future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        print(f"[INFO] Image worker {future.result()} ready")
+
+
+def start_image_pool() -> None:
+    """Create the process pool and start warming its workers.
+
+    Returns without waiting for the warm-up: jobs submitted meanwhile simply
+    queue behind it.
+    """
+    global _executor
+    with _start_lock:
+        if _executor is not None:
+            return
+
+        # spawn keeps workers from inheriting the server's event loop and DB connections
+        _executor = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        for _ in range(IMAGE_WORKERS):
+            _executor.submit(_warm_up).add_done_callback(_warmed_up)
+
+
+def shutdown_image_pool() -> None:
+    """Stop the process pool"""
+    global _executor
+    with _start_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(IMAGE_MAX_PENDING)
+    return _slots
+
+
+async def run_image_job(func: Callable, *args: Any) -> Any:
+    """Run an image function in the process pool.
+
+    At most IMAGE_MAX_PENDING jobs are queued or running at once. Callers
+    beyond that wait up to IMAGE_QUEUE_TIMEOUT seconds for a slot and then
+    get a 503, so a burst of uploads cannot pile up unbounded work.
+    """
+    loop = asyncio.get_running_loop()
+    if _executor is None:
+        # Normally started with the app; spawning workers must not block the loop
+        await loop.run_in_executor(None, start_image_pool)
+
+    slots = _get_slots()
+    queued_at = time.perf_counter()
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=IMAGE_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _stats["jobs_rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Image processing is busy, please try again"
+        )
+
+    _stats["in_flight"] += 1
+    try:
+        result, process_ms = await loop.run_in_executor(_executor, _timed_call, func, args)
+    except Exception:
+        _stats["jobs_failed"] += 1
+        raise
+    finally:
+        _stats["in_flight"] -= 1
+        slots.release()
+
+    total_ms = (time.perf_counter() - queued_at) * 1000
+    _stats["jobs_completed"] += 1
+    _stats["total_process_ms"] += process_ms
+    _stats["total_wait_ms"] += total_ms - process_ms
+    _stats["max_process_ms"] = max(_stats["max_process_ms"], process_ms)
+    record("image", process_ms / 1000)
+    return result
+
+
+def get_image_pool_stats() -> dict:
+    """Snapshot of pool usage and per-job timings"""
+    completed = _stats["jobs_completed"]
+    return {
+        "workers": IMAGE_WORKERS,
+        "max_pending": IMAGE_MAX_PENDING,
+        "running": _executor is not None,
+        **_stats,
+        "avg_process_ms": round(_stats["total_process_ms"] / completed, 2) if completed else 0,
+        "avg_wait_ms": round(_stats["total_wait_ms"] / completed, 2) if completed else 0,
+    }
@@ -0,0 +1,32 @@
+"""
+JSON responses encoded with orjson
+
+FastJSONResponse is the app's default response class. Plain content (dicts
+and lists FastAPI already ran through response_model or jsonable_encoder) is
+encoded with orjson instead of json.dumps; both write compact UTF-8 without
+ASCII escaping, so clients get the same bytes.
+
+Endpoints with large payloads (get_tutorial, list_tutorials) return
+FastJSONResponse(model) or FastJSONResponse([models]) directly. pydantic-core
+then writes the JSON bytes itself, skipping the model -> dict -> JSON round
+trip FastAPI does for response_model. The model must be the endpoint's
+response_model, since FastAPI does not validate a returned Response.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _dump_model(model: BaseModel) -> bytes:
+    return model.__pydantic_serializer__.to_json(model)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return _dump_model(content)
+        if isinstance(content, list) and content and all(isinstance(item, BaseModel) for item in content):
+            return b"[" + b",".join(_dump_model(item) for item in content) + b"]"
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
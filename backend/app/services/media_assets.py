@@ -0,0 +1,151 @@
+"""
+Content-addressed media deduplication
+
+Every processed upload is recorded in media_assets under the SHA-256 of its
+raw bytes plus the processing parameters, and stored under a public_id
+derived from that hash (asset_public_id). Uploading the same file again
+returns the stored asset without any image processing or storage call, and
+since two different files never share a public_id, an upload can never
+overwrite a file other steps are showing.
+
+ref_count is the number of steps whose screenshot_url is the asset. Every
+write that changes a step's screenshot (tutorial and step endpoints, uploads
+with step_id, media jobs) calls update_asset_refs(); an asset whose last step
+lets go of it is removed, together with its stored files. Assets uploaded
+but never saved on a step stay at 0 until reconcile_media.py cleans them up.
+"""
+import asyncio
+import hashlib
+import json
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import MediaAsset
+from .storage import get_storage
+
+
+def compute_asset_hash(data: bytes, params: dict) -> str:
+    """Hash raw upload bytes together with the parameters used to process them"""
+    digest = hashlib.sha256(data)
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def asset_public_id(folder: str, content_hash: str) -> str:
+    """Storage public_id for deduplicated content: one per content hash"""
+    return f"{folder}/{content_hash[:32]}"
+
+
+def find_asset(db: Session, content_hash: str) -> Optional[MediaAsset]:
+    return db.query(MediaAsset).filter(MediaAsset.content_hash == content_hash).first()
+
+
+def register_asset(
+    db: Session,
+    content_hash: str,
+    stored: dict,
+    resource_type: str = "image",
+    original_size: Optional[int] = None
+) -> MediaAsset:
+    """Record a freshly stored asset, not yet used by any step.
+
+    If the same content was registered concurrently, the existing row wins
+    (both uploads wrote the same bytes under the same public_id).
+    """
+    asset = MediaAsset(
+        content_hash=content_hash,
+        public_id=stored["public_id"],
+        url=stored["url"],
+        variants=stored.get("variants"),
+        resource_type=resource_type,
+        original_size=original_size,
+        stored_size=stored.get("bytes"),
+        ref_count=0,
+    )
+    db.add(asset)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return find_asset(db, content_hash)
+
+    db.refresh(asset)
+    return asset
+
+
+def find_screenshot_variants(db: Session, url: str) -> Optional[list]:
+    """Variants recorded for a screenshot URL, if it came through the upload pipeline"""
+    asset = db.query(MediaAsset).filter(MediaAsset.url == url).first()
+    return asset.variants if asset else None
+
+
+def _asset_files(asset: MediaAsset) -> List[str]:
+    """The asset's public_id and those of all its variants"""
+    return [asset.public_id] + [
+        variant["public_id"] for variant in asset.variants or []
+        if variant.get("public_id") and variant["public_id"] != asset.public_id
+    ]
+
+
+def update_asset_refs(db: Session, removed: Iterable[Optional[str]], added: Iterable[Optional[str]]) -> List[str]:
+    """Move step references from the removed screenshot URLs to the added ones.
+
+    Both are lists of URLs (one entry per step, None for no screenshot); a
+    URL in both is left alone. Does not commit, so the counts change with the
+    step rows. Returns the public_ids to delete from storage, for assets no
+    step uses anymore.
+    """
+    removed, added = Counter(url for url in removed if url), Counter(url for url in added if url)
+    stale = []
+
+    for url, count in (added - removed).items():
+        db.query(MediaAsset).filter(MediaAsset.url == url).update(
+            {MediaAsset.ref_count: MediaAsset.ref_count + count}, synchronize_session=False
+        )
+
+    for url, count in (removed - added).items():
+        asset = db.query(MediaAsset).filter(MediaAsset.url == url).with_for_update().first()
+        if asset is None:
+            continue
+        if asset.ref_count > count:
+            asset.ref_count -= count
+        else:
+            stale.extend(_asset_files(asset))
+            db.delete(asset)
+    return stale
+
+
+def release_asset(db: Session, public_id: str) -> Optional[List[str]]:
+    """Forget an asset a client asked to delete.
+
+    Returns the public_ids to delete from storage (the asset and all its
+    variants), [public_id] when it was never tracked, and None while steps
+    still use it: those references go when the steps are saved without it.
+    """
+    asset = db.query(MediaAsset).filter(MediaAsset.public_id == public_id).with_for_update().first()
+    if asset is None:
+        return [public_id]
+
+    if asset.ref_count > 0:
+        db.rollback()
+        return None
+
+    public_ids = _asset_files(asset)
+    db.delete(asset)
+    db.commit()
+    return public_ids
+
+
+async def delete_asset_files(public_ids: List[str]) -> None:
+    """Remove released assets from storage (run as a background task)"""
+    storage = get_storage()
+    results = await asyncio.gather(
+        *(storage.delete(public_id, resource_type="image") for public_id in public_ids),
+        return_exceptions=True
+    )
+    for public_id, result in zip(public_ids, results):
+        if isinstance(result, Exception):
+            print(f"[MEDIA ASSETS] Could not delete {public_id}: {result}")
@@ -0,0 +1,309 @@
+"""
+Background media processing
+
+Uploads tied to an existing step are saved to disk and queued as MediaJob
+rows; the request returns 202 right away. Worker tasks started with the app
+claim pending jobs, process and store the media, then set the step's
+screenshot_url, or its video_url with poster and metadata. Jobs live in the
+database, so work queued before a restart (or claimed by a worker that died)
+is picked up again.
+"""
+import asyncio
+import functools
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+import anyio
+
+from ..database import SessionLocal
+from ..models import MediaJob, Step
+from .media_assets import delete_asset_files, register_asset, update_asset_refs
+from .response_cache import invalidate_tags
+from .screenshots import process_screenshot
+from .videos import process_video
+
+MEDIA_JOB_DIR = Path(os.getenv("MEDIA_JOB_DIR", "./media_jobs"))
+MEDIA_JOB_WORKERS = int(os.getenv("MEDIA_JOB_WORKERS", "2"))
+MEDIA_JOB_MAX_ATTEMPTS = int(os.getenv("MEDIA_JOB_MAX_ATTEMPTS", "3"))
+MEDIA_JOB_POLL_INTERVAL = float(os.getenv("MEDIA_JOB_POLL_INTERVAL", "5"))
+# A job still "processing" after this long belongs to a worker that died
+MEDIA_JOB_STALE_AFTER = timedelta(seconds=int(os.getenv("MEDIA_JOB_STALE_AFTER", "600")))
+
+_wakeup: Optional[asyncio.Event] = None
+_workers: List[asyncio.Task] = []
+
+
+def _save_source(file: BinaryIO, job_id: str) -> str:
+    MEDIA_JOB_DIR.mkdir(parents=True, exist_ok=True)
+    path = MEDIA_JOB_DIR / job_id
+    file.seek(0)
+    with open(path, "wb") as out:
+        shutil.copyfileobj(file, out, 1024 * 1024)
+    return str(path)
+
+
+async def enqueue_media_job(
+    file: BinaryIO,
+    kind: str,
+    step_id: str,
+    params: dict,
+    original_filename: Optional[str] = None
+) -> MediaJob:
+    """Persist the raw upload and queue it for background processing"""
+    job = MediaJob(
+        id=str(uuid.uuid4()),
+        kind=kind,
+        step_id=step_id,
+        params=params,
+        original_filename=original_filename
+    )
+    job.source_path = await anyio.to_thread.run_sync(_save_source, file, job.id)
+    return await _queue_job(job)
+
+
+async def enqueue_media_job_from_path(
+    path: str,
+    kind: str,
+    step_id: str,
+    params: dict,
+    original_filename: Optional[str] = None
+) -> MediaJob:
+    """Queue a file already on disk; it is moved into MEDIA_JOB_DIR, not copied"""
+    job = MediaJob(
+        id=str(uuid.uuid4()),
+        kind=kind,
+        step_id=step_id,
+        params=params,
+        original_filename=original_filename
+    )
+    MEDIA_JOB_DIR.mkdir(parents=True, exist_ok=True)
+    job.source_path = str(MEDIA_JOB_DIR / job.id)
+    await anyio.to_thread.run_sync(shutil.move, path, job.source_path)
+    return await _queue_job(job)
+
+
+async def _queue_job(job: MediaJob) -> MediaJob:
+    def insert() -> MediaJob:
+        db = SessionLocal()
+        try:
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+    job = await anyio.to_thread.run_sync(insert)
+    if _wakeup is not None:
+        _wakeup.set()
+    return job
+
+
+def _claim_next_job() -> Optional[MediaJob]:
+    """Atomically move one runnable job to "processing".
+
+    The conditional UPDATE makes the claim safe when several app processes
+    share the table: only the one whose update hits a row gets the job.
+    """
+    db = SessionLocal()
+    try:
+        stale_before = datetime.utcnow() - MEDIA_JOB_STALE_AFTER
+        candidates = db.query(MediaJob.id, MediaJob.status).filter(
+            (MediaJob.status == "pending") |
+            ((MediaJob.status == "processing") & (MediaJob.started_at < stale_before))
+        ).order_by(MediaJob.created_at).limit(5).all()
+
+        for job_id, current_status in candidates:
+            claimed = db.query(MediaJob).filter(
+                MediaJob.id == job_id,
+                MediaJob.status == current_status
+            ).update({
+                MediaJob.status: "processing",
+                MediaJob.progress: 10,
+                MediaJob.started_at: datetime.utcnow(),
+                MediaJob.attempts: MediaJob.attempts + 1,
+            }, synchronize_session=False)
+            db.commit()
+            if claimed:
+                job = db.query(MediaJob).filter(MediaJob.id == job_id).first()
+                db.expunge(job)
+                return job
+        return None
+    finally:
+        db.close()
+
+
+def _update_job(job_id: str, **values) -> None:
+    db = SessionLocal()
+    try:
+        db.query(MediaJob).filter(MediaJob.id == job_id).update(values, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _complete_job(job: MediaJob, result: dict) -> List[str]:
+    """Store the result and point the step at the new media.
+
+    Returns the public_ids of screenshots no step uses anymore.
+    """
+    db = SessionLocal()
+    stale = []
+    try:
+        step = db.query(Step).filter(Step.id == job.step_id).first()
+        if step is not None:
+            if job.kind == "screenshot":
+                stale = update_asset_refs(db, [step.screenshot_url], [result["url"]])
+                step.screenshot_url = result["url"]
+                step.screenshot_variants = result.get("variants")
+            else:
+                step.video_url = result["url"]
+                step.video_poster_url = result.get("poster_url")
+                step.video_metadata = result.get("metadata")
+        else:
+            result["warning"] = "Step no longer exists"
+
+        db.query(MediaJob).filter(MediaJob.id == job.id).update({
+            MediaJob.status: "done",
+            MediaJob.progress: 100,
+            MediaJob.result: result,
+            MediaJob.error: None,
+            MediaJob.finished_at: datetime.utcnow(),
+        }, synchronize_session=False)
+        db.commit()
+        if step is not None:
+            invalidate_tags(f"tutorial:{step.tutorial_id}")
+        return stale
+    finally:
+        db.close()
+
+
+def _register_asset(content_hash: str, stored: dict, original_size: int) -> None:
+    db = SessionLocal()
+    try:
+        register_asset(db, content_hash, stored, original_size=original_size)
+    finally:
+        db.close()
+
+
+async def process_media_job(job: MediaJob) -> dict:
+    """Process and store one job's media, returning the job result"""
+    params = dict(job.params or {})
+    content_hash = params.pop("content_hash", None)
+
+    if job.kind == "screenshot":
+        original = await anyio.to_thread.run_sync(Path(job.source_path).read_bytes)
+        await anyio.to_thread.run_sync(lambda: _update_job(job.id, progress=30))
+
+        stored = await process_screenshot(original, params["folder"], params.get("public_id"))
+        if content_hash:
+            await anyio.to_thread.run_sync(_register_asset, content_hash, stored, len(original))
+        result = {
+            "original_size": len(original),
+            "compressed_size": stored["bytes"],
+            "variants": stored["variants"],
+        }
+    else:
+        with open(job.source_path, "rb") as source:
+            stored = await process_video(source, params["folder"], params.get("public_id"), params.get("filename"))
+        metadata = stored["metadata"]
+        result = {
+            "file_size": os.path.getsize(job.source_path),
+            "duration": metadata["duration"],
+            "width": metadata["width"],
+            "height": metadata["height"],
+            "format": metadata["format"],
+            "poster_url": stored["poster_url"],
+            "metadata": metadata,
+        }
+
+    result.update(url=stored.get("url"), public_id=stored.get("public_id"))
+    return result
+
+
+async def _run_job(job: MediaJob) -> None:
+    try:
+        result = await process_media_job(job)
+        stale = await anyio.to_thread.run_sync(_complete_job, job, result)
+    except asyncio.CancelledError:
+        # Shutting down: hand the job back so the next start picks it up.
+        # Shielded so a second cancel cannot interrupt the update halfway
+        await asyncio.shield(anyio.to_thread.run_sync(
+            functools.partial(_update_job, job.id, status="pending", progress=0)
+        ))
+        raise
+    except Exception as e:
+        error = str(e)
+        print(f"[MEDIA JOB] {job.id} failed (attempt {job.attempts}): {error}")
+        final = job.attempts >= MEDIA_JOB_MAX_ATTEMPTS
+        await anyio.to_thread.run_sync(functools.partial(
+            _update_job,
+            job.id,
+            status="failed" if final else "pending",
+            error=error,
+            finished_at=datetime.utcnow() if final else None,
+        ))
+        if final:
+            _remove_source(job)
+        return
+
+    _remove_source(job)
+    if stale:
+        await delete_asset_files(stale)
+
+
+def _remove_source(job: MediaJob) -> None:
+    if job.source_path:
+        try:
+            os.remove(job.source_path)
+        except FileNotFoundError:
+            pass
+
+
+async def _worker_loop() -> None:
+    while True:
+        try:
+            job = await anyio.to_thread.run_sync(_claim_next_job)
+        except Exception as e:
+            print(f"[MEDIA JOB] Could not claim job: {e}")
+            job = None
+
+        if job is not None:
+            try:
+                await _run_job(job)
+            except Exception as e:
+                # e.g. the database was locked while recording the failure; the
+                # job is picked up again once it is considered stale
+                print(f"[MEDIA JOB] {job.id} could not be finished: {e}")
+            continue
+
+        _wakeup.clear()
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=MEDIA_JOB_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_media_workers() -> None:
+    """Start the worker tasks on the running event loop"""
+    global _wakeup
+    if _workers:
+        return
+    _wakeup = asyncio.Event()
+    for _ in range(MEDIA_JOB_WORKERS):
+        _workers.append(asyncio.create_task(_worker_loop()))
+    print(f"[INFO] Media job workers started: {MEDIA_JOB_WORKERS}")
+
+
+async def stop_media_workers() -> None:
+    """Cancel the worker tasks; interrupted jobs go back to pending"""
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
@@ -0,0 +1,131 @@
+"""
+Orphaned media cleanup
+
+Deleting a step only removes its screenshot from storage when the upload
+pipeline tracks it in media_assets (see media_assets.py). Videos, posters,
+screenshots uploaded but never saved on a step and files from before that
+tracking pile up. find_orphans() lists what is stored under the media folders
+and subtracts everything a step still references (main URL, video URL, video
+poster and every screenshot variant); delete_orphans() removes the rest in
+bulk batches, pausing between batches to stay under the storage API rate
+limits. reconcile_media.py runs both from the command line.
+
+Files younger than min_age are never touched: they may belong to an upload
+whose tutorial has not been saved yet, or to a media job still running.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Set
+
+from sqlalchemy.orm import Session
+
+from ..models import MediaAsset, Step
+from .storage import StorageBackend
+
+
+def referenced_public_ids(db: Session, storage: StorageBackend) -> Set[str]:
+    """public_ids of every file a step points at, including screenshot variants"""
+    referenced = set()
+    screenshot_urls = set()
+
+    for screenshot_url, video_url, poster_url, variants in db.query(
+        Step.screenshot_url, Step.video_url, Step.video_poster_url, Step.screenshot_variants
+    ):
+        for url in (screenshot_url, video_url, poster_url):
+            public_id = storage.public_id_from_url(url) if url else None
+            if public_id:
+                referenced.add(public_id)
+        if screenshot_url:
+            screenshot_urls.add(screenshot_url)
+        for variant in variants or []:
+            referenced.add(variant.get("public_id") or storage.public_id_from_url(variant.get("url")))
+
+    # Steps saved before variants were copied onto them
+    for url, variants in db.query(MediaAsset.url, MediaAsset.variants):
+        if url in screenshot_urls:
+            referenced.update(variant.get("public_id") for variant in variants or [])
+
+    referenced.discard(None)
+    return referenced
+
+
+async def find_orphans(
+    db: Session,
+    storage: StorageBackend,
+    folders: Dict[str, str],
+    min_age: timedelta
+) -> Dict[str, List[dict]]:
+    """Stored files not referenced by any step, per resource type.
+
+    folders maps a resource type ("image", "video") to the folder to scan.
+    """
+    referenced = referenced_public_ids(db, storage)
+    cutoff = datetime.utcnow() - min_age
+
+    orphans = {}
+    for resource_type, folder in folders.items():
+        stored = await storage.list(folder, resource_type)
+        orphans[resource_type] = [
+            asset for asset in stored
+            if asset["public_id"] not in referenced and asset["created_at"] < cutoff
+        ]
+    return orphans
+
+
+def forget_assets(db: Session, public_ids: Set[str]) -> int:
+    """Drop media_assets rows whose file (or one of its variants) was deleted.
+
+    Otherwise a later upload of the same content would be deduplicated to a
+    URL that no longer exists.
+    """
+    removed = 0
+    for asset in db.query(MediaAsset).all():
+        ids = {asset.public_id} | {variant.get("public_id") for variant in asset.variants or []}
+        if ids & public_ids:
+            db.delete(asset)
+            removed += 1
+    db.commit()
+    return removed
+
+
+async def delete_orphans(
+    db: Session,
+    storage: StorageBackend,
+    orphans: Dict[str, List[dict]],
+    batch_size: int = 100,
+    delay: float = 1.0
+) -> dict:
+    """Delete orphans in batches of batch_size, sleeping delay seconds between batches"""
+    deleted: Set[str] = set()
+    missing = 0
+    failed = 0
+    first_batch = True
+
+    for resource_type, assets in orphans.items():
+        public_ids = [asset["public_id"] for asset in assets]
+        for start in range(0, len(public_ids), batch_size):
+            if not first_batch:
+                await asyncio.sleep(delay)
+            first_batch = False
+
+            batch = public_ids[start:start + batch_size]
+            try:
+                results = await storage.delete_many(batch, resource_type)
+            except Exception as e:
+                print(f"[RECONCILE] Batch of {len(batch)} {resource_type} file(s) failed: {e}")
+                failed += len(batch)
+                continue
+
+            for public_id, result in results.items():
+                if result == "ok":
+                    deleted.add(public_id)
+                else:
+                    missing += 1
+            print(f"[RECONCILE] Deleted {sum(1 for r in results.values() if r == 'ok')}/{len(batch)} {resource_type} file(s)")
+
+    return {
+        "deleted": len(deleted),
+        "not_found": missing,
+        "failed": failed,
+        "assets_forgotten": forget_assets(db, deleted) if deleted else 0,
+    }
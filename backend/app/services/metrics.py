@@ -0,0 +1,218 @@
+"""
+Prometheus metrics
+
+MetricsMiddleware records, per route template (e.g. /api/tutorials/{tutorial_id}):
+request count by status, a latency histogram, a response size histogram, and
+the number of SQL queries and seconds spent in SQL while serving it. SQL is
+timed with engine cursor events (instrument_sql()); Pillow jobs and storage calls report their
+time through record(). render_metrics() formats everything in the Prometheus
+text exposition format for GET /metrics.
+
+The middleware is plain ASGI (no BaseHTTPMiddleware task or body buffering)
+and only does dictionary updates per request, so the overhead stays in the
+microseconds; benchmarks/bench_metrics_overhead.py measures it.
+"""
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Requests that matched no route (static files, 404s) share one label
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """Cumulative-on-export histogram with fixed upper bounds"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+_lock = threading.Lock()
+_requests: Dict[Tuple[str, str, int], int] = {}
+_latency: Dict[Tuple[str, str], Histogram] = {}
+_sizes: Dict[Tuple[str, str], Histogram] = {}
+_route_queries: Dict[Tuple[str, str], int] = {}
+_route_sql_seconds: Dict[Tuple[str, str], float] = {}
+# component ("sql", "image", "storage") -> [calls, seconds]
+_components: Dict[str, List[float]] = {}
+
+# [queries, sql seconds] of the request being served in this context
+_request_sql: ContextVar[Optional[List[float]]] = ContextVar("request_sql", default=None)
+
+
+def record(component: str, seconds: float) -> None:
+    """Count one call of a component (SQL, Pillow, storage) and its duration"""
+    with _lock:
+        totals = _components.setdefault(component, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+
+
+def timed(component: str) -> Callable:
+    """Decorator recording the duration of an async function under component"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                record(component, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    request_sql = _request_sql.get()
+    if request_sql is not None:
+        request_sql[0] += 1
+        request_sql[1] += elapsed
+    record("sql", elapsed)
+
+
+def instrument_sql() -> None:
+    """Time every query on every engine (primary and replica)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request metrics"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        response = {"status": 500, "bytes": 0}
+        request_sql = [0, 0.0]
+        token = _request_sql.set(request_sql)
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _request_sql.reset(token)
+            # FastAPI stores the matched route in the scope during routing
+            route = scope.get("route")
+            template = route.path if route is not None else UNMATCHED_ROUTE
+            observe_request(
+                scope["method"], template, response["status"],
+                time.perf_counter() - started, response["bytes"], request_sql
+            )
+
+
+def observe_request(method: str, route: str, status: int, seconds: float, size: int, sql: List[float]) -> None:
+    key = (method, route)
+    with _lock:
+        _requests[(method, route, status)] = _requests.get((method, route, status), 0) + 1
+        latency = _latency.get(key)
+        if latency is None:
+            latency = _latency[key] = Histogram(LATENCY_BUCKETS)
+            _sizes[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(seconds)
+        _sizes[key].observe(size)
+        _route_queries[key] = _route_queries.get(key, 0) + sql[0]
+        _route_sql_seconds[key] = _route_sql_seconds.get(key, 0.0) + sql[1]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, labels: dict, histogram: Histogram) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def render_metrics(gauges: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+    """All metrics in the Prometheus text format, plus gauges given as {name: (help, value)}"""
+    lines = []
+
+    def header(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    with _lock:
+        header("http_requests_total", "counter", "HTTP requests by route template and status")
+        for (method, route, status), count in sorted(_requests.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+        header("http_request_duration_seconds", "histogram", "Time to serve a request")
+        for (method, route), histogram in sorted(_latency.items()):
+            lines.extend(_histogram_lines("http_request_duration_seconds", {"method": method, "route": route}, histogram))
+
+        header("http_response_size_bytes", "histogram", "Response body size")
+        for (method, route), histogram in sorted(_sizes.items()):
+            lines.extend(_histogram_lines("http_response_size_bytes", {"method": method, "route": route}, histogram))
+
+        header("http_request_db_queries_total", "counter", "SQL queries issued while serving requests")
+        for (method, route), count in sorted(_route_queries.items()):
+            lines.append(f"http_request_db_queries_total{_labels(method=method, route=route)} {count}")
+
+        header("http_request_db_seconds_total", "counter", "Time spent in SQL while serving requests")
+        for (method, route), seconds in sorted(_route_sql_seconds.items()):
+            lines.append(f"http_request_db_seconds_total{_labels(method=method, route=route)} {seconds}")
+
+        header("app_component_calls_total", "counter", "Calls to SQL, Pillow jobs and media storage")
+        for component, (calls, _) in sorted(_components.items()):
+            lines.append(f"app_component_calls_total{_labels(component=component)} {calls}")
+
+        header("app_component_seconds_total", "counter", "Time spent in SQL, Pillow jobs and media storage")
+        for component, (_, seconds) in sorted(_components.items()):
+            lines.append(f"app_component_seconds_total{_labels(component=component)} {seconds}")
+
+    for name, (help_text, value) in (gauges or {}).items():
+        header(name, "gauge", help_text)
+        lines.append(f"{name} {value}")
+
+    return "\n".join(lines) + "\n"
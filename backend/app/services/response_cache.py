@@ -0,0 +1,351 @@
+"""
+Response cache for read endpoints, invalidated by tags
+
+@cached(tags=..., scope=...) goes between the route decorator and a sync
+endpoint. The encoded response body is stored under a key made of the
+endpoint, its scalar parameters (path and query values) and the caller's
+scope; the entry is tagged with the entities it was built from:
+
+    @router.get("/{tutorial_id}", response_model=TutorialResponse)
+    @cached(tags=("tutorial:{tutorial_id}",), scope=access_scope)
+    def get_tutorial(tutorial_id: str, ..., current_user: User = Depends(get_current_user)):
+
+Tags are format strings filled from the endpoint arguments. Every entry is
+also tagged with its scope, so invalidate_tags(f"user:{user_id}") drops
+everything cached for that user. Write endpoints call invalidate_tags()
+after their commit. Tags in use:
+
+- tutorials: any tutorial listing (created, deleted, published, step added)
+- tutorial:<id>: one tutorial's content and steps
+- progress:<tutorial_id>: progress records of a tutorial (stats)
+- progress_of:<user_id>: one user's progress records (dashboard)
+- user:<id>: everything cached in that user's scope (grants, role)
+
+Scopes:
+- access_scope: admins share one scope, everyone else gets their own, since
+  what they may see depends on their grants
+- user_scope: always per user (responses built from the user's own data)
+- shared_scope: the same for every caller
+
+Concurrent misses on one key are coalesced: the first request computes the
+response and the others wait for it instead of all querying the database.
+Errors (404, 403) are passed to the waiting requests and never cached. An
+entry computed while one of its tags was invalidated is not stored.
+
+Backends (RESPONSE_CACHE_BACKEND):
+- memory (default): in-process LRU bounded by RESPONSE_CACHE_MB. Entries
+  and invalidations are per process, so with several uvicorn workers use a
+  shared store
+- redis: a Redis server at RESPONSE_CACHE_REDIS_URL, shared by all workers
+  (needs the redis package)
+- local: the shared-store code over an in-process stand-in for Redis, for
+  tests and development
+- off: no caching
+
+Only the status, media type and body are cached. The endpoint must return a
+Response or JSON-ready content: response_model filtering does not run on
+cached responses. Every entry also expires after RESPONSE_CACHE_TTL seconds,
+which bounds staleness from writes that bypass the API (scripts, or a read
+replica that lags behind an invalidation).
+"""
+import functools
+import hashlib
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from enum import Enum
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import Response
+
+from ..models.user import UserRole
+from .json_response import FastJSONResponse
+
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+RESPONSE_CACHE_MB = int(os.getenv("RESPONSE_CACHE_MB", "64"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+# How long a coalesced request waits for the one computing the response
+RESPONSE_CACHE_WAIT_SECONDS = float(os.getenv("RESPONSE_CACHE_WAIT_SECONDS", "30"))
+
+_SCALARS = (str, int, float, bool, Enum, type(None))
+
+
+class MemoryCache:
+    """In-process LRU of encoded responses, bounded by total bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._lock = threading.Lock()
+        # key -> (expires_at, value, tags)
+        self._entries: "OrderedDict[str, Tuple[float, bytes, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, tags: Iterable[str], ttl: int) -> None:
+        if len(value) > self.max_bytes:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            self.bytes += len(value)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= len(entry[1])
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+
+class LocalStore:
+    """In-process stand-in for the part of the Redis client SharedCache uses"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Tuple[Optional[float], object]] = {}
+
+    def _live(self, name: str):
+        entry = self._values.get(name)
+        if entry is not None and entry[0] is not None and entry[0] < time.monotonic():
+            del self._values[name]
+            return None
+        return entry[1] if entry is not None else None
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            return self._live(name)
+
+    def set(self, name: str, value: bytes, ex: Optional[int] = None) -> bool:
+        with self._lock:
+            self._values[name] = (time.monotonic() + ex if ex else None, value)
+        return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(self._values.pop(name, None) is not None for name in names)
+
+    def sadd(self, name: str, *values: str) -> int:
+        with self._lock:
+            members = self._live(name)
+            if members is None:
+                members = set()
+                self._values[name] = (None, members)
+            added = len(set(values) - members)
+            members.update(values)
+            return added
+
+    def smembers(self, name: str) -> Set[str]:
+        with self._lock:
+            return set(self._live(name) or ())
+
+    def expire(self, name: str, time_seconds: int) -> bool:
+        with self._lock:
+            if name not in self._values:
+                return False
+            self._values[name] = (time.monotonic() + time_seconds, self._values[name][1])
+            return True
+
+
+class SharedCache:
+    """Encoded responses in a shared store (Redis) seen by every worker"""
+
+    def __init__(self, store, prefix: str = "respcache:"):
+        self.store = store
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.store.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, tags: Iterable[str], ttl: int) -> None:
+        self.store.set(self.prefix + key, value, ex=ttl)
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            self.store.sadd(tag_key, self.prefix + key)
+            # A tag lives as long as its longest-lived entry
+            self.store.expire(tag_key, ttl)
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            keys = self.store.smembers(tag_key)
+            self.store.delete(tag_key, *keys)
+
+    def stats(self) -> dict:
+        return {"store": type(self.store).__name__}
+
+
+def create_backend(name: str):
+    if name == "memory":
+        return MemoryCache(RESPONSE_CACHE_MB * 1024 * 1024)
+    if name == "local":
+        return SharedCache(LocalStore())
+    if name == "redis":
+        import redis
+        return SharedCache(redis.Redis.from_url(RESPONSE_CACHE_REDIS_URL))
+    if name == "off":
+        return None
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {name}")
+
+
+_backend = create_backend(RESPONSE_CACHE_BACKEND)
+_stats = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0}
+# key -> (future, entry tags, stale); an invalidation matching the tags of
+# a response being computed marks it stale so it is not stored
+_inflight: Dict[str, Tuple[Future, Tuple[str, ...], list]] = {}
+_inflight_lock = threading.Lock()
+
+
+def set_backend(backend) -> None:
+    """Swap the backend (e.g. SharedCache(LocalStore()) in tests)"""
+    global _backend
+    _backend = backend
+
+
+def invalidate_tags(*tags: str) -> None:
+    """Drop every cached response tagged with any of tags"""
+    with _inflight_lock:
+        _stats["invalidations"] += 1
+        for _, entry_tags, stale in _inflight.values():
+            if not stale and set(entry_tags).intersection(tags):
+                stale.append(True)
+    if _backend is not None:
+        _backend.invalidate(tags)
+
+
+def get_response_cache_stats() -> dict:
+    with _inflight_lock:
+        stats = {"backend": RESPONSE_CACHE_BACKEND, **_stats}
+    if _backend is not None:
+        stats.update(_backend.stats())
+    return stats
+
+
+def access_scope(arguments: dict) -> str:
+    user = arguments["current_user"]
+    return "admin" if user.role == UserRole.ADMIN else f"user:{user.id}"
+
+
+def user_scope(arguments: dict) -> str:
+    return f"user:{arguments['current_user'].id}"
+
+
+def shared_scope(arguments: dict) -> str:
+    return "all"
+
+
+def _encode(result) -> bytes:
+    if not isinstance(result, Response):
+        result = FastJSONResponse(jsonable_encoder(result))
+    return f"{result.status_code} {result.media_type}\n".encode() + result.body
+
+
+def _decode(entry: bytes, cache_status: str) -> Response:
+    header, body = entry.split(b"\n", 1)
+    status_code, media_type = header.decode().split(" ", 1)
+    return Response(body, status_code=int(status_code), media_type=media_type, headers={"X-Cache": cache_status})
+
+
+def _cache_key(name: str, scope: str, arguments: dict) -> str:
+    params = "&".join(
+        f"{key}={value.value if isinstance(value, Enum) else value}"
+        for key, value in sorted(arguments.items())
+        if isinstance(value, _SCALARS)
+    )
+    if len(params) > 200:
+        params = hashlib.blake2b(params.encode(), digest_size=16).hexdigest()
+    return f"{name}|{scope}|{params}"
+
+
+def _compute(key: str, tags: Tuple[str, ...], produce: Callable[[], object]) -> Response:
+    """produce() once per key at a time; concurrent callers share its result"""
+    with _inflight_lock:
+        inflight = _inflight.get(key)
+        leader = inflight is None
+        if leader:
+            inflight = _inflight[key] = (Future(), tags, [])
+        _stats["misses" if leader else "coalesced"] += 1
+    future, _, stale = inflight
+
+    if not leader:
+        try:
+            return _decode(future.result(timeout=RESPONSE_CACHE_WAIT_SECONDS), "COALESCED")
+        except FutureTimeoutError:
+            return _decode(_encode(produce()), "MISS")
+
+    try:
+        entry = _encode(produce())
+        if not stale:
+            _backend.set(key, entry, tags, RESPONSE_CACHE_TTL)
+        future.set_result(entry)
+    except BaseException as error:
+        future.set_exception(error)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+    return _decode(entry, "MISS")
+
+
+def cached(tags: Iterable[str] = (), scope: Callable[[dict], str] = shared_scope):
+    """Cache a sync endpoint's response; see the module docstring"""
+    tags = tuple(tags)
+
+    def decorator(endpoint: Callable) -> Callable:
+        if inspect.iscoroutinefunction(endpoint):
+            raise TypeError("cached() supports sync (def) endpoints only")
+        name = f"{endpoint.__module__}.{endpoint.__qualname__}"
+
+        @functools.wraps(endpoint)
+        def wrapper(**arguments):
+            if _backend is None:
+                return endpoint(**arguments)
+
+            entry_scope = scope(arguments)
+            key = _cache_key(name, entry_scope, arguments)
+            entry = _backend.get(key)
+            if entry is not None:
+                # Endpoints run on threadpool threads: counters change under the lock
+                with _inflight_lock:
+                    _stats["hits"] += 1
+                return _decode(entry, "HIT")
+
+            entry_tags = tuple(tag.format(**arguments) for tag in tags) + (entry_scope,)
+            return _compute(key, entry_tags, lambda: endpoint(**arguments))
+
+        return wrapper
+    return decorator
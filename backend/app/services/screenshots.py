@@ -0,0 +1,61 @@
+"""
+Screenshot pipeline: responsive variants rendered in the image pool and stored
+in parallel. The largest fallback (JPEG, or PNG for lossless screenshots) is
+the step's main screenshot_url; every variant is returned so the frontend can
+build a srcset.
+"""
+import asyncio
+import io
+import uuid
+from typing import Optional
+
+from .image_processing import get_variant_widths, render_screenshot_variants, run_image_job
+from .storage import get_storage
+
+
+def variant_public_id(base_id: str, variant: dict, is_main: bool) -> str:
+    if is_main:
+        return base_id
+    return f"{base_id}_{variant['width']}w_{variant['format']}"
+
+
+async def process_screenshot(file_data: bytes, folder: str, public_id: Optional[str] = None) -> dict:
+    """Render and store all variants of a screenshot.
+
+    Each width is rendered by its own pool job, so variants are produced in
+    parallel across cores, and all uploads to storage run concurrently.
+    """
+    widths = get_variant_widths(file_data)
+    rendered = await asyncio.gather(*(
+        run_image_job(render_screenshot_variants, file_data, width) for width in widths
+    ))
+    variants = [variant for group in rendered for variant in group]
+    main = next(v for v in reversed(variants) if v["format"] != "webp")
+
+    base_id = public_id or f"{folder}/{uuid.uuid4().hex}"
+    storage = get_storage()
+    stored = await asyncio.gather(*(
+        storage.put(
+            io.BytesIO(variant["data"]),
+            resource_type="image",
+            folder=folder,
+            public_id=variant_public_id(base_id, variant, variant is main),
+            format=variant["format"]
+        )
+        for variant in variants
+    ))
+
+    result = {"variants": []}
+    for variant, stored_variant in zip(variants, stored):
+        entry = {
+            "url": stored_variant["url"],
+            "public_id": stored_variant["public_id"],
+            "width": variant["width"],
+            "height": variant["height"],
+            "format": variant["format"],
+            "bytes": len(variant["data"]),
+        }
+        result["variants"].append(entry)
+        if variant is main:
+            result.update(url=entry["url"], public_id=entry["public_id"], bytes=entry["bytes"])
+    return result
@@ -0,0 +1,105 @@
+"""
+Serving the built frontend (frontend/dist)
+
+- /assets: Vite puts a content hash in every asset name, so AssetFiles serves
+  them with a one-year immutable Cache-Control. When precompress_assets.py
+  has written .br/.gz sidecars at build time, the sidecar matching the
+  client's Accept-Encoding is sent instead of the original. Sidecars are
+  indexed once at startup, so choosing one costs no extra stat.
+- index.html: SPAIndex reads it once at startup and answers SPA routes from
+  memory with an ETag and Cache-Control: no-cache, so browsers revalidate
+  and get a 304 until the next deploy.
+- other files in dist/ (favicon, robots.txt): served as files with a short
+  cache, from a set listed at startup.
+
+The dist directory is read at startup; rebuilding the frontend needs a
+restart, which every deploy does anyway.
+"""
+import hashlib
+import mimetypes
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+
+from .compression import accepted_encodings
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PUBLIC_FILE_CACHE_CONTROL = "public, max-age=3600"
+
+# Preferred first; file suffix written by precompress_assets.py
+SIDECAR_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class AssetFiles(StaticFiles):
+    """StaticFiles for hashed assets: immutable caching and precompressed sidecars"""
+
+    def __init__(self, directory: str, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        # original path -> [(encoding, sidecar path, stat)], preferred first
+        self.sidecars: Dict[str, list] = {}
+        for root, _, files in os.walk(directory):
+            names = set(files)
+            for name in files:
+                variants = [
+                    (encoding, os.path.realpath(os.path.join(root, name + suffix)))
+                    for encoding, suffix in SIDECAR_ENCODINGS
+                    if name + suffix in names
+                ]
+                if variants:
+                    self.sidecars[os.path.realpath(os.path.join(root, name))] = [
+                        (encoding, sidecar, os.stat(sidecar)) for encoding, sidecar in variants
+                    ]
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        media_type, _ = mimetypes.guess_type(str(full_path))
+
+        variants = self.sidecars.get(str(full_path))
+        if variants:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, sidecar, sidecar_stat in variants:
+                if encoding in accepted:
+                    full_path, stat_result = sidecar, sidecar_stat
+                    headers["Content-Encoding"] = encoding
+                    break
+
+        response = FileResponse(
+            full_path, status_code=status_code, stat_result=stat_result, method=scope["method"],
+            media_type=media_type, headers=headers
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class SPAIndex:
+    """index.html and the other top-level files of dist/, read once"""
+
+    def __init__(self, dist: Path):
+        self.dist = dist
+        index_file = dist / "index.html"
+        self.body: Optional[bytes] = index_file.read_bytes() if index_file.is_file() else None
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=16).hexdigest()}"' if self.body else None
+        self.public_files = {
+            path.name for path in dist.iterdir() if path.is_file() and path.name != "index.html"
+        }
+
+    def public_file(self, path: str) -> Optional[Response]:
+        """A top-level file such as favicon.ico, or None"""
+        if path not in self.public_files:
+            return None
+        return FileResponse(self.dist / path, headers={"Cache-Control": PUBLIC_FILE_CACHE_CONTROL})
+
+    def response(self, if_none_match: Optional[str]) -> Response:
+        """index.html from memory, or 304 when the browser's copy is current"""
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if if_none_match and self.etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="text/html", headers=headers)
@@ -0,0 +1,198 @@
+"""
+SQL profiler (opt-in with SQL_PROFILE=true)
+
+Groups the queries of each request by normalized statement, so an ORM lazy
+load in a loop (tutorial.steps, step.annotations, user.accessible_tutorials)
+shows up as one statement run many times. Statements repeated at least
+SQL_N_PLUS_ONE_THRESHOLD times in one request are flagged as probable N+1.
+
+With profiling on:
+- every response carries X-SQL-Queries / X-SQL-Time-Ms / X-SQL-N-Plus-One
+- the last SQL_PROFILE_HISTORY request profiles are kept for
+  GET /api/metrics/sql-profile (admin or METRICS_TOKEN, like all metrics)
+- queries slower than SQL_SLOW_QUERY_MS are logged with their parameters
+  redacted to type names, and N+1 suspects are logged per request
+
+query_budget() uses the same hooks to assert a query budget in tests:
+
+    def test_list_tutorials_query_budget(client):
+        with query_budget(max_queries=3):
+            client.get("/api/tutorials/")
+"""
+import os
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQL_PROFILE = os.getenv("SQL_PROFILE", "false").lower() == "true"
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+SQL_PROFILE_HISTORY = int(os.getenv("SQL_PROFILE_HISTORY", "50"))
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|:\w+)\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+
+def normalize(statement: str) -> str:
+    """Statement with literals and IN lists collapsed, so repeats group together"""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    return _PLACEHOLDER_LIST.sub("(?...)", statement)
+
+
+def redact(parameters) -> object:
+    """Parameter values replaced by their type names, for logs"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) if isinstance(value, (dict, list, tuple)) else type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class QueryProfile:
+    """Queries of one request (or one query_budget block), grouped by statement"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements: Dict[str, dict] = {}
+
+    def add(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        entry = self.statements.get(statement)
+        if entry is None:
+            entry = self.statements[statement] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+
+    def repeated(self, threshold: int = SQL_N_PLUS_ONE_THRESHOLD) -> List[dict]:
+        """Statements run at least threshold times: probable N+1"""
+        return sorted(
+            (
+                {"statement": statement, **entry}
+                for statement, entry in self.statements.items()
+                if entry["count"] >= threshold
+            ),
+            key=lambda item: -item["count"]
+        )
+
+    def summary(self) -> dict:
+        return {
+            "request": self.label,
+            "queries": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "n_plus_one": self.repeated(),
+            "statements": sorted(
+                ({"statement": statement, **entry} for statement, entry in self.statements.items()),
+                key=lambda item: -item["total_ms"]
+            ),
+        }
+
+
+_profile: ContextVar[Optional[QueryProfile]] = ContextVar("sql_profile", default=None)
+# query_budget() blocks see every query, whatever thread or event loop runs it
+_budgets: List[QueryProfile] = []
+_history = deque(maxlen=SQL_PROFILE_HISTORY)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["profile_started"].pop()) * 1000
+    profile = _profile.get()
+    if profile is None and not _budgets:
+        return
+
+    normalized = normalize(statement)
+    if profile is not None:
+        profile.add(normalized, elapsed_ms)
+    for budget in _budgets:
+        budget.add(normalized, elapsed_ms)
+
+    if elapsed_ms >= SQL_SLOW_QUERY_MS:
+        label = profile.label if profile is not None else "-"
+        print(f"[SQL SLOW] {elapsed_ms:.1f}ms {label}: {normalized} params={redact(parameters)}")
+
+
+def install_profiler() -> None:
+    """Hook the profiler into every engine (safe to call more than once)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def get_recent_profiles() -> List[dict]:
+    """Summaries of the most recent profiled requests, newest first"""
+    return [profile.summary() for profile in reversed(_history)]
+
+
+class SQLProfilerMiddleware:
+    """ASGI middleware that profiles each request's queries"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile(f"{scope['method']} {scope['path']}")
+        token = _profile.set(profile)
+
+        async def send_with_summary(message):
+            if message["type"] == "http.response.start":
+                repeated = profile.repeated()
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-sql-queries", str(profile.count).encode()),
+                    (b"x-sql-time-ms", f"{profile.total_ms:.1f}".encode()),
+                    (b"x-sql-n-plus-one", str(len(repeated)).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            _profile.reset(token)
+            _history.append(profile)
+            for entry in profile.repeated():
+                print(f"[SQL N+1] {profile.label}: {entry['count']}x {entry['statement']}")
+
+
+@contextmanager
+def query_budget(max_queries: int, max_repeats: Optional[int] = None) -> Iterator[QueryProfile]:
+    """Fail if the block runs more than max_queries queries.
+
+    With max_repeats, also fail if any single statement runs more than
+    max_repeats times (an N+1 the total alone might not catch).
+    """
+    install_profiler()
+    budget = QueryProfile("query_budget")
+    _budgets.append(budget)
+    try:
+        yield budget
+    finally:
+        _budgets.remove(budget)
+
+    worst = max(budget.statements.items(), key=lambda item: item[1]["count"], default=None)
+    if budget.count > max_queries:
+        raise AssertionError(
+            f"{budget.count} queries, budget is {max_queries}"
+            + (f"; most repeated ({worst[1]['count']}x): {worst[0]}" if worst else "")
+        )
+    if max_repeats is not None and worst and worst[1]["count"] > max_repeats:
+        raise AssertionError(f"statement ran {worst[1]['count']}x, limit is {max_repeats}: {worst[0]}")
@@ -0,0 +1,232 @@
+"""
+Media storage backends
+
+Uploaded media goes through a StorageBackend chosen by STORAGE_BACKEND:
+
+- "cloudinary" (default): assets are stored on Cloudinary (see
+  cloudinary_storage.py, imported on first use). Cloudinary requests
+  are blocking, so every call runs in a worker thread and the event loop stays
+  free during network transfers. All threads share a single keep-alive
+  connection pool sized to the allowed concurrency, and transient network
+  failures are retried with exponential backoff. Set CLOUDINARY_UPLOAD_PREFIX
+  to point the client at a local stub server instead of
+  https://api.cloudinary.com.
+- "local": assets are written under MEDIA_ROOT and served by the app itself
+  at MEDIA_URL (see app/api/media.py), for offline use and benchmarks.
+"""
+import abc
+import asyncio
+import mimetypes
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional
+
+import anyio
+
+from .metrics import timed
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "cloudinary").lower()
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", "./media"))
+MEDIA_URL = os.getenv("MEDIA_URL", "/media").rstrip("/")
+
+STORAGE_TIMEOUT = float(os.getenv("STORAGE_TIMEOUT", "60"))
+STORAGE_CONNECT_TIMEOUT = float(os.getenv("STORAGE_CONNECT_TIMEOUT", "10"))
+STORAGE_RETRIES = int(os.getenv("STORAGE_RETRIES", "3"))
+STORAGE_RETRY_BACKOFF = float(os.getenv("STORAGE_RETRY_BACKOFF", "0.5"))
+STORAGE_MAX_CONCURRENCY = int(os.getenv("STORAGE_MAX_CONCURRENCY", "8"))
+UPLOAD_LARGE_CHUNK_SIZE = 6 * 1024 * 1024  # Cloudinary requires chunks of at least 5MB
+
+
+class StorageBackend(abc.ABC):
+    """Interface for media storage.
+
+    Assets are addressed by public_id. put() accepts an open binary file and
+    returns a dict with at least "public_id", "url" and "bytes". delete()
+    returns "ok" or "not found", mirroring Cloudinary's destroy result.
+    list() and delete_many() are bulk operations for maintenance scripts.
+    Backends must implement every abstract method; the rest have defaults.
+    """
+
+    @abc.abstractmethod
+    async def put(
+        self,
+        file: BinaryIO,
+        *,
+        resource_type: str,
+        folder: str,
+        public_id: Optional[str] = None,
+        format: Optional[str] = None,
+        filename: Optional[str] = None
+    ) -> dict:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get(self, public_id: str, resource_type: str = "image") -> bytes:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def delete(self, public_id: str, resource_type: str = "image") -> str:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def url(self, public_id: str, resource_type: str = "image") -> str:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def stat(self, public_id: str, resource_type: str = "image") -> Optional[dict]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def list(self, folder: str, resource_type: str = "image") -> List[dict]:
+        """Every asset under a folder as {public_id, bytes, created_at (naive UTC datetime)}"""
+        raise NotImplementedError
+
+    async def delete_many(self, public_ids: List[str], resource_type: str = "image") -> Dict[str, str]:
+        """Delete several assets, returning "ok" or "not found" per public_id"""
+        results = await asyncio.gather(*(self.delete(public_id, resource_type) for public_id in public_ids))
+        return dict(zip(public_ids, results))
+
+    @abc.abstractmethod
+    def public_id_from_url(self, url: str) -> Optional[str]:
+        """public_id behind a URL returned by put(), or None if it is not one of ours"""
+        raise NotImplementedError
+
+    def video_poster_url(self, public_id: str) -> Optional[str]:
+        """Poster image the backend renders for a stored video, if it can"""
+        return None
+
+    def local_path(self, public_id: str) -> Optional[Path]:
+        """Filesystem path of a stored asset, for backends that keep files locally"""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Assets stored on the local filesystem and served by the app.
+
+    The public_id is the path below MEDIA_ROOT, extension included. URLs carry
+    the file's mtime as a version so they can be cached as immutable even when
+    a public_id is overwritten.
+    """
+
+    def __init__(self, root: Path = MEDIA_ROOT, base_url: str = MEDIA_URL):
+        self.root = Path(root).resolve()
+        self.base_url = base_url
+
+    def path(self, public_id: str) -> Path:
+        """Resolve a public_id to a file path, refusing anything outside the root"""
+        path = (self.root / public_id).resolve()
+        if self.root not in path.parents:
+            raise FileNotFoundError(public_id)
+        return path
+
+    @timed("storage")
+    async def put(self, file, *, resource_type, folder, public_id=None, format=None, filename=None):
+        extension = format or (os.path.splitext(filename)[1].lstrip(".").lower() if filename else "")
+        public_id = public_id or f"{folder}/{uuid.uuid4().hex}"
+        if extension:
+            public_id = f"{public_id}.{extension}"
+        path = self.path(public_id)
+
+        def write() -> int:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            file.seek(0)
+            # Write to a temp file and rename so readers never see partial files
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+                shutil.copyfileobj(file, tmp, UPLOAD_LARGE_CHUNK_SIZE)
+            os.replace(tmp.name, path)
+            return path.stat().st_size
+
+        size = await anyio.to_thread.run_sync(write)
+        return {
+            "public_id": public_id,
+            "url": self.url(public_id, resource_type),
+            "bytes": size,
+            "format": extension or None,
+            "resource_type": resource_type,
+        }
+
+    @timed("storage")
+    async def get(self, public_id, resource_type="image"):
+        return await anyio.to_thread.run_sync(self.path(public_id).read_bytes)
+
+    @timed("storage")
+    async def delete(self, public_id, resource_type="image"):
+        try:
+            path = self.path(public_id)
+            await anyio.to_thread.run_sync(path.unlink)
+        except FileNotFoundError:
+            return "not found"
+        return "ok"
+
+    def url(self, public_id, resource_type="image"):
+        try:
+            version = int(self.path(public_id).stat().st_mtime)
+        except FileNotFoundError:
+            return f"{self.base_url}/{public_id}"
+        return f"{self.base_url}/{public_id}?v={version}"
+
+    @timed("storage")
+    async def stat(self, public_id, resource_type="image"):
+        try:
+            stat_result = await anyio.to_thread.run_sync(self.path(public_id).stat)
+        except FileNotFoundError:
+            return None
+        return {
+            "public_id": public_id,
+            "bytes": stat_result.st_size,
+            "format": os.path.splitext(public_id)[1].lstrip(".") or None,
+            "content_type": mimetypes.guess_type(public_id)[0],
+            "created_at": datetime.utcfromtimestamp(stat_result.st_mtime).isoformat(),
+        }
+
+    @timed("storage")
+    async def list(self, folder, resource_type="image"):
+        def scan() -> List[dict]:
+            base = self.root / folder
+            if not base.is_dir():
+                return []
+            assets = []
+            for path in base.rglob("*"):
+                # Skip directories and temp files from writes in progress
+                if not path.is_file() or path.name.startswith("tmp"):
+                    continue
+                stat_result = path.stat()
+                assets.append({
+                    "public_id": path.relative_to(self.root).as_posix(),
+                    "bytes": stat_result.st_size,
+                    "created_at": datetime.utcfromtimestamp(stat_result.st_mtime),
+                })
+            return assets
+
+        return await anyio.to_thread.run_sync(scan)
+
+    def local_path(self, public_id):
+        return self.path(public_id)
+
+    def public_id_from_url(self, url):
+        prefix = f"{self.base_url}/"
+        if not url or not url.startswith(prefix):
+            return None
+        return url[len(prefix):].split("?", 1)[0]
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """Storage backend selected by STORAGE_BACKEND, shared by all requests"""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "local":
+            _storage = LocalStorage()
+        elif STORAGE_BACKEND == "cloudinary":
+            # Imported here so the SDK only loads when it is actually used
+            from .cloudinary_storage import CloudinaryStorage
+            _storage = CloudinaryStorage()
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+    return _storage
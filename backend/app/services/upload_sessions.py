@@ -0,0 +1,196 @@
+"""
+Resumable uploads
+
+Large videos can be sent in chunks over several requests: the client creates
+a session, PUTs chunks at increasing offsets, asks for the received offset
+after a dropped connection and resumes from there, then finalizes. Chunks are
+streamed from the request straight into a part file on disk, so neither a
+chunk nor the assembled file is ever held in memory, and finalizing hands
+that same file to storage or to the media job queue.
+
+Sessions that stop receiving chunks expire after UPLOAD_SESSION_TTL_HOURS;
+a background task deletes them together with their part files.
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+import anyio
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
+
+from ..database import SessionLocal
+from ..models import UploadSession
+
+UPLOAD_SESSION_DIR = Path(os.getenv("UPLOAD_SESSION_DIR", "./upload_sessions"))
+UPLOAD_SESSION_TTL = timedelta(hours=float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24")))
+UPLOAD_SESSION_GC_INTERVAL = float(os.getenv("UPLOAD_SESSION_GC_INTERVAL", "600"))
+UPLOAD_CHUNK_MAX_SIZE = int(os.getenv("UPLOAD_CHUNK_MAX_SIZE", 16 * 1024 * 1024))
+
+# One writer per session in this process
+_locks: Dict[str, asyncio.Lock] = {}
+_gc_task: Optional[asyncio.Task] = None
+
+
+def create_session(
+    db: Session,
+    filename: str,
+    size: int,
+    kind: str = "video",
+    step_id: Optional[str] = None,
+    tutorial_title: Optional[str] = None,
+    step_order: Optional[int] = None
+) -> UploadSession:
+    """Start a session with an empty part file"""
+    UPLOAD_SESSION_DIR.mkdir(parents=True, exist_ok=True)
+    session_id = str(uuid.uuid4())
+    part_path = UPLOAD_SESSION_DIR / f"{session_id}.part"
+    part_path.touch()
+
+    now = datetime.utcnow()
+    session = UploadSession(
+        id=session_id,
+        kind=kind,
+        filename=filename,
+        size=size,
+        received=0,
+        part_path=str(part_path),
+        step_id=step_id,
+        tutorial_title=tutorial_title,
+        step_order=step_order,
+        created_at=now,
+        updated_at=now,
+        expires_at=now + UPLOAD_SESSION_TTL
+    )
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return session
+
+
+def get_active_session(db: Session, session_id: str) -> UploadSession:
+    session = db.query(UploadSession).filter(
+        UploadSession.id == session_id,
+        UploadSession.status == "active",
+        UploadSession.expires_at > datetime.utcnow()
+    ).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found or expired")
+    return session
+
+
+def offset_mismatch(session: UploadSession) -> HTTPException:
+    """409 telling the client where to resume"""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Chunk offset does not match received bytes ({session.received})",
+        headers={"Upload-Offset": str(session.received)}
+    )
+
+
+async def write_chunk(db: Session, session: UploadSession, offset: int, stream: AsyncIterator[bytes]) -> UploadSession:
+    """Append a chunk streamed from the request at the given offset.
+
+    The offset must equal the bytes already received. If the client
+    disconnects mid-chunk, whatever reached the disk is kept and recorded, so
+    the next attempt resumes from there instead of resending the whole chunk.
+    """
+    lock = _locks.setdefault(session.id, asyncio.Lock())
+    if lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Another chunk is being written")
+
+    async with lock:
+        await anyio.to_thread.run_sync(db.refresh, session)
+        if offset != session.received:
+            raise offset_mismatch(session)
+
+        remaining = session.size - offset
+        written = 0
+        try:
+            async with await anyio.open_file(session.part_path, "r+b") as part:
+                # Drop anything past the recorded offset left by a failed write
+                await part.truncate(offset)
+                await part.seek(offset)
+                async for data in stream:
+                    if written + len(data) > min(remaining, UPLOAD_CHUNK_MAX_SIZE):
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Chunk exceeds the declared size or the {UPLOAD_CHUNK_MAX_SIZE} byte chunk limit"
+                        )
+                    await part.write(data)
+                    written += len(data)
+        except ClientDisconnect:
+            print(f"[UPLOAD SESSION] {session.id}: client disconnected after {offset + written} bytes")
+        finally:
+            now = datetime.utcnow()
+            session.received = offset + written
+            session.updated_at = now
+            session.expires_at = now + UPLOAD_SESSION_TTL
+            _locks.pop(session.id, None)
+            await anyio.to_thread.run_sync(db.commit)
+
+    await anyio.to_thread.run_sync(db.refresh, session)
+    return session
+
+
+def close_session(db: Session, session: UploadSession, remove_part: bool = True) -> None:
+    """Forget a session, deleting its part file unless it was handed off"""
+    if remove_part and session.part_path:
+        try:
+            os.remove(session.part_path)
+        except FileNotFoundError:
+            pass
+    db.delete(session)
+    db.commit()
+
+
+def collect_expired_sessions() -> int:
+    """Delete expired sessions and part files no session refers to"""
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        expired = db.query(UploadSession).filter(UploadSession.expires_at <= now).all()
+        for session in expired:
+            close_session(db, session)
+
+        # Part files left behind by a crash between file creation and commit
+        known = {path for (path,) in db.query(UploadSession.part_path).all()}
+        stale_before = (now - UPLOAD_SESSION_TTL).timestamp()
+        if UPLOAD_SESSION_DIR.exists():
+            for path in UPLOAD_SESSION_DIR.glob("*.part"):
+                if str(path) not in known and path.stat().st_mtime < stale_before:
+                    path.unlink(missing_ok=True)
+
+        if expired:
+            print(f"[UPLOAD SESSION] Removed {len(expired)} expired session(s)")
+        return len(expired)
+    finally:
+        db.close()
+
+
+async def _gc_loop() -> None:
+    while True:
+        try:
+            await anyio.to_thread.run_sync(collect_expired_sessions)
+        except Exception as e:
+            print(f"[UPLOAD SESSION] Cleanup failed: {e}")
+        await asyncio.sleep(UPLOAD_SESSION_GC_INTERVAL)
+
+
+def start_upload_session_gc() -> None:
+    """Start the periodic cleanup task on the running event loop"""
+    global _gc_task
+    if _gc_task is None:
+        _gc_task = asyncio.create_task(_gc_loop())
+
+
+async def stop_upload_session_gc() -> None:
+    global _gc_task
+    if _gc_task is not None:
+        _gc_task.cancel()
+        await asyncio.gather(_gc_task, return_exceptions=True)
+        _gc_task = None
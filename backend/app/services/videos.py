@@ -0,0 +1,117 @@
+"""
+Video pipeline: store the upload, then read its metadata (duration, size,
+codec) and a poster frame once, so the player can lay out and lazy-load the
+video without fetching any of it.
+
+Cloudinary reports the metadata in its upload response and renders posters
+as a derived image of the video. With local storage both come from ffprobe
+and ffmpeg when they are installed; without them only size and format are
+known and there is no poster.
+"""
+import io
+import json
+import shutil
+import subprocess
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+import anyio
+
+from .storage import get_storage
+
+POSTER_MAX_WIDTH = 1280
+FFMPEG_TIMEOUT = 60
+
+
+def probe_video(path: Path) -> dict:
+    """Duration, dimensions and codec read with ffprobe ({} if unavailable)"""
+    if not shutil.which("ffprobe"):
+        return {}
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", str(path)],
+            capture_output=True, check=True, timeout=FFMPEG_TIMEOUT
+        ).stdout
+        info = json.loads(output)
+    except (subprocess.SubprocessError, ValueError) as e:
+        print(f"[VIDEO] ffprobe failed for {path}: {e}")
+        return {}
+
+    stream = next((s for s in info.get("streams", []) if s.get("codec_type") == "video"), {})
+    duration = info.get("format", {}).get("duration") or stream.get("duration")
+    return {
+        "duration": round(float(duration), 3) if duration else None,
+        "width": stream.get("width"),
+        "height": stream.get("height"),
+        "codec": stream.get("codec_name"),
+    }
+
+
+def extract_poster(path: Path, at_seconds: float) -> Optional[bytes]:
+    """One JPEG frame at the given time, scaled down to POSTER_MAX_WIDTH"""
+    if not shutil.which("ffmpeg"):
+        return None
+    try:
+        return subprocess.run(
+            [
+                "ffmpeg", "-v", "error", "-ss", f"{at_seconds:.3f}", "-i", str(path),
+                "-frames:v", "1", "-vf", f"scale='min({POSTER_MAX_WIDTH},iw)':-2",
+                "-f", "image2", "-c:v", "mjpeg", "-q:v", "4", "pipe:1"
+            ],
+            capture_output=True, check=True, timeout=FFMPEG_TIMEOUT
+        ).stdout or None
+    except subprocess.SubprocessError as e:
+        print(f"[VIDEO] Poster extraction failed for {path}: {e}")
+        return None
+
+
+async def process_video(
+    file: BinaryIO,
+    folder: str,
+    public_id: Optional[str] = None,
+    filename: Optional[str] = None
+) -> dict:
+    """Store a video and describe it.
+
+    Returns the storage result plus "poster_url" and "metadata"
+    ({duration, width, height, codec, bytes, format}).
+    """
+    storage = get_storage()
+    stored = await storage.put(
+        file,
+        resource_type="video",
+        folder=folder,
+        public_id=public_id,
+        filename=filename
+    )
+
+    metadata = {
+        "duration": stored.get("duration"),
+        "width": stored.get("width"),
+        "height": stored.get("height"),
+        "codec": (stored.get("video") or {}).get("codec"),
+        "bytes": stored.get("bytes"),
+        "format": stored.get("format"),
+    }
+    poster_url = storage.video_poster_url(stored["public_id"])
+
+    # Nothing reported by the backend: inspect the stored file ourselves
+    path = storage.local_path(stored["public_id"])
+    if path is not None:
+        probed = await anyio.to_thread.run_sync(probe_video, path)
+        metadata.update({key: value for key, value in probed.items() if value is not None})
+
+        if poster_url is None:
+            poster = await anyio.to_thread.run_sync(extract_poster, path, (metadata["duration"] or 0) / 2)
+            if poster:
+                base_id = stored["public_id"].rsplit(".", 1)[0]
+                stored_poster = await storage.put(
+                    io.BytesIO(poster),
+                    resource_type="image",
+                    folder=folder,
+                    public_id=f"{base_id}_poster",
+                    format="jpg"
+                )
+                poster_url = stored_poster["url"]
+
+    return {**stored, "poster_url": poster_url, "metadata": metadata}
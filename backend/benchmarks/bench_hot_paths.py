@@ -0,0 +1,200 @@
+"""
+Benchmark: per-request CPU hot paths, with a regression gate
+
+Times the work every tutorial/progress request pays for outside the database,
+on in-memory fixtures of realistic size (a 12-step tutorial with 4 annotations
+per step, a 100-tutorial listing, a learner granted 200 tutorials, a
+2560x1440 screenshot):
+
+- ORM -> Pydantic: response_model validation of TutorialResponse,
+  TutorialListResponse and ProgressResponse from ORM objects
+- JSON: model_dump(mode="json") plus rendering with the response class, the
+  same two steps FastAPI runs after the endpoint returns, and the direct
+  FastJSONResponse(model) path get_tutorial and list_tutorials use
+- access: check_tutorial_access for admins and for learners with explicit grants
+- image: compress_image_in_memory on an upload
+
+Each case is auto-ranged like timeit and the median of --repeat runs is kept.
+--save writes the medians to a JSON baseline; --compare reads one back and
+exits with status 1 if any case is slower than the baseline by more than
+--threshold (default 15%), so it can gate a branch in CI:
+
+Usage (from backend/):
+    python -m benchmarks.bench_hot_paths
+    python -m benchmarks.bench_hot_paths --save benchmarks/baseline.json
+    python -m benchmarks.bench_hot_paths --compare benchmarks/baseline.json --threshold 0.10
+    python -m benchmarks.bench_hot_paths --filter json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+import uuid
+from datetime import datetime, timedelta
+
+from app.api.tutorials import check_tutorial_access
+from app.models import Annotation, Progress, Step, Tutorial
+from app.models.user import User, UserRole
+from app.schemas.progress import ProgressResponse
+from app.schemas.tutorial import TutorialListResponse, TutorialResponse
+from app.services.image_processing import compress_image_in_memory
+from app.services.json_response import FastJSONResponse
+from benchmarks.fixtures import make_screenshot
+
+CREATED_AT = datetime(2025, 3, 1, 12, 0)
+
+
+def make_tutorial(steps=12, annotations_per_step=4, published=True):
+    tutorial = Tutorial(
+        id=str(uuid.uuid4()), title="Como cadastrar um atendimento no sistema interno",
+        description="Passo a passo do cadastro de um novo atendimento, da busca do assistido ao protocolo. " * 3,
+        category="Atendimento", tags=["rotina", "sistema", "passo-a-passo"], created_by=str(uuid.uuid4()),
+        created_at=CREATED_AT, updated_at=CREATED_AT, is_published=published, version=3,
+    )
+    for order in range(1, steps + 1):
+        step = Step(
+            id=str(uuid.uuid4()), tutorial_id=tutorial.id, order=order, title=f"Passo {order}",
+            screenshot_url=f"/media/screenshots/{uuid.uuid4().hex}.jpg",
+            screenshot_variants=[
+                {"url": f"/media/screenshots/v{width}.{fmt}", "width": width, "height": width * 9 // 16,
+                 "format": fmt, "bytes": width * 60}
+                for width in (640, 1280, 1920) for fmt in ("webp", "jpg")
+            ],
+            video_url=None, video_poster_url=None, video_metadata=None,
+            content="<p>Acesse o menu <strong>Atendimentos</strong> e clique em <em>Novo</em>.</p>" * 4,
+            validation_required=False, validation_type=None, validation_target=None, created_at=CREATED_AT,
+        )
+        for index in range(annotations_per_step):
+            step.annotations.append(Annotation(
+                id=str(uuid.uuid4()), step_id=step.id, type=("arrow", "box", "tooltip", "highlight")[index % 4],
+                coordinates={"x": 120 + index * 40, "y": 300, "width": 220, "height": 48,
+                             "points": [{"x": 100, "y": 280}, {"x": 180, "y": 320}]},
+                text="Clique aqui para continuar", animation="fadeIn", delay=index * 200,
+                style={"color": "#e11d48", "strokeWidth": 3, "opacity": 0.9},
+            ))
+        tutorial.steps.append(step)
+    return tutorial
+
+
+def make_progress(steps=12):
+    return Progress(
+        id=str(uuid.uuid4()), user_id=str(uuid.uuid4()), tutorial_id=str(uuid.uuid4()), current_step=steps - 2,
+        completed_steps=list(range(1, steps - 2)), time_per_step={str(order): 30 + order for order in range(1, steps)},
+        attempts=2, completed=False, score=0.0, started_at=CREATED_AT, completed_at=None,
+        last_accessed=CREATED_AT + timedelta(minutes=25),
+    )
+
+
+def list_response(tutorials):
+    """What list_tutorials builds per row"""
+    return [
+        TutorialListResponse(
+            id=tutorial.id, title=tutorial.title, description=tutorial.description, category=tutorial.category,
+            tags=tutorial.tags, created_at=tutorial.created_at, is_published=tutorial.is_published,
+            step_count=len(tutorial.steps),
+        )
+        for tutorial in tutorials
+    ]
+
+
+def render(content):
+    """Body bytes the API's default response class produces for content"""
+    return FastJSONResponse(content).body
+
+
+def build_cases():
+    tutorial = make_tutorial()
+    listing = [make_tutorial(steps=8, annotations_per_step=0) for _ in range(100)]
+    progress = make_progress()
+
+    tutorial_model = TutorialResponse.model_validate(tutorial)
+    listing_models = list_response(listing)
+    progress_model = ProgressResponse.model_validate(progress)
+
+    admin = User(id=str(uuid.uuid4()), role=UserRole.ADMIN)
+    learner = User(id=str(uuid.uuid4()), role=UserRole.COLABORADOR)
+    granted = [make_tutorial(steps=0, published=False) for _ in range(200)]
+    learner.accessible_tutorials.extend(granted)
+    last_granted = granted[-1]
+
+    upload = make_screenshot((2560, 1440), seed=46, fmt="PNG")
+
+    return {
+        "orm_to_pydantic.tutorial": lambda: TutorialResponse.model_validate(tutorial),
+        "orm_to_pydantic.tutorial_list_100": lambda: list_response(listing),
+        "orm_to_pydantic.progress": lambda: ProgressResponse.model_validate(progress),
+        "json.tutorial": lambda: render(tutorial_model.model_dump(mode="json")),
+        "json.tutorial_list_100": lambda: render([model.model_dump(mode="json") for model in listing_models]),
+        "json.progress": lambda: render(progress_model.model_dump(mode="json")),
+        "json.tutorial_direct": lambda: render(tutorial_model),
+        "json.tutorial_list_100_direct": lambda: render(listing_models),
+        "access.admin": lambda: check_tutorial_access(last_granted, admin),
+        "access.learner_granted_200": lambda: check_tutorial_access(last_granted, learner),
+        "image.compress_image_in_memory": lambda: compress_image_in_memory(upload),
+    }
+
+
+def measure(func, repeat):
+    """Median seconds per call over repeat auto-ranged runs (each at least 0.2s)"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return statistics.median(run / number for run in timer.repeat(repeat=repeat, number=number))
+
+
+def format_time(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU hot paths of tutorial and progress requests")
+    parser.add_argument("--repeat", type=int, default=7, help="Auto-ranged runs per case; the median is kept")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--save", help="Write the results to this JSON baseline file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Allowed slowdown against the baseline before failing (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    cases = {name: func for name, func in build_cases().items() if not args.filter or args.filter in name}
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    started = time.perf_counter()
+    results, regressions = {}, []
+    print(f"\n{'Case':36} {'Median':>12} {'Baseline':>12} {'Change':>8}")
+    print("-" * 72)
+    for name, func in cases.items():
+        results[name] = measure(func, args.repeat)
+        line = f"{name:36} {format_time(results[name]):>12}"
+        if name in baseline:
+            change = results[name] / baseline[name] - 1
+            flag = ""
+            if change > args.threshold:
+                regressions.append(name)
+                flag = "  REGRESSION"
+            line += f" {format_time(baseline[name]):>12} {change * 100:>+7.1f}%{flag}"
+        print(line)
+    print("-" * 72)
+    print(f"{len(results)} case(s) in {time.perf_counter() - started:.1f}s on Python {platform.python_version()}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+                "results": results,
+            }, f, indent=2)
+        print(f"[OK] Baseline saved to {args.save}")
+
+    if regressions:
+        print(f"[ERROR] {len(regressions)} case(s) slower than the baseline by more than "
+              f"{args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
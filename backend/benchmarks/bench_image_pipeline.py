@@ -0,0 +1,132 @@
+"""
+Benchmark: screenshot downscaling pipeline
+
+Renders every variant of an upload with the previous pipeline (full decode,
+LANCZOS straight to each width) and with the current one (JPEG draft and
+integer reduce before LANCZOS, lossless path for flat PNG captures). Reports
+time per upload, bytes of the fallback variants and the lowest PSNR of a new
+fallback variant against the old one at the same width.
+
+Usage (from backend/):
+    python -m benchmarks.bench_image_pipeline
+    python -m benchmarks.bench_image_pipeline --corpus ~/screenshots --repeat 5
+"""
+import argparse
+import io
+import math
+import time
+from pathlib import Path
+
+from PIL import Image, ImageChops, ImageStat
+
+from app.services.image_processing import (
+    SCREENSHOT_JPEG_QUALITY,
+    SCREENSHOT_WEBP_QUALITY,
+    get_variant_widths,
+    render_screenshot_variants,
+)
+from benchmarks.fixtures import make_screenshot
+
+
+def legacy_render(file_data, width):
+    """render_screenshot_variants before draft/reduce, kept as the baseline"""
+    img = Image.open(io.BytesIO(file_data))
+    if img.mode in ("RGBA", "P"):
+        img = img.convert("RGB")
+    if img.width > width:
+        img = img.resize((width, int(img.height * width / img.width)), Image.Resampling.LANCZOS)
+
+    variants = []
+    for fmt in ("webp", "jpg"):
+        output = io.BytesIO()
+        if fmt == "webp":
+            img.save(output, format="WEBP", quality=SCREENSHOT_WEBP_QUALITY, method=4)
+        else:
+            img.save(output, format="JPEG", optimize=True, quality=SCREENSHOT_JPEG_QUALITY)
+        variants.append({"format": fmt, "width": img.width, "data": output.getvalue()})
+    return variants
+
+
+def render_upload(render, file_data):
+    """Every variant the upload endpoint would store"""
+    variants = []
+    for width in get_variant_widths(file_data):
+        variants.extend(render(file_data, width))
+    return variants
+
+
+def fallbacks(variants):
+    return {v["width"]: v for v in variants if v["format"] != "webp"}
+
+
+def psnr(reference, candidate):
+    a = Image.open(io.BytesIO(reference)).convert("RGB")
+    b = Image.open(io.BytesIO(candidate)).convert("RGB")
+    mse = sum(v ** 2 for v in ImageStat.Stat(ImageChops.difference(a, b)).rms) / 3
+    return float("inf") if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def timed(render, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = render_upload(render, data)
+        best = min(best, time.perf_counter() - started)
+    return result, best * 1000
+
+
+def generated_corpus():
+    corpus = {}
+    for size in ((2560, 1440), (3840, 2160), (7680, 4320)):
+        for fmt in ("JPEG", "PNG"):
+            corpus[f"{fmt.lower()} {size[0]}x{size[1]}"] = make_screenshot(size, seed=size[0], fmt=fmt)
+    corpus["flat png 1600x900"] = make_screenshot((1600, 900), seed=1, photo=False)
+    corpus["flat png 2560x1440"] = make_screenshot((2560, 1440), seed=2, photo=False)
+    return corpus
+
+
+def load_corpus(directory):
+    return {
+        path.name: path.read_bytes()
+        for path in sorted(Path(directory).expanduser().iterdir())
+        if path.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp")
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Old vs new screenshot downscaling")
+    parser.add_argument("--corpus", help="Directory of real screenshots (default: generated fixtures)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per image; the best time is kept")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else generated_corpus()
+
+    print(f"\n{'Image':24} {'Old ms':>8} {'New ms':>8} {'Old KB':>8} {'New KB':>8} {'Min PSNR':>9}")
+    print("-" * 70)
+    old_ms_total = new_ms_total = old_bytes_total = new_bytes_total = 0
+    for name, data in corpus.items():
+        old, old_ms = timed(legacy_render, data, args.repeat)
+        new, new_ms = timed(render_screenshot_variants, data, args.repeat)
+        old_main, new_main = fallbacks(old), fallbacks(new)
+        old_bytes = sum(len(v["data"]) for v in old_main.values())
+        new_bytes = sum(len(v["data"]) for v in new_main.values())
+        quality = min(psnr(old_main[w]["data"], new_main[w]["data"]) for w in old_main)
+
+        old_ms_total += old_ms
+        new_ms_total += new_ms
+        old_bytes_total += old_bytes
+        new_bytes_total += new_bytes
+        print(
+            f"{name[:24]:24} {old_ms:>8.1f} {new_ms:>8.1f} {old_bytes / 1024:>8.0f} {new_bytes / 1024:>8.0f}"
+            f" {quality:>7.1f}dB"
+        )
+
+    print("-" * 70)
+    print(
+        f"{'TOTAL':24} {old_ms_total:>8.1f} {new_ms_total:>8.1f}"
+        f" {old_bytes_total / 1024:>8.0f} {new_bytes_total / 1024:>8.0f}"
+    )
+    print(
+        f"\nSpeedup: {old_ms_total / new_ms_total:.2f}x, "
+        f"fallback bytes: {(new_bytes_total - old_bytes_total) * 100 / old_bytes_total:+.0f}%"
+    )
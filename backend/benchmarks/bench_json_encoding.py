@@ -0,0 +1,87 @@
+"""
+Benchmark: response encoding of get_tutorial and list_tutorials
+
+Compares what happens after the query returns, for the previous and the
+current response path:
+
+- old: FastAPI response_model handling (validate from the ORM object, dump
+  to a JSON-ready dict) then JSONResponse, i.e. json.dumps
+- new: the endpoint validates the model and returns FastJSONResponse, so
+  pydantic-core writes the bytes directly
+
+Both bodies are compared byte for byte; any difference is reported as an
+error. Tutorials go from a small one to one with hundreds of annotations.
+
+Usage (from backend/):
+    python -m benchmarks.bench_json_encoding
+    python -m benchmarks.bench_json_encoding --repeat 9
+"""
+import argparse
+import statistics
+import sys
+import timeit
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_response_field
+
+from app.schemas.tutorial import TutorialListResponse, TutorialResponse
+from app.services.json_response import FastJSONResponse
+from benchmarks.bench_hot_paths import list_response, make_tutorial
+
+TUTORIAL_SIZES = ((8, 2), (12, 4), (20, 10), (30, 25))  # (steps, annotations per step)
+LIST_SIZES = (20, 100)
+
+
+def old_body(field, content):
+    value, errors = field.validate(content, {}, loc=("response",))
+    assert not errors, errors
+    return JSONResponse(field.serialize(value, mode="json")).body
+
+
+def measure(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return statistics.median(run / number for run in timer.repeat(repeat=repeat, number=number)) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Old vs new JSON response encoding")
+    parser.add_argument("--repeat", type=int, default=5, help="Auto-ranged runs per case; the median is kept")
+    args = parser.parse_args()
+
+    tutorial_field = create_response_field(name="Response_get_tutorial", type_=TutorialResponse)
+    list_field = create_response_field(name="Response_list_tutorials", type_=List[TutorialListResponse])
+
+    cases = []
+    for steps, per_step in TUTORIAL_SIZES:
+        tutorial = make_tutorial(steps=steps, annotations_per_step=per_step)
+        cases.append((
+            f"get_tutorial {steps}x{per_step} ann",
+            lambda t=tutorial: old_body(tutorial_field, t),
+            lambda t=tutorial: FastJSONResponse(TutorialResponse.model_validate(t)).body,
+        ))
+    for rows in LIST_SIZES:
+        tutorials = [make_tutorial(steps=8, annotations_per_step=0) for _ in range(rows)]
+        cases.append((
+            f"list_tutorials {rows} rows",
+            lambda ts=tutorials: old_body(list_field, list_response(ts)),
+            lambda ts=tutorials: FastJSONResponse(list_response(ts)).body,
+        ))
+
+    print(f"\n{'Endpoint payload':30} {'KB':>7} {'Old ms':>8} {'New ms':>8} {'Speedup':>8} {'Same bytes':>11}")
+    print("-" * 78)
+    mismatches = 0
+    for name, old, new in cases:
+        old_bytes, new_bytes = old(), new()
+        same = old_bytes == new_bytes
+        mismatches += not same
+        old_ms, new_ms = measure(old, args.repeat), measure(new, args.repeat)
+        print(
+            f"{name:30} {len(old_bytes) / 1024:>7.1f} {old_ms:>8.3f} {new_ms:>8.3f}"
+            f" {old_ms / new_ms:>7.2f}x {'yes' if same else 'NO':>11}"
+        )
+
+    if mismatches:
+        print(f"\n[ERROR] {mismatches} payload(s) encode differently")
+        sys.exit(1)
@@ -0,0 +1,75 @@
+"""
+Benchmark: per-request cost of MetricsMiddleware
+
+Calls a minimal FastAPI app directly through ASGI (no sockets, no TestClient)
+with and without the middleware and reports the time per request, so the
+difference is the middleware's own overhead. A route with a path parameter
+checks that labelling by route template costs nothing extra.
+
+Usage (from backend/):
+    python -m benchmarks.bench_metrics_overhead
+    python -m benchmarks.bench_metrics_overhead --requests 50000
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from app.services.metrics import MetricsMiddleware
+
+
+def build_app(with_metrics):
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def call(app, path):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def time_requests(app, path, requests):
+    for _ in range(200):  # warm up routing and pydantic caches
+        await call(app, path)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app, path)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MetricsMiddleware overhead per request")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the best is kept")
+    args = parser.parse_args()
+
+    plain, instrumented = build_app(False), build_app(True)
+    print(f"\n{'Route':20} {'Plain us':>9} {'Metrics us':>11} {'Overhead us':>12}")
+    print("-" * 56)
+    for path in ("/ping", "/items/42"):
+        base = min(asyncio.run(time_requests(plain, path, args.requests)) for _ in range(args.repeat))
+        measured = min(asyncio.run(time_requests(instrumented, path, args.requests)) for _ in range(args.repeat))
+        print(f"{path:20} {base:>9.1f} {measured:>11.1f} {measured - base:>12.1f}")
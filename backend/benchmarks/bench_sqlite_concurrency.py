@@ -0,0 +1,128 @@
+"""
+Benchmark: concurrent reads and writes on SQLite
+
+Runs reader threads (tutorial list style SELECTs) and writer threads (progress
+style UPDATE + commit) against a scratch database file, first with the old
+engine settings (rollback journal, synchronous=FULL, deferred transactions)
+and then with create_db_engine() (WAL profile, BEGIN IMMEDIATE writers).
+Reports operations per second, p95 latency and "database is locked" errors.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sqlite_concurrency
+    python -m benchmarks.bench_sqlite_concurrency --readers 8 --writers 4 --seconds 10
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.database import create_db_engine
+
+ROWS = 5000
+
+
+def legacy_engine(url):
+    """Engine as database.py created it before the SQLite profile"""
+    return create_engine(url, connect_args={"check_same_thread": False}, pool_pre_ping=True)
+
+
+def seed(engine):
+    with engine.connect() as conn:
+        conn.execute(text(
+            "CREATE TABLE progress (id INTEGER PRIMARY KEY, tutorial_id INTEGER, "
+            "current_step INTEGER, time_spent REAL, notes TEXT)"
+        ))
+        conn.execute(text("CREATE INDEX ix_progress_tutorial ON progress (tutorial_id)"))
+        conn.execute(
+            text("INSERT INTO progress VALUES (:id, :tutorial_id, 0, 0, :notes)"),
+            [{"id": i, "tutorial_id": i % 50, "notes": "x" * 200} for i in range(ROWS)]
+        )
+        conn.commit()
+
+
+def read_once(engine, rng):
+    with engine.connect() as conn:
+        conn.execute(
+            text("SELECT tutorial_id, count(*), avg(current_step), sum(time_spent) FROM progress "
+                 "WHERE tutorial_id = :tutorial_id GROUP BY tutorial_id"),
+            {"tutorial_id": rng.randrange(50)}
+        ).all()
+
+
+def write_once(engine, rng):
+    with engine.connect() as conn:
+        conn.execute(
+            text("UPDATE progress SET current_step = current_step + 1, time_spent = time_spent + 1.5 "
+                 "WHERE id = :id"),
+            {"id": rng.randrange(ROWS)}
+        )
+        conn.commit()
+
+
+def worker(operation, engine, deadline, results, seed_value):
+    rng = random.Random(seed_value)
+    latencies, errors = [], 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            operation(engine, rng)
+            latencies.append(time.perf_counter() - started)
+        except OperationalError:
+            errors += 1
+    results.append((latencies, errors))
+
+
+def run(make_engine, path, readers, writers, seconds):
+    engine = make_engine(f"sqlite:///{path}")
+    seed(engine)
+
+    reads, writes = [], []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=worker, args=(read_once, engine, deadline, reads, i))
+        for i in range(readers)
+    ] + [
+        threading.Thread(target=worker, args=(write_once, engine, deadline, writes, 1000 + i))
+        for i in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return summarize(reads, seconds), summarize(writes, seconds)
+
+
+def summarize(results, seconds):
+    latencies = [latency for worker_latencies, _ in results for latency in worker_latencies]
+    p95 = statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) >= 20 else float("nan")
+    return {
+        "ops": len(latencies) / seconds,
+        "p95_ms": p95,
+        "errors": sum(errors for _, errors in results),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite concurrent read/write throughput")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"\n{args.readers} reader(s), {args.writers} writer(s), {args.seconds:.0f}s per profile")
+    print(f"\n{'Profile':10} {'Reads/s':>9} {'p95 ms':>8} {'Errors':>7} {'Writes/s':>9} {'p95 ms':>8} {'Errors':>7}")
+    print("-" * 64)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, make_engine in (("legacy", legacy_engine), ("tuned", create_db_engine)):
+            read, write = run(make_engine, Path(tmp) / f"{name}.db", args.readers, args.writers, args.seconds)
+            print(
+                f"{name:10} {read['ops']:>9.0f} {read['p95_ms']:>8.2f} {read['errors']:>7}"
+                f" {write['ops']:>9.0f} {write['p95_ms']:>8.2f} {write['errors']:>7}"
+            )
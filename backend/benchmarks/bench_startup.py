@@ -0,0 +1,98 @@
+"""
+Benchmark: cold start to first response
+
+Starts uvicorn in a fresh process, polls /health until it answers and
+reports the time from process launch to that first response, along with
+how long `import app.main` alone takes and which heavy optional modules
+(Pillow, cloudinary, passlib) the import pulled in. Each run uses a new
+interpreter, so nothing is cached in memory between runs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --workers 2
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+HEAVY_MODULES = ("PIL", "cloudinary", "passlib")
+
+IMPORT_PROBE = """
+import sys, time
+started = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - started) * 1000
+loaded = [name for name in {modules!r} if name in sys.modules]
+print(f"{{elapsed:.1f}} {{','.join(loaded) or '-'}}")
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_import(env):
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE.format(modules=HEAVY_MODULES)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    elapsed, loaded = output.split(" ", 1)
+    return float(elapsed), loaded
+
+
+def time_first_response(env, workers, timeout=60):
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("server did not answer /health in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import and cold start time of the API")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": os.getenv("DATABASE_URL", f"sqlite:///{Path(tmp) / 'bench.db'}"),
+            "MEDIA_JOB_DIR": str(Path(tmp) / "media_jobs"),
+            "UPLOAD_SESSION_DIR": str(Path(tmp) / "upload_sessions"),
+        }
+
+        imports, starts = [], []
+        loaded = "-"
+        for _ in range(args.runs):
+            elapsed, loaded = time_import(env)
+            imports.append(elapsed)
+            starts.append(time_first_response(env, args.workers))
+
+    print(f"\n{args.runs} run(s), {args.workers} worker(s)")
+    print(f"import app.main:        median {statistics.median(imports):7.1f} ms  (min {min(imports):.1f})")
+    print(f"launch -> first /health: median {statistics.median(starts):7.1f} ms  (min {min(starts):.1f})")
+    print(f"heavy modules loaded at import: {loaded}")
@@ -0,0 +1,117 @@
+"""
+Benchmark: bytes saved by responsive screenshot variants
+
+For every tutorial, compares what a learner downloads with the single largest
+fallback image (1920px JPEG) against the best WebP variant for a given viewport width.
+
+Usage (from backend/):
+    python -m benchmarks.bench_variants              # steps stored in DATABASE_URL
+    python -m benchmarks.bench_variants --synthetic 3 --steps 20
+"""
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.fixtures import make_screenshot
+
+VIEWPORTS = (480, 960, 1920)
+
+
+def pick_variant(variants, fmt, viewport):
+    """Smallest variant of a format that still covers the viewport ("jpg" means any fallback)"""
+    candidates = sorted(
+        (v for v in variants if (v["format"] == "webp") == (fmt == "webp")),
+        key=lambda v: v["width"]
+    )
+    for variant in candidates:
+        if variant["width"] >= viewport:
+            return variant
+    return candidates[-1] if candidates else None
+
+
+def summarize(tutorials):
+    """tutorials: {title: [variants per step]} -> printed table"""
+    print(f"\n{'Tutorial':30} {'Steps':>5} {'Fallback':>12}" + "".join(f" {'WebP@' + str(v):>14}" for v in VIEWPORTS))
+    print("-" * (50 + 15 * len(VIEWPORTS)))
+    grand_baseline = 0
+    grand = defaultdict(int)
+
+    for title, steps in tutorials.items():
+        baseline = sum(pick_variant(variants, "jpg", 10 ** 6)["bytes"] for variants in steps)
+        grand_baseline += baseline
+        row = f"{title[:30]:30} {len(steps):>5} {baseline / 1024:>10.0f}KB"
+        for viewport in VIEWPORTS:
+            total = sum(pick_variant(variants, "webp", viewport)["bytes"] for variants in steps)
+            grand[viewport] += total
+            row += f" {total / 1024:>7.0f}KB {100 - total * 100 / baseline:>4.0f}%"
+        print(row)
+
+    if grand_baseline:
+        print("-" * (50 + 15 * len(VIEWPORTS)))
+        row = f"{'TOTAL':30} {'':>5} {grand_baseline / 1024:>10.0f}KB"
+        for viewport in VIEWPORTS:
+            row += f" {grand[viewport] / 1024:>7.0f}KB {100 - grand[viewport] * 100 / grand_baseline:>4.0f}%"
+        print(row)
+
+
+def from_database():
+    from app.database import SessionLocal
+    from app.models import Tutorial
+
+    db = SessionLocal()
+    try:
+        tutorials = {}
+        for tutorial in db.query(Tutorial).all():
+            steps = [step.screenshot_variants for step in tutorial.steps if step.screenshot_variants]
+            if steps:
+                tutorials[tutorial.title] = steps
+        return tutorials
+    finally:
+        db.close()
+
+
+def render_all(image, widths):
+    from app.services.image_processing import render_screenshot_variants
+    variants = []
+    for width in widths:
+        for variant in render_screenshot_variants(image, width):
+            variant["bytes"] = len(variant.pop("data"))
+            variants.append(variant)
+    return variants
+
+
+def synthetic(tutorial_count, step_count):
+    from app.services.image_processing import get_variant_widths
+
+    rng = random.Random(42)
+    tutorials = {}
+    images = [
+        make_screenshot(rng.choice([(2560, 1440), (3840, 2160), (1920, 1080)]), seed=i)
+        for i in range(tutorial_count * step_count)
+    ]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor() as pool:
+        results = list(pool.map(render_all, images, [get_variant_widths(image) for image in images]))
+    elapsed = time.perf_counter() - started
+    print(f"Rendered {len(images)} screenshots in {elapsed:.2f}s ({elapsed * 1000 / len(images):.0f} ms/screenshot)")
+
+    for t in range(tutorial_count):
+        tutorials[f"Synthetic tutorial {t + 1}"] = results[t * step_count:(t + 1) * step_count]
+    return tutorials
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes saved per tutorial by responsive variants")
+    parser.add_argument("--synthetic", type=int, metavar="TUTORIALS", help="Use generated screenshots instead of the database")
+    parser.add_argument("--steps", type=int, default=10, help="Steps per synthetic tutorial")
+    args = parser.parse_args()
+
+    data = synthetic(args.synthetic, args.steps) if args.synthetic else from_database()
+    if not data:
+        print("[INFO] No steps with screenshot variants found")
+        sys.exit(0)
+    summarize(data)
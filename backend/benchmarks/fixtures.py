@@ -0,0 +1,46 @@
+"""
+Generated fixtures shared by the benchmark scripts.
+
+Screenshots are synthetic but shaped like real application captures: flat
+panels, a toolbar, rows of text-like strokes and a photo-ish area, so encoders
+see the same mix of flat color and detail.
+"""
+import io
+import random
+from typing import Tuple
+
+from PIL import Image, ImageDraw
+
+
+def make_screenshot(size: Tuple[int, int] = (2560, 1440), seed: int = 0, fmt: str = "PNG", photo: bool = True) -> bytes:
+    rng = random.Random(seed)
+    width, height = size
+    img = Image.new("RGB", size, (245, 246, 248))
+    draw = ImageDraw.Draw(img)
+
+    # Toolbar and sidebar
+    draw.rectangle([0, 0, width, height // 18], fill=(32, 56, 100))
+    draw.rectangle([0, height // 18, width // 6, height], fill=(230, 232, 236))
+
+    # Text-like rows
+    line_height = max(height // 60, 8)
+    for y in range(height // 10, height - line_height, line_height * 2):
+        x = width // 5
+        while x < width * 0.9:
+            word = rng.randint(width // 80, width // 25)
+            draw.rectangle([x, y, x + word, y + line_height // 2], fill=(60, 60, 70))
+            x += word + width // 150
+
+    # Buttons
+    for _ in range(6):
+        x, y = rng.randint(width // 5, width - 200), rng.randint(height // 10, height - 80)
+        draw.rectangle([x, y, x + width // 20, y + height // 40], fill=(rng.randint(0, 255), 120, 200))
+
+    if photo:
+        # Noisy gradient block standing in for an embedded photo or chart
+        block = Image.effect_noise((width // 4, height // 4), 40).convert("RGB")
+        img.paste(block, (width - width // 3, height // 3))
+
+    output = io.BytesIO()
+    img.save(output, format=fmt, **({"quality": 92} if fmt == "JPEG" else {}))
+    return output.getvalue()
@@ -0,0 +1,258 @@
+"""
+Load test: concurrent learners against a seeded database
+
+Each virtual learner signs in as one of the seeded accounts (tokens are
+minted directly, so bcrypt does not dominate) and loops over a weighted mix
+of what learners and admins do: list tutorials, open one, start or resume
+its progress, save progress, and the occasional stats/dashboard view.
+Reports requests/s and p50/p95/p99 latency per endpoint.
+
+Two modes:
+- asgi (default): requests go straight into the app in this process through
+  httpx's ASGI transport; no sockets, so it measures the app and database.
+- uvicorn: starts real uvicorn worker processes and sends HTTP requests.
+
+Seed the database first (python seed_data.py --scale small --yes), or pass
+--seed-scale to seed a fresh scratch database automatically.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --database /tmp/load.db --seed-scale small
+    python -m benchmarks.load_test --database /tmp/load.db --learners 500 --duration 30 --mode uvicorn --workers 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+try:
+    import httpx
+except ImportError:  # only the test client needs it, the app does not
+    httpx = None
+
+# (weight, label, kind) - label is the route template used in the report
+SCENARIO = [
+    (30, "GET /api/tutorials/", "list"),
+    (30, "GET /api/tutorials/{id}", "detail"),
+    (15, "GET /api/analytics/progress/{tutorial_id}", "get_progress"),
+    (15, "PUT /api/analytics/progress/{id}", "save_progress"),
+    (5, "POST /api/analytics/progress", "start_progress"),
+    (4, "GET /api/analytics/tutorials/{id}/stats", "stats"),
+    (1, "GET /api/analytics/dashboard", "dashboard"),
+]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class Learner:
+    def __init__(self, client, token, tutorial_ids, rng, results):
+        self.client = client
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.tutorial_ids = tutorial_ids
+        self.rng = rng
+        self.results = results
+        self.progress = {}  # tutorial_id -> progress id
+
+    async def request(self, label, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            # 403/404 are expected answers (tutorial not granted or not published)
+            ok = response.status_code < 400 or response.status_code in (403, 404)
+        except Exception:
+            response, ok = None, False
+        self.results[label].append((time.perf_counter() - started, ok))
+        return response
+
+    async def step(self, label, kind):
+        tutorial_id = self.rng.choice(self.tutorial_ids)
+        if kind == "list":
+            await self.request(label, "GET", "/api/tutorials/", params={"limit": 50})
+        elif kind == "detail":
+            await self.request(label, "GET", f"/api/tutorials/{tutorial_id}")
+        elif kind == "get_progress":
+            response = await self.request(label, "GET", f"/api/analytics/progress/{tutorial_id}")
+            if response is not None and response.status_code == 200:
+                self.progress[tutorial_id] = response.json()["id"]
+        elif kind == "start_progress":
+            response = await self.request(label, "POST", "/api/analytics/progress", json={"tutorial_id": tutorial_id})
+            if response is not None and response.status_code == 200:
+                self.progress[tutorial_id] = response.json()["id"]
+        elif kind == "save_progress" and self.progress:
+            progress_id = self.rng.choice(list(self.progress.values()))
+            await self.request(label, "PUT", f"/api/analytics/progress/{progress_id}", json={
+                "current_step": self.rng.randint(1, 8),
+                "time_per_step": {str(order): self.rng.randint(5, 120) for order in range(1, 4)},
+            })
+        elif kind == "stats":
+            await self.request(label, "GET", f"/api/analytics/tutorials/{tutorial_id}/stats")
+        elif kind == "dashboard":
+            await self.request(label, "GET", "/api/analytics/dashboard")
+
+    async def run(self, deadline, think_time):
+        weights = [weight for weight, _, _ in SCENARIO]
+        while time.perf_counter() < deadline:
+            _, label, kind = self.rng.choices(SCENARIO, weights=weights)[0]
+            await self.step(label, kind)
+            if think_time:
+                await asyncio.sleep(self.rng.uniform(0, think_time * 2))
+
+
+def load_accounts(limit):
+    """Seeded learner ids with a token each, and tutorial ids to browse"""
+    from app.database import SessionLocal
+    from app.models import Tutorial, User
+    from app.services.auth import create_access_token
+
+    db = SessionLocal()
+    try:
+        users = db.query(User.id, User.email).filter(User.email.like("%@seed.local")).limit(limit).all()
+        tutorial_ids = [tutorial_id for (tutorial_id,) in db.query(Tutorial.id).limit(5000)]
+    finally:
+        db.close()
+    if not users or not tutorial_ids:
+        sys.exit("[ERROR] No seeded data found. Run python seed_data.py first or pass --seed-scale.")
+    return [create_access_token({"sub": user_id, "email": email}) for user_id, email in users], tutorial_ids
+
+
+def seed_database(scale):
+    import seed_data
+    from migrate_schema import migrate_schema
+    from app.database import SessionLocal
+
+    migrate_schema()
+    db = SessionLocal()
+    try:
+        seed_data.seed(db, dict(seed_data.SCALES[scale]), random.Random(42), "seed123", 5000)
+    finally:
+        db.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_uvicorn(port, workers, env, timeout=60):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning", "--no-access-log"],
+        env=env, stdout=subprocess.DEVNULL
+    )
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.05)
+    server.terminate()
+    sys.exit("[ERROR] uvicorn did not answer /health in time")
+
+
+async def run_load(args, tokens, tutorial_ids):
+    if args.mode == "asgi":
+        from app.main import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+    else:
+        transport = None
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    limits = httpx.Limits(max_connections=args.learners, max_keepalive_connections=args.learners)
+    results = defaultdict(list)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=60) as client:
+        learners = [
+            Learner(client, tokens[i % len(tokens)], tutorial_ids, random.Random(i), results)
+            for i in range(args.learners)
+        ]
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(learner.run(deadline, args.think_time) for learner in learners))
+        elapsed = time.perf_counter() - started
+    return results, elapsed
+
+
+def report(results, elapsed):
+    print(f"\n{'Endpoint':44} {'Req':>7} {'Err':>5} {'Req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    print("-" * 94)
+    all_latencies, total, errors = [], 0, 0
+    for _, label, _ in SCENARIO:
+        samples = results.get(label, [])
+        if not samples:
+            continue
+        latencies = sorted(latency * 1000 for latency, _ in samples)
+        failed = sum(1 for _, ok in samples if not ok)
+        all_latencies.extend(latencies)
+        total += len(samples)
+        errors += failed
+        print(
+            f"{label[:44]:44} {len(samples):>7} {failed:>5} {len(samples) / elapsed:>8.1f}"
+            f" {percentile(latencies, 0.5):>8.1f} {percentile(latencies, 0.95):>8.1f} {percentile(latencies, 0.99):>8.1f}"
+        )
+    all_latencies.sort()
+    print("-" * 94)
+    print(
+        f"{'TOTAL':44} {total:>7} {errors:>5} {total / elapsed:>8.1f}"
+        f" {percentile(all_latencies, 0.5):>8.1f} {percentile(all_latencies, 0.95):>8.1f}"
+        f" {percentile(all_latencies, 0.99):>8.1f}"
+    )
+    if all_latencies:
+        print(f"\nMean latency: {statistics.mean(all_latencies):.1f} ms over {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent learner load test")
+    parser.add_argument("--database", default="load_test.db", help="SQLite file to test against")
+    parser.add_argument("--seed-scale", choices=("small", "medium", "large"),
+                        help="Create and seed the database first if it does not exist")
+    parser.add_argument("--mode", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--learners", type=int, default=50, help="Concurrent virtual learners")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds to run")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a learner's requests (s)")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn workers (uvicorn mode)")
+    parser.add_argument("--port", type=int, help="uvicorn port (uvicorn mode, default: a free port)")
+    args = parser.parse_args()
+
+    if httpx is None:
+        sys.exit("[ERROR] The load test needs httpx: pip install httpx")
+
+    database = Path(args.database).resolve()
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ.setdefault("STORAGE_BACKEND", "local")
+    # Reads and writes from hundreds of learners would otherwise exhaust the default pool
+    os.environ.setdefault("DB_POOL_SIZE", "20")
+    os.environ.setdefault("DB_MAX_OVERFLOW", "40")
+
+    if not database.exists():
+        if not args.seed_scale:
+            sys.exit(f"[ERROR] {database} does not exist. Pass --seed-scale to create it.")
+        seed_database(args.seed_scale)
+
+    tokens, tutorial_ids = load_accounts(args.learners)
+    print(f"[INFO] {args.mode} mode, {args.learners} learner(s), {args.duration:.0f}s, database {database}")
+
+    if args.mode == "uvicorn" and args.port is None:
+        args.port = free_port()
+    server = start_uvicorn(args.port, args.workers, dict(os.environ)) if args.mode == "uvicorn" else None
+    try:
+        results, elapsed = asyncio.run(run_load(args, tokens, tutorial_ids))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    report(results, elapsed)
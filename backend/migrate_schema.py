@@ -0,0 +1,68 @@
+"""
+Script to bring an existing database up to date with the models
+- creates missing tables
+- adds missing columns to existing tables (new columns are always nullable)
+- recounts media_assets.ref_count as the number of steps using each asset
+
+Safe to run repeatedly: anything that already exists is left untouched.
+Usage: python migrate_schema.py
+"""
+
+from app.database import Base, engine
+import app.models  # noqa: F401 - registers every model on Base.metadata
+from sqlalchemy import inspect, text
+import sys
+
+
+def migrate_schema():
+    print("\n" + "="*60)
+    print("DPGDOC ACADEMY - Schema Migration")
+    print("="*60 + "\n")
+
+    try:
+        # Create tables that don't exist yet
+        Base.metadata.create_all(bind=engine)
+        print("[OK] Tables created (if missing)")
+
+        inspector = inspect(engine)
+        added = 0
+
+        with engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing = {column["name"] for column in inspector.get_columns(table.name)}
+
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(
+                        f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'
+                    ))
+                    print(f"[OK] Added column {table.name}.{column.name} ({column_type})")
+                    added += 1
+
+        if added == 0:
+            print("[INFO] Schema already up to date")
+
+        # ref_count used to count uploads; it now counts the steps using the asset
+        with engine.begin() as connection:
+            recounted = connection.execute(text(
+                "UPDATE media_assets SET ref_count = "
+                "(SELECT COUNT(*) FROM steps WHERE steps.screenshot_url = media_assets.url)"
+            )).rowcount
+        print(f"[OK] Recounted references of {recounted} media asset(s)")
+
+        print("\n" + "="*60)
+        print("[SUCCESS] Schema migration completed!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n[ERROR] Schema migration failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    migrate_schema()
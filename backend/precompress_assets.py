@@ -0,0 +1,76 @@
+"""
+Script to write precompressed copies of the built frontend assets
+- walks frontend/dist (or --dist) after `npm run build`
+- writes name.br (brotli, quality 11) and name.gz (gzip, level 9) next to
+  every compressible file of at least --min-size bytes
+- skips a copy that would not be smaller than the original
+
+The server sends these sidecars instead of compressing /assets on every
+request (see app/services/spa.py). Run it as part of the build.
+Usage: python precompress_assets.py [--dist ../frontend/dist] [--min-size 1024]
+"""
+
+from pathlib import Path
+import argparse
+import gzip
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_SUFFIXES = {".js", ".mjs", ".css", ".html", ".json", ".svg", ".txt", ".xml", ".map", ".webmanifest"}
+
+
+def precompress(dist: Path, min_size: int):
+    written = skipped = 0
+    for path in sorted(dist.rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        if len(data) < min_size:
+            continue
+
+        variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(data, quality=11)
+
+        for suffix, compressed in variants.items():
+            sidecar = path.with_name(path.name + suffix)
+            if len(compressed) >= len(data):
+                sidecar.unlink(missing_ok=True)
+                skipped += 1
+                continue
+            sidecar.write_bytes(compressed)
+            written += 1
+            print(f"  - {sidecar.relative_to(dist)} ({len(data) / 1024:.0f}KB -> {len(compressed) / 1024:.0f}KB)")
+    return written, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write .br/.gz copies of the frontend build")
+    parser.add_argument("--dist", default=str(Path(__file__).parent.parent / "frontend" / "dist"))
+    parser.add_argument("--min-size", type=int, default=1024, help="Smallest file to compress, in bytes")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("DPGDOC ACADEMY - Precompress Frontend Assets")
+    print("="*60 + "\n")
+
+    dist = Path(args.dist)
+    if not dist.is_dir():
+        print(f"[ERROR] {dist} not found. Run npm run build first.")
+        sys.exit(1)
+    if brotli is None:
+        print("[INFO] brotli not installed, writing .gz only")
+
+    written, skipped = precompress(dist, args.min_size)
+
+    print("\n" + "="*60)
+    print(f"[OK] {written} file(s) written, {skipped} skipped (not smaller)")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
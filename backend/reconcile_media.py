@@ -0,0 +1,84 @@
+"""
+Script to delete stored media that no step references anymore
+- lists screenshots and videos in the storage backend (STORAGE_BACKEND)
+- skips anything referenced by a step or younger than --min-age-hours
+- deletes the rest in batches, pausing between batches
+
+Run with --dry-run first to see what would be deleted.
+Usage: python reconcile_media.py [--dry-run] [--min-age-hours 24] [--batch-size 100] [--delay 1.0] [--yes]
+"""
+
+from app.database import SessionLocal
+from app.api.upload import SCREENSHOT_FOLDER, VIDEO_FOLDER
+from app.services.media_reconcile import delete_orphans, find_orphans
+from app.services.storage import STORAGE_BACKEND, get_storage
+from datetime import timedelta
+import argparse
+import asyncio
+import sys
+
+
+async def reconcile(args):
+    db = SessionLocal()
+    storage = get_storage()
+    try:
+        print(f"[INFO] Storage backend: {STORAGE_BACKEND}")
+        orphans = await find_orphans(
+            db,
+            storage,
+            {"image": SCREENSHOT_FOLDER, "video": VIDEO_FOLDER},
+            timedelta(hours=args.min_age_hours)
+        )
+
+        total = sum(len(assets) for assets in orphans.values())
+        total_bytes = sum(asset["bytes"] or 0 for assets in orphans.values() for asset in assets)
+        for resource_type, assets in orphans.items():
+            print(f"\n[INFO] Orphaned {resource_type} files: {len(assets)}")
+            for asset in assets:
+                print(f"  - {asset['public_id']} ({(asset['bytes'] or 0) / 1024:.0f}KB, {asset['created_at']:%Y-%m-%d})")
+
+        print(f"\n[INFO] Total: {total} file(s), {total_bytes / 1024 / 1024:.1f}MB")
+        if total == 0:
+            print("[OK] Nothing to delete")
+            return
+        if args.dry_run:
+            print("[DRY RUN] Nothing was deleted")
+            return
+
+        if not args.yes:
+            confirm = input(f"\nThis will permanently DELETE {total} file(s) from storage.\n\nType 'DELETE' to confirm: ").strip()
+            if confirm != "DELETE":
+                print("\n[CANCELLED] Media reconciliation cancelled")
+                return
+
+        summary = await delete_orphans(db, storage, orphans, batch_size=args.batch_size, delay=args.delay)
+        print(f"\n[OK] Deleted: {summary['deleted']}, already gone: {summary['not_found']}, failed: {summary['failed']}")
+        print(f"[OK] Dedup records removed: {summary['assets_forgotten']}")
+    finally:
+        db.close()
+
+
+def reconcile_media():
+    parser = argparse.ArgumentParser(description="Delete stored media that no step references")
+    parser.add_argument("--dry-run", action="store_true", help="Only list orphaned files")
+    parser.add_argument("--min-age-hours", type=float, default=24, help="Never delete files younger than this")
+    parser.add_argument("--batch-size", type=int, default=100, help="Files per delete call (Cloudinary allows 100)")
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds to wait between delete calls")
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("DPGDOC ACADEMY - Media Reconciliation")
+    print("="*60 + "\n")
+
+    try:
+        asyncio.run(reconcile(args))
+    except Exception as e:
+        print(f"\n[ERROR] Media reconciliation failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    reconcile_media()
@@ -0,0 +1,236 @@
+"""
+Script to fill a database with generated data for load tests and profiling
+- users (one admin plus learners), tutorials with steps and annotations
+- access grants for learners and progress records spread over learners
+- inserted in bulk batches, so the large scale (10k tutorials, 1M progress
+  rows) takes minutes on SQLite, not hours
+
+All learners share the password given with --password (default: seed123).
+Run against a scratch database; the data is not meant for production.
+Usage: python seed_data.py [--scale small|medium|large] [--tutorials N] [--progress N] [--seed 42] [--yes]
+"""
+
+from app.database import DATABASE_URL, SessionLocal, engine
+from app.models.user import User, UserRole
+from app.models.tutorial import Tutorial, Step, Annotation, user_tutorial_access
+from app.models.progress import Progress
+from app.services.auth import get_password_hash
+from datetime import datetime, timedelta
+from sqlalchemy import insert, inspect
+import argparse
+import random
+import sys
+import time
+import uuid
+
+SCALES = {
+    "small": {"users": 50, "tutorials": 100, "steps": 6, "annotations": 2, "grants": 5, "progress": 2000},
+    "medium": {"users": 200, "tutorials": 1000, "steps": 8, "annotations": 2, "grants": 10, "progress": 50000},
+    "large": {"users": 500, "tutorials": 10000, "steps": 8, "annotations": 2, "grants": 20, "progress": 1000000},
+}
+
+CATEGORIES = ["Processos", "Sistemas", "Atendimento", "Jurídico", "Administrativo", "Tecnologia"]
+VERBS = ["Como cadastrar", "Como consultar", "Como emitir", "Como atualizar", "Como anexar", "Como encaminhar"]
+OBJECTS = ["um processo", "uma petição", "um documento", "um atendimento", "uma certidão", "um relatório", "um ofício"]
+PLACES = ["no SEI", "no sistema interno", "no portal", "no Solar", "na intranet"]
+TAGS = ["iniciante", "avançado", "sistema", "rotina", "urgente", "novo", "passo-a-passo"]
+ANNOTATION_TYPES = ["arrow", "box", "tooltip", "highlight"]
+LOREM = (
+    "Acesse o menu principal e selecione a opção indicada. Preencha os campos obrigatórios "
+    "com atenção aos dados do assistido. Confira as informações antes de salvar e aguarde "
+    "a confirmação do sistema."
+).split()
+
+
+def paragraph(rng, words=40):
+    return " ".join(rng.choice(LOREM) for _ in range(words))
+
+
+def annotation_row(rng, step_id):
+    kind = rng.choice(ANNOTATION_TYPES)
+    coordinates = {"x": rng.randint(0, 1600), "y": rng.randint(0, 900)}
+    if kind == "arrow":
+        coordinates["points"] = [dict(coordinates), {"x": coordinates["x"] + 80, "y": coordinates["y"] + 60}]
+    else:
+        coordinates.update(width=rng.randint(80, 400), height=rng.randint(40, 200))
+    return {
+        "id": str(uuid.uuid4()),
+        "step_id": step_id,
+        "type": kind,
+        "coordinates": coordinates,
+        "text": paragraph(rng, 8) if kind == "tooltip" else None,
+        "animation": "fadeIn",
+        "delay": rng.choice([0, 200, 500]),
+        "style": {},
+    }
+
+
+def insert_batches(db, table, rows, batch_size):
+    """Insert an iterable of row dicts with executemany in batch_size chunks"""
+    batch, total = [], 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.execute(insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(table), batch)
+        total += len(batch)
+    db.commit()
+    return total
+
+
+def seed(db, config, rng, password, batch_size, log=print):
+    """Generate everything described by config; returns counts per table"""
+    now = datetime.utcnow()
+    hashed_password = get_password_hash(password)
+
+    admin_id = str(uuid.uuid4())
+    users = [{
+        "id": admin_id, "email": "seed-admin@seed.local", "username": "seed-admin",
+        "hashed_password": hashed_password, "full_name": "Seed Admin", "role": UserRole.ADMIN,
+        "is_active": True, "created_at": now,
+    }]
+    learner_ids = []
+    for i in range(config["users"]):
+        learner_ids.append(str(uuid.uuid4()))
+        users.append({
+            "id": learner_ids[-1], "email": f"learner{i}@seed.local", "username": f"learner{i}",
+            "hashed_password": hashed_password, "full_name": f"Learner {i}", "role": UserRole.COLABORADOR,
+            "is_active": True, "created_at": now - timedelta(days=rng.randint(0, 365)),
+        })
+    counts = {"users": insert_batches(db, User.__table__, users, batch_size)}
+    log(f"[OK] Users: {counts['users']}")
+
+    tutorial_ids, tutorial_steps = [], []
+    tutorials, steps, annotations = [], [], []
+    for _ in range(config["tutorials"]):
+        tutorial_id = str(uuid.uuid4())
+        created_at = now - timedelta(days=rng.randint(0, 730))
+        step_count = max(1, int(rng.gauss(config["steps"], 2)))
+        tutorial_ids.append(tutorial_id)
+        tutorial_steps.append(step_count)
+        tutorials.append({
+            "id": tutorial_id,
+            "title": f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(PLACES)}",
+            "description": paragraph(rng, 25),
+            "category": rng.choice(CATEGORIES),
+            "tags": rng.sample(TAGS, rng.randint(1, 3)),
+            "created_by": admin_id,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "is_published": rng.random() < 0.8,
+            "version": 1,
+        })
+        for order in range(1, step_count + 1):
+            step_id = str(uuid.uuid4())
+            steps.append({
+                "id": step_id, "tutorial_id": tutorial_id, "order": order,
+                "title": f"Passo {order}", "content": f"<p>{paragraph(rng)}</p>",
+                "screenshot_url": f"/media/seed/{step_id}.jpg",
+                "validation_required": False, "created_at": created_at,
+            })
+            annotations.extend(annotation_row(rng, step_id) for _ in range(rng.randint(0, config["annotations"] * 2)))
+
+    counts["tutorials"] = insert_batches(db, Tutorial.__table__, tutorials, batch_size)
+    counts["steps"] = insert_batches(db, Step.__table__, steps, batch_size)
+    counts["annotations"] = insert_batches(db, Annotation.__table__, annotations, batch_size)
+    log(f"[OK] Tutorials: {counts['tutorials']}, steps: {counts['steps']}, annotations: {counts['annotations']}")
+
+    grants = (
+        {"user_id": user_id, "tutorial_id": tutorial_id, "granted_at": now}
+        for user_id in learner_ids
+        for tutorial_id in rng.sample(tutorial_ids, min(config["grants"], len(tutorial_ids)))
+    )
+    counts["grants"] = insert_batches(db, user_tutorial_access, grants, batch_size)
+    log(f"[OK] Access grants: {counts['grants']}")
+
+    # At most one progress record per (learner, tutorial), as the API creates them
+    per_user = min(config["progress"] // max(len(learner_ids), 1), len(tutorial_ids))
+
+    def progress_rows():
+        for user_id in learner_ids:
+            for index in rng.sample(range(len(tutorial_ids)), per_user):
+                total = tutorial_steps[index]
+                current = rng.randint(1, total)
+                completed = current == total and rng.random() < 0.6
+                started_at = now - timedelta(days=rng.randint(0, 365), minutes=rng.randint(0, 1440))
+                yield {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "tutorial_id": tutorial_ids[index],
+                    "current_step": current,
+                    "completed_steps": list(range(1, current if not completed else total + 1)),
+                    "time_per_step": {str(order): rng.randint(5, 240) for order in range(1, current + 1)},
+                    "attempts": rng.randint(1, 3),
+                    "completed": completed,
+                    "score": round(rng.uniform(50, 100), 1) if completed else 0.0,
+                    "started_at": started_at,
+                    "completed_at": started_at + timedelta(minutes=rng.randint(2, 90)) if completed else None,
+                    "last_accessed": started_at + timedelta(minutes=rng.randint(0, 90)),
+                }
+
+    counts["progress"] = insert_batches(db, Progress.__table__, progress_rows(), batch_size)
+    log(f"[OK] Progress records: {counts['progress']}")
+    return counts
+
+
+def seed_data():
+    parser = argparse.ArgumentParser(description="Generate users, tutorials and progress for load tests")
+    parser.add_argument("--scale", choices=SCALES, default="small", help="Preset sizes (override any with the flags below)")
+    parser.add_argument("--users", type=int, help="Learner accounts")
+    parser.add_argument("--tutorials", type=int, help="Tutorials")
+    parser.add_argument("--steps", type=int, help="Average steps per tutorial")
+    parser.add_argument("--annotations", type=int, help="Average annotations per step")
+    parser.add_argument("--grants", type=int, help="Tutorials each learner is explicitly granted")
+    parser.add_argument("--progress", type=int, help="Progress records in total")
+    parser.add_argument("--password", default="seed123", help="Password of every seeded account")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible data")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    args = parser.parse_args()
+
+    config = dict(SCALES[args.scale])
+    for key in config:
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+
+    print("\n" + "="*60)
+    print("DPGDOC ACADEMY - Seed Data")
+    print("="*60 + "\n")
+    print(f"[INFO] Database: {DATABASE_URL}")
+    print(f"[INFO] Scale: {config}")
+
+    if "users" not in inspect(engine).get_table_names():
+        print("[ERROR] Tables not found. Run python migrate_schema.py first.")
+        sys.exit(1)
+
+    if not args.yes:
+        confirm = input("\nThis will ADD generated data to the database above.\n\nType 'SEED' to confirm: ").strip()
+        if confirm != "SEED":
+            print("\n[CANCELLED] Seeding cancelled")
+            return
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        counts = seed(db, config, random.Random(args.seed), args.password, args.batch_size)
+    except Exception as e:
+        db.rollback()
+        print(f"\n[ERROR] Seeding failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print("\n" + "="*60)
+    print(f"[SUCCESS] Seeded {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+    print(f"[INFO] Admin: seed-admin@seed.local / Learners: learner0..learner{config['users'] - 1}@seed.local")
+    print(f"[INFO] Password: {args.password}")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    seed_data()
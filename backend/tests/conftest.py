@@ -0,0 +1,92 @@
+"""
+Shared test setup: a throwaway SQLite database and local media storage
+
+The environment is set before anything from app/ is imported, so the engine,
+the storage backend and the caches are built from it. Background workers are
+not started (the client is not used as a context manager).
+
+Run from backend/: python -m pytest
+"""
+import io
+import os
+import tempfile
+import uuid
+
+_tmp = tempfile.mkdtemp(prefix="dpgdoc-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_tmp}/test.db",
+    "STORAGE_BACKEND": "local",
+    "MEDIA_ROOT": os.path.join(_tmp, "media"),
+    "MEDIA_JOB_DIR": os.path.join(_tmp, "media_jobs"),
+    "UPLOAD_SESSION_DIR": os.path.join(_tmp, "upload_sessions"),
+    "RESPONSE_CACHE_BACKEND": "off",
+    "METRICS_TOKEN": "test-metrics-token",
+})
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models import Annotation, Step, Tutorial
+from app.models.user import User, UserRole
+from app.services.auth import create_access_token
+
+
+@pytest.fixture(autouse=True)
+def schema():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def make_user(db, role=UserRole.COLABORADOR) -> User:
+    name = uuid.uuid4().hex[:12]
+    user = User(email=f"{name}@test.local", username=name, hashed_password="x", role=role)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def make_tutorial(db, steps=3, annotations_per_step=2, is_published=True, created_by=None) -> Tutorial:
+    if created_by is None:
+        created_by = make_user(db, role=UserRole.ADMIN).id
+    tutorial = Tutorial(
+        title="Tutorial", description="d", category="Processos", tags=[],
+        is_published=is_published, created_by=created_by
+    )
+    db.add(tutorial)
+    db.flush()
+    for order in range(1, steps + 1):
+        step = Step(tutorial_id=tutorial.id, order=order, title=f"Step {order}", content="c")
+        db.add(step)
+        db.flush()
+        for _ in range(annotations_per_step):
+            db.add(Annotation(step_id=step.id, type="box", coordinates={"x": 1, "y": 2, "width": 30, "height": 20}))
+    db.commit()
+    return tutorial
+
+
+def auth_headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.id, 'email': user.email})}"}
+
+
+def png(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, format="PNG")
+    return buffer.getvalue()
@@ -0,0 +1,43 @@
+from conftest import auth_headers, make_user, png
+
+from app.models import Annotation, Step, Tutorial
+from app.models.user import UserRole
+from app.services.image_processing import render_annotated_screenshot
+
+
+MALFORMED = [
+    {"type": "box", "coordinates": {"x": 1, "y": 1}, "style": {"strokeWidth": "thick"}},
+    {"type": "arrow", "coordinates": {"x": 1, "y": 1, "points": [{"x": 5, "y": 5}]}},
+    {"type": "arrow", "coordinates": {"x": 1, "y": 1, "points": [{"x": 5}, {"x": 9, "y": 9}]}},
+    {"type": "highlight", "coordinates": "not a dict"},
+    {"type": "box", "coordinates": {"x": "left", "y": 1}},
+]
+
+
+def test_malformed_annotations_are_skipped():
+    rendered = render_annotated_screenshot(png("white"), MALFORMED + [
+        {"type": "box", "coordinates": {"x": 4, "y": 4, "width": 20, "height": 10}, "style": {"strokeWidth": "2"}},
+    ])
+    assert rendered["width"] == 64 and rendered["data"]
+
+
+def test_annotated_endpoint_renders_despite_malformed_annotations(client, db):
+    admin = make_user(db, role=UserRole.ADMIN)
+    shot = client.post("/api/upload/screenshot", files={"file": ("s.png", png("white"), "image/png")}).json()
+    tutorial = Tutorial(title="T", description="d", category="c", tags=[], is_published=True, created_by=admin.id)
+    db.add(tutorial)
+    db.flush()
+    step = Step(tutorial_id=tutorial.id, order=1, title="s", content="c", screenshot_url=shot["url"])
+    db.add(step)
+    db.flush()
+    for annotation in MALFORMED:
+        db.add(Annotation(step_id=step.id, **annotation))
+    db.commit()
+
+    url = f"/api/tutorials/{tutorial.id}/steps/{step.id}/annotated"
+    first = client.get(url, headers=auth_headers(admin))
+    second = client.get(url, headers=auth_headers(admin))
+
+    assert first.status_code == 200, first.text
+    assert first.json()["cached"] is False
+    assert second.json()["cached"] is True
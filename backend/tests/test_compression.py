@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+from app.main import app as main_app
+from app.services import compression
+from app.services.compression import COMPRESSION_MIN_SIZE, CompressionMiddleware
+
+LARGE = json.dumps([{"title": f"Step {i}", "content": "Abra o processo e clique em salvar"} for i in range(100)])
+
+
+def large_json(request):
+    return Response(LARGE, media_type="application/json", headers={"Vary": "Origin"})
+
+
+def small_json(request):
+    return Response('{"ok": true}', media_type="application/json")
+
+
+def png(request):
+    return Response(b"\x89PNG" + b"\0" * COMPRESSION_MIN_SIZE, media_type="image/png")
+
+
+@pytest.fixture
+def compressed_client():
+    app = Starlette(routes=[
+        Route("/large", large_json, methods=["GET", "POST"]),
+        Route("/small", small_json),
+        Route("/png", png),
+    ])
+    return TestClient(CompressionMiddleware(app))
+
+
+def call(app, path, accept_encoding, extensions=None):
+    """Run one GET through an ASGI app and return the messages sent to the server"""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"testserver"), (b"accept-encoding", accept_encoding.encode())],
+        "client": ("127.0.0.1", 1234), "server": ("testserver", 80), "extensions": extensions or {},
+    }
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+def test_prefers_brotli_and_merges_vary(compressed_client):
+    response = compressed_client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Origin, Accept-Encoding"
+    assert response.text == LARGE
+
+
+def test_falls_back_to_gzip(compressed_client):
+    response = compressed_client.get("/large", headers={"Accept-Encoding": "gzip, br;q=0"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(LARGE)
+    assert response.text == LARGE
+
+
+@pytest.mark.parametrize("path", ["/small", "/png"])
+def test_small_and_binary_bodies_pass_through(compressed_client, path):
+    response = compressed_client.get(path, headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+
+
+def test_compressed_get_bodies_are_reused(compressed_client):
+    compressed_client.get("/large", headers={"Accept-Encoding": "gzip"})
+    hits = compression.get_compression_stats()["hits"]
+
+    repeated = compressed_client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert compression.get_compression_stats()["hits"] == hits + 1
+    assert repeated.text == LARGE
+
+    # Only GET bodies go through the cache
+    compressed_client.post("/large", headers={"Accept-Encoding": "gzip"})
+    assert compression.get_compression_stats()["hits"] == hits + 1
+
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "gzip, br"])
+def test_zerocopy_media_responses_keep_their_start_message(accept_encoding):
+    path = os.path.join(os.environ["MEDIA_ROOT"], "screenshots", "a.png")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(b"\x89PNG" + b"\0" * 4096)
+
+    sent = call(main_app, "/media/screenshots/a.png", accept_encoding, {"http.response.zerocopy": {}})
+
+    assert [message["type"] for message in sent] == ["http.response.start", "http.response.zerocopy"]
+
+
+def test_held_start_is_flushed_before_other_messages():
+    async def zerocopy_text(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.zerocopy", "file": None, "offset": 0, "count": 0})
+
+    sent = call(CompressionMiddleware(zerocopy_text), "/", "gzip")
+
+    assert [message["type"] for message in sent] == ["http.response.start", "http.response.zerocopy"]
+    assert dict(sent[0]["headers"]).get(b"content-encoding") is None
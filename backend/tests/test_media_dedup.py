@@ -0,0 +1,75 @@
+from conftest import auth_headers, make_user, png
+
+from app.models import MediaAsset
+from app.models.user import UserRole
+from app.services.storage import get_storage
+
+
+def upload(client, data: bytes, **form) -> dict:
+    response = client.post("/api/upload/screenshot", files={"file": ("shot.png", data, "image/png")}, data=form)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def stored_bytes(public_id: str) -> bytes:
+    return get_storage().local_path(public_id).read_bytes()
+
+
+def refs(db, url):
+    db.expire_all()
+    asset = db.query(MediaAsset).filter(MediaAsset.url == url).first()
+    return asset.ref_count if asset else None
+
+
+def test_new_upload_never_overwrites_a_shared_screenshot(client, db):
+    admin = make_user(db, role=UserRole.ADMIN)
+    red = upload(client, png("red"), tutorial_title="Guia", step_order=1)
+    tutorial = client.post("/api/tutorials/", headers=auth_headers(admin), json={
+        "title": "Guia", "description": "d", "category": "c", "tags": [],
+        "steps": [
+            {"order": order, "title": f"s{order}", "content": "c", "screenshot_url": red["url"]}
+            for order in (1, 2)
+        ],
+    }).json()
+    red_bytes = stored_bytes(red["public_id"])
+    assert refs(db, red["url"]) == 2
+
+    # Different image, same title and step: stored under its own public_id
+    blue = upload(client, png("blue"), tutorial_title="Guia", step_order=1)
+    assert blue["public_id"] != red["public_id"]
+    assert stored_bytes(red["public_id"]) == red_bytes
+
+    # Again the same red image: deduplicated, nothing stored
+    assert upload(client, png("red"))["deduplicated"] is True
+
+    step_1, step_2 = tutorial["steps"]
+    client.put(f"/api/tutorials/{tutorial['id']}/steps/{step_1['id']}", json={"screenshot_url": blue["url"]})
+    assert refs(db, red["url"]) == 1
+    assert refs(db, blue["url"]) == 1
+
+    # The last step using the red screenshot goes: the asset and its files go too
+    client.delete(f"/api/tutorials/{tutorial['id']}/steps/{step_2['id']}")
+    assert refs(db, red["url"]) is None
+    assert not get_storage().local_path(red["public_id"]).exists()
+    assert get_storage().local_path(blue["public_id"]).exists()
+
+
+def test_saving_a_tutorial_keeps_references_of_unchanged_screenshots(client, db):
+    admin = make_user(db, role=UserRole.ADMIN)
+    shot = upload(client, png("green"))
+    steps = [{"order": 1, "title": "s1", "content": "c", "screenshot_url": shot["url"]}]
+    tutorial = client.post("/api/tutorials/", headers=auth_headers(admin), json={
+        "title": "T", "description": "d", "category": "c", "tags": [], "steps": steps,
+    }).json()
+
+    for _ in range(3):
+        client.put(f"/api/tutorials/{tutorial['id']}", headers=auth_headers(admin), json={"steps": steps})
+    assert refs(db, shot["url"]) == 1
+
+    # Removing a screenshot still used by a saved step leaves the file in place
+    response = client.delete(f"/api/upload/screenshot/{shot['public_id']}")
+    assert "still used" in response.json()["message"]
+    assert get_storage().local_path(shot["public_id"]).exists()
+
+    client.delete(f"/api/tutorials/{tutorial['id']}", headers=auth_headers(admin))
+    assert refs(db, shot["url"]) is None
@@ -0,0 +1,84 @@
+import asyncio
+
+from sqlalchemy.exc import OperationalError
+
+from app.models import MediaJob
+from app.services import media_jobs
+
+
+def processing_job(db, tmp_path) -> MediaJob:
+    source = tmp_path / "upload.png"
+    source.write_bytes(b"raw")
+    job = MediaJob(kind="screenshot", status="processing", attempts=1, source_path=str(source), params={})
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    db.expunge(job)
+    return job
+
+
+def status_of(db, job):
+    db.expire_all()
+    return db.query(MediaJob).filter(MediaJob.id == job.id).first()
+
+
+def test_failure_while_completing_puts_the_job_back(db, tmp_path, monkeypatch):
+    job = processing_job(db, tmp_path)
+
+    async def processed(job):
+        return {"url": "/media/x.png"}
+
+    def locked(job, result):
+        raise OperationalError("UPDATE steps", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(media_jobs, "process_media_job", processed)
+    monkeypatch.setattr(media_jobs, "_complete_job", locked)
+
+    asyncio.run(media_jobs._run_job(job))
+
+    stored = status_of(db, job)
+    assert stored.status == "pending"
+    assert "database is locked" in stored.error
+
+
+def test_cancelled_job_goes_back_to_pending(db, tmp_path, monkeypatch):
+    job = processing_job(db, tmp_path)
+
+    async def slow(job):
+        await asyncio.sleep(30)
+
+    monkeypatch.setattr(media_jobs, "process_media_job", slow)
+
+    async def run_and_cancel():
+        task = asyncio.create_task(media_jobs._run_job(job))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run_and_cancel())
+
+    assert status_of(db, job).status == "pending"
+
+
+def test_worker_loop_survives_a_job_that_raises(monkeypatch):
+    jobs = iter([MediaJob(id="first"), MediaJob(id="second")])
+    ran = []
+
+    async def run_job(job):
+        ran.append(job.id)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(media_jobs, "_claim_next_job", lambda: next(jobs, None))
+    monkeypatch.setattr(media_jobs, "_run_job", run_job)
+    monkeypatch.setattr(media_jobs, "_wakeup", None)
+
+    async def run_loop():
+        media_jobs._wakeup = asyncio.Event()
+        task = asyncio.create_task(media_jobs._worker_loop())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run_loop())
+
+    assert ran == ["first", "second"]
@@ -0,0 +1,25 @@
+import pytest
+from conftest import auth_headers, make_user
+
+from app.models.user import UserRole
+
+METRICS_URLS = ["/metrics", "/api/metrics/db-pool"]
+
+
+@pytest.mark.parametrize("url", METRICS_URLS)
+def test_metrics_require_credentials(client, url):
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers={"Authorization": "Bearer wrong-token"}).status_code == 401
+
+
+@pytest.mark.parametrize("url", METRICS_URLS)
+def test_metrics_reject_non_admin_users(client, db, url):
+    user = make_user(db, role=UserRole.COLABORADOR)
+    assert client.get(url, headers=auth_headers(user)).status_code == 403
+
+
+@pytest.mark.parametrize("url", METRICS_URLS)
+def test_metrics_allow_scraper_token_and_admins(client, db, url):
+    admin = make_user(db, role=UserRole.ADMIN)
+    assert client.get(url, headers={"Authorization": "Bearer test-metrics-token"}).status_code == 200
+    assert client.get(url, headers=auth_headers(admin)).status_code == 200
@@ -0,0 +1,44 @@
+"""
+Query budgets for the tutorial read endpoints
+
+The budgets hold for any number of tutorials, steps and annotations: each
+statement may run once per request, so a lazy load in a loop fails here.
+"""
+import pytest
+from conftest import auth_headers, make_tutorial, make_user
+
+from app.models.user import UserRole
+from app.services.sql_profiler import query_budget
+
+
+def seed(db, role, tutorials):
+    user = make_user(db, role=role)
+    created = [make_tutorial(db, steps=4, annotations_per_step=3, is_published=False) for _ in range(tutorials)]
+    # Colaboradores see unpublished tutorials only through explicit access
+    user.accessible_tutorials.extend(created)
+    db.commit()
+    return user, created
+
+
+@pytest.mark.parametrize("tutorials", [1, 6])
+@pytest.mark.parametrize("role", [UserRole.ADMIN, UserRole.COLABORADOR])
+def test_list_tutorials_query_budget(client, db, role, tutorials):
+    user, _ = seed(db, role, tutorials)
+
+    with query_budget(max_queries=5, max_repeats=1):
+        response = client.get("/api/tutorials/", headers=auth_headers(user))
+
+    assert response.status_code == 200
+    assert [tutorial["step_count"] for tutorial in response.json()] == [4] * tutorials
+
+
+@pytest.mark.parametrize("tutorials", [1, 6])
+@pytest.mark.parametrize("role", [UserRole.ADMIN, UserRole.COLABORADOR])
+def test_get_tutorial_query_budget(client, db, role, tutorials):
+    user, created = seed(db, role, tutorials)
+
+    with query_budget(max_queries=7, max_repeats=1):
+        response = client.get(f"/api/tutorials/{created[-1].id}", headers=auth_headers(user))
+
+    assert response.status_code == 200
+    assert [len(step["annotations"]) for step in response.json()["steps"]] == [3] * 4
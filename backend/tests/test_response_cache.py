@@ -0,0 +1,115 @@
+"""
+Response cache behaviour, on the in-process backend and on the shared-store
+code over the local Redis stand-in (the suite otherwise runs with it off)
+"""
+import threading
+import time
+
+import pytest
+from conftest import auth_headers, make_tutorial, make_user
+
+from app.models.user import UserRole
+from app.services import response_cache
+
+
+@pytest.fixture(params=["memory", "local"])
+def cache(request):
+    response_cache.set_backend(response_cache.create_backend(request.param))
+    yield
+    response_cache.set_backend(None)
+
+
+def test_repeated_tutorial_read_is_a_hit(cache, client, db):
+    tutorial = make_tutorial(db)
+    admin = make_user(db, role=UserRole.ADMIN)
+
+    first = client.get(f"/api/tutorials/{tutorial.id}", headers=auth_headers(admin))
+    second = client.get(f"/api/tutorials/{tutorial.id}", headers=auth_headers(admin))
+
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json()
+
+
+def test_step_update_invalidates_the_tutorial(cache, client, db):
+    tutorial = make_tutorial(db)
+    admin = make_user(db, role=UserRole.ADMIN)
+    url = f"/api/tutorials/{tutorial.id}"
+    step_id = client.get(url, headers=auth_headers(admin)).json()["steps"][0]["id"]
+
+    response = client.put(f"{url}/steps/{step_id}", json={"title": "Renamed"}, headers=auth_headers(admin))
+    assert response.status_code == 200
+
+    after = client.get(url, headers=auth_headers(admin))
+    assert after.headers["x-cache"] == "MISS"
+    assert after.json()["steps"][0]["title"] == "Renamed"
+
+
+def test_access_grant_invalidates_the_colaborador_list_and_dashboard(cache, client, db):
+    tutorial = make_tutorial(db, is_published=False)
+    admin = make_user(db, role=UserRole.ADMIN)
+    colaborador = make_user(db)
+    headers = auth_headers(colaborador)
+
+    for url in ("/api/tutorials/", "/api/analytics/dashboard"):
+        client.get(url, headers=headers)
+        assert client.get(url, headers=headers).headers["x-cache"] == "HIT"
+    assert client.get("/api/tutorials/", headers=headers).json() == []
+
+    response = client.post(
+        f"/api/users/{colaborador.id}/tutorials/access",
+        json={"user_id": colaborador.id, "tutorial_ids": [tutorial.id]},
+        headers=auth_headers(admin),
+    )
+    assert response.status_code == 200
+
+    listing = client.get("/api/tutorials/", headers=headers)
+    assert listing.headers["x-cache"] == "MISS"
+    assert [item["id"] for item in listing.json()] == [tutorial.id]
+    dashboard = client.get("/api/analytics/dashboard", headers=headers)
+    assert dashboard.headers["x-cache"] == "MISS"
+    assert dashboard.json()["total_tutorials"] == 1
+
+
+def test_concurrent_misses_are_computed_once(cache):
+    calls, release = [], threading.Event()
+    results = {}
+
+    def produce():
+        calls.append(1)
+        release.wait(5)
+        return {"ok": True}
+
+    def request(name):
+        results[name] = response_cache._compute("test|all|", ("tutorials",), produce)
+
+    coalesced = response_cache.get_response_cache_stats()["coalesced"]
+    leader = threading.Thread(target=request, args=("leader",))
+    leader.start()
+    while "test|all|" not in response_cache._inflight:
+        time.sleep(0.001)
+    follower = threading.Thread(target=request, args=("follower",))
+    follower.start()
+    while response_cache.get_response_cache_stats()["coalesced"] == coalesced:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(calls) == 1
+    assert results["leader"].headers["x-cache"] == "MISS"
+    assert results["follower"].headers["x-cache"] == "COALESCED"
+    assert results["follower"].body == results["leader"].body
+
+
+def test_errors_are_not_cached(cache, client, db):
+    tutorial = make_tutorial(db, is_published=False)
+    headers = auth_headers(make_user(db))
+    misses = response_cache.get_response_cache_stats()["misses"]
+
+    for _ in range(2):
+        assert client.get(f"/api/tutorials/{tutorial.id}", headers=headers).status_code == 403
+        assert client.get("/api/tutorials/missing", headers=headers).status_code == 404
+
+    stats = response_cache.get_response_cache_stats()
+    assert stats["misses"] == misses + 4
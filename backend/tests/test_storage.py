@@ -0,0 +1,17 @@
+import pytest
+
+from app.services.cloudinary_storage import CloudinaryStorage
+from app.services.storage import LocalStorage, StorageBackend
+
+
+def test_backends_implement_the_whole_interface():
+    assert not LocalStorage.__abstractmethods__
+    assert not CloudinaryStorage.__abstractmethods__
+
+
+def test_incomplete_backend_fails_when_instantiated():
+    class WithoutList(LocalStorage):
+        list = StorageBackend.list
+
+    with pytest.raises(TypeError, match="list"):
+        WithoutList()
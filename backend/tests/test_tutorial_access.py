@@ -0,0 +1,35 @@
+from conftest import auth_headers, make_tutorial, make_user
+
+from app.models.user import UserRole
+
+
+def test_colaborador_sees_granted_unpublished_tutorial(client, db):
+    learner = make_user(db)
+    tutorial = make_tutorial(db, is_published=False)
+    learner.accessible_tutorials.append(tutorial)
+    db.commit()
+
+    response = client.get(f"/api/tutorials/{tutorial.id}", headers=auth_headers(learner))
+
+    assert response.status_code == 200
+    assert response.json()["id"] == tutorial.id
+    listed = client.get("/api/tutorials/", headers=auth_headers(learner)).json()
+    assert [t["id"] for t in listed] == [tutorial.id]
+
+
+def test_colaborador_without_grant_gets_403(client, db):
+    learner = make_user(db)
+    tutorial = make_tutorial(db, is_published=False)
+
+    response = client.get(f"/api/tutorials/{tutorial.id}", headers=auth_headers(learner))
+
+    assert response.status_code == 403
+
+
+def test_admin_sees_unpublished_tutorial(client, db):
+    admin = make_user(db, role=UserRole.ADMIN)
+    tutorial = make_tutorial(db, is_published=False)
+
+    response = client.get(f"/api/tutorials/{tutorial.id}", headers=auth_headers(admin))
+
+    assert response.status_code == 200
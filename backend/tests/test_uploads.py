@@ -0,0 +1,29 @@
+from conftest import png
+
+from app.models import MediaAsset
+
+
+def test_batch_upload_with_duplicates_stores_each_image_once(client, db):
+    images = [png("red"), png("blue"), png("red"), png("white")]
+    response = client.post(
+        "/api/upload/screenshots/batch",
+        files=[("files", (f"shot{i}.png", data, "image/png")) for i, data in enumerate(images)],
+    )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["uploaded"] == 4, body
+    urls = [result["url"] for result in body["results"]]
+    assert urls[0] == urls[2]
+    assert db.query(MediaAsset).count() == 3
+
+
+def test_video_chunks_resume_from_received_offset(client):
+    session = client.post("/api/upload/video/sessions", json={"filename": "clip.mp4", "size": 10}).json()
+    url = f"/api/upload/video/sessions/{session['id']}"
+
+    assert client.put(url, params={"offset": 0}, content=b"01234").json()["received"] == 5
+    assert client.put(url, params={"offset": 0}, content=b"01234").status_code == 409
+    assert client.put(url, params={"offset": 5}, content=b"56789").json()["received"] == 10
+    assert client.get(url).json()["received"] == 10
+    assert client.delete(url).json()["success"] is True
@@ -1,10 +1,10 @@
 import React, { useCallback, useState, useEffect } from 'react'
 import { useDropzone } from 'react-dropzone'
 import { X, CheckCircle, Video } from 'lucide-react'
-import { uploadApi } from '@/services/api'
+import { uploadApi, VideoMetadata } from '@/services/api'
 
 interface VideoUploadProps {
-  onUploadSuccess: (url: string) => void
+  onUploadSuccess: (url: string, posterUrl?: string, metadata?: VideoMetadata) => void
   currentVideo?: string
   onDelete?: () => void
   tutorialTitle?: string
@@ -38,20 +38,14 @@ const VideoUpload: React.FC<VideoUploadProps> = ({
     setUploadProgress(0)
 
     try {
-      // Simulando progresso (em produção, use axios onUploadProgress)
-      const progressInterval = setInterval(() => {
-        setUploadProgress((prev) => Math.min(prev + 10, 90))
-      }, 200)
-
-      const response = await uploadApi.uploadVideo(file, tutorialTitle, stepOrder)
-      clearInterval(progressInterval)
+      const response = await uploadApi.uploadVideoResumable(file, tutorialTitle, stepOrder, setUploadProgress)
       setUploadProgress(100)
 
       const url = response.data.url
       const publicId = response.data.public_id
       setUploadedUrl(url)
       setUploadedPublicId(publicId)
-      onUploadSuccess(url)
+      onUploadSuccess(url, response.data.poster_url || undefined, response.data.metadata)
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Falha no upload')
     } finally {
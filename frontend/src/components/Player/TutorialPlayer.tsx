@@ -1,7 +1,7 @@
 import React, { useEffect, useState, useRef } from 'react'
 import { motion, AnimatePresence } from 'framer-motion'
 import { ChevronLeft, ChevronRight, X, CheckCircle, Maximize, Minimize } from 'lucide-react'
-import { Step } from '@/services/api'
+import { Step, buildSrcSet } from '@/services/api'
 import { usePlayerStore } from '@/services/store'
 import AnnotationOverlay from './AnnotationOverlay'
 
@@ -217,6 +217,10 @@ const TutorialPlayer: React.FC<TutorialPlayerProps> = ({
               <div className="mb-6 bg-black rounded-lg overflow-hidden shadow-2xl max-w-5xl mx-auto">
                 <video
                   src={currentStep.video_url}
+                  poster={currentStep.video_poster_url}
+                  width={currentStep.video_metadata?.width}
+                  height={currentStep.video_metadata?.height}
+                  preload={currentStep.video_poster_url ? 'none' : 'metadata'}
                   controls
                   className="w-full h-auto max-h-[70vh] object-contain"
                   key={currentStepIndex}
@@ -230,11 +234,20 @@ const TutorialPlayer: React.FC<TutorialPlayerProps> = ({
             {/* Screenshot with annotations */}
             {currentStep.screenshot_url && !currentStep.video_url && (
               <div className="relative mb-6 bg-white rounded-lg overflow-hidden shadow-2xl max-w-5xl mx-auto">
-                <img
-                  src={currentStep.screenshot_url}
-                  alt={currentStep.title}
-                  className="w-full h-auto max-h-[70vh] object-contain mx-auto"
-                />
+                <picture>
+                  <source
+                    type="image/webp"
+                    srcSet={buildSrcSet(currentStep.screenshot_variants, 'webp')}
+                    sizes="(max-width: 1024px) 100vw, 1024px"
+                  />
+                  <img
+                    src={currentStep.screenshot_url}
+                    srcSet={buildSrcSet(currentStep.screenshot_variants, 'jpg')}
+                    sizes="(max-width: 1024px) 100vw, 1024px"
+                    alt={currentStep.title}
+                    className="w-full h-auto max-h-[70vh] object-contain mx-auto"
+                  />
+                </picture>
                 <AnnotationOverlay annotations={currentStep.annotations} />
               </div>
             )}
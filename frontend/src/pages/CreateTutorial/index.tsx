@@ -281,8 +281,8 @@ const CreateTutorial: React.FC = () => {
                     </label>
                     <VideoUpload
                       currentVideo={currentStep.video_url}
-                      onUploadSuccess={(url) => updateCurrentStep({ video_url: url, screenshot_url: undefined })}
-                      onDelete={() => updateCurrentStep({ video_url: undefined })}
+                      onUploadSuccess={(url, posterUrl, metadata) => updateCurrentStep({ video_url: url, video_poster_url: posterUrl, video_metadata: metadata, screenshot_url: undefined })}
+                      onDelete={() => updateCurrentStep({ video_url: undefined, video_poster_url: undefined, video_metadata: undefined })}
                       tutorialTitle={title}
                       stepOrder={currentStepIndex + 1}
                     />
@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import { Play, Edit, ArrowLeft } from 'lucide-react'
-import { tutorialApi, Tutorial } from '@/services/api'
+import { tutorialApi, Tutorial, buildSrcSet } from '@/services/api'
 import TutorialPlayer from '@/components/Player/TutorialPlayer'
 
 const ViewTutorial: React.FC = () => {
@@ -125,6 +125,10 @@ const ViewTutorial: React.FC = () => {
                         {step.video_url && (
                           <video
                             src={step.video_url}
+                            poster={step.video_poster_url}
+                            width={step.video_metadata?.width}
+                            height={step.video_metadata?.height}
+                            preload="none"
                             controls
                             className="w-full max-w-3xl h-auto max-h-96 object-contain rounded-lg shadow-sm mb-2"
                             controlsList="nodownload"
@@ -133,11 +137,21 @@ const ViewTutorial: React.FC = () => {
                           </video>
                         )}
                         {step.screenshot_url && !step.video_url && (
-                          <img
-                            src={step.screenshot_url}
-                            alt={step.title}
-                            className="w-full max-w-3xl h-auto max-h-96 object-contain rounded-lg shadow-sm mb-2"
-                          />
+                          <picture>
+                            <source
+                              type="image/webp"
+                              srcSet={buildSrcSet(step.screenshot_variants, 'webp')}
+                              sizes="(max-width: 768px) 100vw, 768px"
+                            />
+                            <img
+                              src={step.screenshot_url}
+                              srcSet={buildSrcSet(step.screenshot_variants, 'jpg')}
+                              sizes="(max-width: 768px) 100vw, 768px"
+                              alt={step.title}
+                              loading="lazy"
+                              className="w-full max-w-3xl h-auto max-h-96 object-contain rounded-lg shadow-sm mb-2"
+                            />
+                          </picture>
                         )}
                         {step.content && (
                           <div
@@ -57,13 +57,33 @@ export interface Annotation {
   style?: Record<string, any>
 }
 
+export interface ScreenshotVariant {
+  url: string
+  width: number
+  height: number
+  format: 'webp' | 'jpg' | 'png'
+  bytes?: number
+}
+
+export interface VideoMetadata {
+  duration?: number
+  width?: number
+  height?: number
+  codec?: string
+  bytes?: number
+  format?: string
+}
+
 export interface Step {
   id?: string
   tutorial_id?: string
   order: number
   title: string
   screenshot_url?: string
+  screenshot_variants?: ScreenshotVariant[]
   video_url?: string
+  video_poster_url?: string
+  video_metadata?: VideoMetadata
   content?: string
   validation_required?: boolean
   validation_type?: 'click' | 'input' | 'selection'
@@ -72,6 +92,13 @@ export interface Step {
   annotations: Annotation[]
 }
 
+// Build a srcset from the WebP variants or from the JPEG/PNG fallbacks
+export const buildSrcSet = (variants: ScreenshotVariant[] | undefined, format: 'webp' | 'jpg') =>
+  (variants || [])
+    .filter((variant) => (variant.format === 'webp') === (format === 'webp'))
+    .map((variant) => `${variant.url} ${variant.width}w`)
+    .join(', ') || undefined
+
 export interface Tutorial {
   id?: string
   title: string
@@ -114,8 +141,14 @@ export const tutorialApi = {
     api.put(`/api/tutorials/${tutorialId}/steps/${stepId}`, data),
   deleteStep: (tutorialId: string, stepId: string) =>
     api.delete(`/api/tutorials/${tutorialId}/steps/${stepId}`),
+  // Screenshot with annotations drawn in (rendered once, cached server-side)
+  getAnnotatedScreenshot: (tutorialId: string, stepId: string) =>
+    api.get(`/api/tutorials/${tutorialId}/steps/${stepId}/annotated`),
 }
 
+const VIDEO_CHUNK_SIZE = 5 * 1024 * 1024
+const VIDEO_CHUNK_RETRIES = 5
+
 // Upload endpoints
 export const uploadApi = {
   uploadScreenshot: (file: File, tutorialTitle?: string, stepOrder?: number) => {
@@ -129,6 +162,17 @@ export const uploadApi = {
       },
     })
   },
+  uploadScreenshotsBatch: (files: File[], tutorialTitle?: string, stepOrders?: number[]) => {
+    const formData = new FormData()
+    files.forEach((file) => formData.append('files', file))
+    if (tutorialTitle) formData.append('tutorial_title', tutorialTitle)
+    stepOrders?.forEach((order) => formData.append('step_orders', order.toString()))
+    return api.post('/api/upload/screenshots/batch', formData, {
+      headers: {
+        'Content-Type': 'multipart/form-data',
+      },
+    })
+  },
   deleteScreenshot: (filename: string) => api.delete(`/api/upload/screenshot/${filename}`),
   uploadVideo: (file: File, tutorialTitle?: string, stepOrder?: number) => {
     const formData = new FormData()
@@ -141,6 +185,43 @@ export const uploadApi = {
       },
     })
   },
+  // Chunked upload that resumes from the last received byte after a network error
+  uploadVideoResumable: async (
+    file: File,
+    tutorialTitle?: string,
+    stepOrder?: number,
+    onProgress?: (percent: number) => void,
+  ) => {
+    const { data: session } = await api.post('/api/upload/video/sessions', {
+      filename: file.name,
+      size: file.size,
+      tutorial_title: tutorialTitle,
+      step_order: stepOrder,
+    })
+    const sessionUrl = `/api/upload/video/sessions/${session.id}`
+    let offset = 0
+    let failures = 0
+
+    while (offset < file.size) {
+      try {
+        const { data } = await api.put(sessionUrl, file.slice(offset, offset + VIDEO_CHUNK_SIZE), {
+          params: { offset },
+          headers: { 'Content-Type': 'application/octet-stream' },
+        })
+        offset = data.received
+        failures = 0
+        onProgress?.(Math.round((offset / file.size) * 100))
+      } catch (error: any) {
+        if (error.response && error.response.status !== 409) throw error
+        if (++failures > VIDEO_CHUNK_RETRIES) throw error
+        await new Promise((resolve) => setTimeout(resolve, 1000 * failures))
+        const { data } = await api.get(sessionUrl)
+        offset = data.received
+      }
+    }
+
+    return api.post(`${sessionUrl}/complete`)
+  },
   deleteVideo: (filename: string) => api.delete(`/api/upload/video/${filename}`),
 }
 